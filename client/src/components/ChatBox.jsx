@@ -10,6 +10,8 @@ export default function ChatBox() {
   ]);
   const [input, setInput] = useState("");
   const [loading, setLoading] = useState(false);
+  // One id per chat thread so the backend can deduplicate repeated bookings
+  const [conversationId] = useState(() => crypto.randomUUID());
 
   const token = localStorage.getItem("token");
   const { user } = useAuth();
@@ -38,7 +40,8 @@ export default function ChatBox() {
         {
           message: trimmedInput,
           messages: historyForBackend,
-          user_info: user
+          user_info: user,
+          conversation_id: conversationId
         },
         {
           headers: {
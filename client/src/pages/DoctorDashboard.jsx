@@ -11,13 +11,15 @@ export default function DoctorDashboard() {
   const token = localStorage.getItem("token");
   const [loadingSummary, setLoadingSummary] = useState(false);
   const [summaryText, setSummaryText] = useState("");
+  const [dashboard, setDashboard] = useState(null);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
-        await axios.get(`${BACKEND_URL}/doctor/dashboard`, {
+        const res = await axios.get(`${BACKEND_URL}/doctor/dashboard`, {
           headers: { Authorization: `Bearer ${token}` },
         });
+        setDashboard(res.data);
       } catch (err) {
         if (err.response.status === 403) {
           logout();
@@ -77,6 +79,57 @@ export default function DoctorDashboard() {
               <span className="capitalize">{user?.user_role}</span>
             </div>
           </div>
+
+          {dashboard && (
+            <div className="mt-8 space-y-6 text-sm text-gray-700">
+              <div>
+                <h3 className="font-semibold text-emerald-700 mb-2">
+                  Today ({dashboard.today.count})
+                </h3>
+                {dashboard.today.appointments.length === 0 ? (
+                  <p className="text-xs text-gray-500">No appointments today.</p>
+                ) : (
+                  <ul className="space-y-1">
+                    {dashboard.today.appointments.map((appt) => (
+                      <li key={appt.id} className="flex justify-between">
+                        <span className={appt.status === "cancelled" ? "line-through text-gray-400" : ""}>
+                          {appt.patient_name}
+                        </span>
+                        <span className="text-gray-500">{appt.time}</span>
+                      </li>
+                    ))}
+                  </ul>
+                )}
+              </div>
+
+              <div className="space-y-1">
+                <div className="flex justify-between">
+                  <span className="font-medium">Next 7 days</span>
+                  <span>{dashboard.upcoming.next_7_days}</span>
+                </div>
+                <div className="flex justify-between">
+                  <span className="font-medium">All upcoming</span>
+                  <span>{dashboard.upcoming.total}</span>
+                </div>
+              </div>
+
+              {dashboard.recent_symptoms.buckets.length > 0 && (
+                <div>
+                  <h3 className="font-semibold text-emerald-700 mb-2">
+                    Symptoms, last {dashboard.recent_symptoms.days} days
+                  </h3>
+                  <ul className="space-y-1">
+                    {dashboard.recent_symptoms.buckets.map((b) => (
+                      <li key={b.symptom} className="flex justify-between">
+                        <span className="capitalize">{b.symptom.replace(/_/g, " ")}</span>
+                        <span>{b.count}</span>
+                      </li>
+                    ))}
+                  </ul>
+                </div>
+              )}
+            </div>
+          )}
         </div>
 
         <button
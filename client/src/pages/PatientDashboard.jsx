@@ -1,4 +1,4 @@
-import React, { useEffect } from "react";
+import React, { useEffect, useState } from "react";
 import axios from "axios";
 import { useAuth } from "../context/AuthContext";
 import ChatBox from "../components/ChatBox";
@@ -8,13 +8,15 @@ const BACKEND_URL = import.meta.env.VITE_BACKEND_URL;
 export default function PatientDashboard() {
   const { user, logout } = useAuth();
   const token = localStorage.getItem("token");
+  const [dashboard, setDashboard] = useState(null);
 
   useEffect(() => {
     const fetchData = async () => {
       try {
-        await axios.get(`${BACKEND_URL}/patient/dashboard`, {
+        const res = await axios.get(`${BACKEND_URL}/patient/dashboard`, {
           headers: { Authorization: `Bearer ${token}` },
         });
+        setDashboard(res.data);
       } catch (err) {
         if (err.response.status === 403) {
           logout();
@@ -57,6 +59,39 @@ export default function PatientDashboard() {
               <span className="capitalize">{user?.user_role}</span>
             </div>
           </div>
+
+          {dashboard && (
+            <div className="mt-8 space-y-6 text-sm text-gray-700">
+              <div>
+                <h3 className="font-semibold text-indigo-700 mb-2">Upcoming visits</h3>
+                {dashboard.upcoming.length === 0 ? (
+                  <p className="text-xs text-gray-500">No upcoming appointments.</p>
+                ) : (
+                  <ul className="space-y-2">
+                    {dashboard.upcoming.map((appt) => (
+                      <li key={appt.id}>
+                        <p className="font-medium">{appt.doctor_name}</p>
+                        <p className="text-xs text-gray-500">
+                          {appt.date} at {appt.time}
+                        </p>
+                      </li>
+                    ))}
+                  </ul>
+                )}
+              </div>
+
+              <div className="space-y-1">
+                <div className="flex justify-between">
+                  <span className="font-medium">Past visits</span>
+                  <span>{dashboard.counts.past_visits}</span>
+                </div>
+                <div className="flex justify-between">
+                  <span className="font-medium">Upcoming</span>
+                  <span>{dashboard.counts.upcoming}</span>
+                </div>
+              </div>
+            </div>
+          )}
         </div>
 
         <button
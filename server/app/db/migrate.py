@@ -0,0 +1,70 @@
+"""
+Schema migration entry point.
+
+    python -m app.db.migrate upgrade            # apply all pending migrations
+    python -m app.db.migrate downgrade -1       # roll back one revision
+    python -m app.db.migrate current            # show the applied revision
+    python -m app.db.migrate stamp 0001         # adopt a database created by create_all
+    python -m app.db.migrate revision -m "..."  # create a new (autogenerated) revision
+
+Run this from the `server/` directory as a release step, never from app startup.
+"""
+import argparse
+import os
+import sys
+
+from alembic import command
+from alembic.config import Config
+
+SERVER_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def get_alembic_config() -> Config:
+    config = Config(os.path.join(SERVER_ROOT, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(SERVER_ROOT, "migrations"))
+    return config
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(prog="python -m app.db.migrate", description="Manage database schema migrations.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    upgrade = sub.add_parser("upgrade", help="Upgrade to a later revision (default: head).")
+    upgrade.add_argument("revision", nargs="?", default="head")
+    upgrade.add_argument("--sql", action="store_true", help="Print the SQL instead of executing it.")
+
+    downgrade = sub.add_parser("downgrade", help="Revert to a previous revision.")
+    downgrade.add_argument("revision")
+    downgrade.add_argument("--sql", action="store_true", help="Print the SQL instead of executing it.")
+
+    stamp = sub.add_parser("stamp", help="Mark the database as being at a revision without running migrations.")
+    stamp.add_argument("revision")
+
+    revision = sub.add_parser("revision", help="Create a new revision file.")
+    revision.add_argument("-m", "--message", required=True)
+    revision.add_argument("--empty", action="store_true", help="Do not autogenerate operations from the models.")
+
+    sub.add_parser("current", help="Show the current revision of the database.")
+    sub.add_parser("history", help="List all revisions.")
+
+    args = parser.parse_args(argv)
+    config = get_alembic_config()
+
+    if args.command == "upgrade":
+        command.upgrade(config, args.revision, sql=args.sql)
+    elif args.command == "downgrade":
+        command.downgrade(config, args.revision, sql=args.sql)
+    elif args.command == "stamp":
+        command.stamp(config, args.revision)
+    elif args.command == "revision":
+        command.revision(config, message=args.message, autogenerate=not args.empty)
+    elif args.command == "current":
+        command.current(config, verbose=True)
+    elif args.command == "history":
+        command.history(config, verbose=True)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
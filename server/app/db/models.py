@@ -1,9 +1,10 @@
 import uuid
 import enum
-from sqlalchemy import Column, String, Enum, DateTime, ForeignKey
-from sqlalchemy.dialects.postgresql import UUID
+from datetime import timedelta
+from sqlalchemy import Column, String, Enum, DateTime, Date, Integer, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, JSONB
 from sqlalchemy.orm import relationship
-from sqlalchemy.sql import func
+from sqlalchemy.sql import func, text
 from app.db.database import Base
 
 class UserRole(str, enum.Enum):
@@ -24,6 +25,8 @@ class User(Base):
     full_name = Column(String, nullable=False)
     role = Column(Enum(UserRole), nullable=False)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Doctors only: bumped to revoke the calendar feed URL (see app/services/calendar_feed.py)
+    calendar_feed_version = Column(Integer, server_default=text("0"), nullable=False)
 
     # RELATIONSHIPS
     # We use primaryjoin because both doctor and patient link to the same table (User)
@@ -38,16 +41,45 @@ class User(Base):
         back_populates="patient"
     )
 
+# Longest possible appointment. Overlap checks also bound start_at from below
+# with it, so they prune partitions and stay index range scans.
+MAX_APPOINTMENT_DURATION = timedelta(hours=24)
+
 class Appointment(Base):
     __tablename__ = "appointments"
+    __table_args__ = (
+        # Serves the per-doctor date window lookups done by every tool
+        Index("ix_appointments_doctor_id_start_at", "doctor_id", "start_at"),
+        # Keyset pagination over a doctor's booked schedule ordered by (start_at, id)
+        Index(
+            "ix_appointments_doctor_booked_keyset", "doctor_id", "start_at", "id",
+            postgresql_where=text("status = 'booked'"),
+        ),
+        # Exact tag lookups (symptom_tags && ARRAY[...]) for symptom search and analytics
+        Index("ix_appointments_symptom_tags", "symptom_tags", postgresql_using="gin"),
+        # Latest change per doctor, the ICS feed's ETag (app/services/calendar_feed.py)
+        Index("ix_appointments_doctor_id_updated_at", "doctor_id", "updated_at"),
+        # Booked appointments still owed each reminder (app/services/reminders.py)
+        Index(
+            "ix_appointments_reminder_24h_due", "start_at",
+            postgresql_where=text("status = 'booked' AND reminder_24h_sent_at IS NULL"),
+        ),
+        Index(
+            "ix_appointments_reminder_1h_due", "start_at",
+            postgresql_where=text("status = 'booked' AND reminder_1h_sent_at IS NULL"),
+        ),
+        # Monthly partitions on start_at (migration 0007, app/services/partitioning.py)
+        {"postgresql_partition_by": "RANGE (start_at)"},
+    )
 
+    # The partition key has to be part of the primary key
     id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
 
     # Explicitly link to the User table
     doctor_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
     patient_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
 
-    start_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    start_at = Column(DateTime(timezone=True), primary_key=True, nullable=False, index=True)
     end_at = Column(DateTime(timezone=True), nullable=False)
 
     status = Column(
@@ -57,8 +89,62 @@ class Appointment(Base):
     )
 
     symptoms = Column(String, nullable=True)
+    # Canonical tags derived from `symptoms` at booking (app/services/symptom_tagger.py).
+    # Empty means not tagged yet (see app/jobs/backfill_symptom_tags.py).
+    symptom_tags = Column(ARRAY(String), nullable=False, default=list, server_default="{}")
     created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    updated_at = Column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
+    # Set by the reminder dispatcher once each reminder went out
+    reminder_24h_sent_at = Column(DateTime(timezone=True), nullable=True)
+    reminder_1h_sent_at = Column(DateTime(timezone=True), nullable=True)
 
     # RELATIONSHIPS
     doctor = relationship("User", foreign_keys=[doctor_id], back_populates="doctor_appointments")
-    patient = relationship("User", foreign_keys=[patient_id], back_populates="patient_appointments")
\ No newline at end of file
+    patient = relationship("User", foreign_keys=[patient_id], back_populates="patient_appointments")
+
+class AppointmentDailyStat(Base):
+    """
+    Optional materialized rollup: one counter per doctor, IST day, status and symptom bucket.
+    Maintained incrementally at booking time (see app/services/analytics_service.py).
+    """
+    __tablename__ = "appointment_daily_stats"
+
+    doctor_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    status = Column(Enum(AppointmentStatus), primary_key=True)
+    symptom_bucket = Column(String, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+class IdempotencyKey(Base):
+    """
+    Result of a side-effecting tool call (booking), keyed by a request key so that
+    retried or repeated calls return the stored result instead of running again.
+    See app/services/idempotency.py.
+    """
+    __tablename__ = "idempotency_keys"
+
+    key = Column(String(64), primary_key=True)
+    scope = Column(String, nullable=False)
+    # 'in_progress' while the first call runs, then 'completed' with its response
+    status = Column(String, nullable=False, default="in_progress")
+    response = Column(JSONB, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Purged by app/jobs/purge_idempotency_keys.py
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+
+class SlotHold(Base):
+    """
+    Short reservation of a slot by the patient who picked it, from the pick
+    until booking (or expires_at). Hidden from other patients' availability.
+    See app/services/slot_holds.py.
+    """
+    __tablename__ = "slot_holds"
+
+    doctor_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), primary_key=True)
+    start_at = Column(DateTime(timezone=True), primary_key=True)
+    end_at = Column(DateTime(timezone=True), nullable=False)
+    # One active hold per patient; a new pick replaces the previous one
+    patient_id = Column(UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    # Expired holds are ignored by every query; swept by app/jobs/purge_slot_holds.py
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
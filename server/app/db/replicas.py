@@ -0,0 +1,187 @@
+import os
+import time
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional
+
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.pool import NullPool
+
+from app.db.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+# -------- CONFIG --------
+# Comma-separated streaming replicas of DATABASE_URL; empty = everything on the primary
+REPLICA_DATABASE_URLS = [u.strip() for u in os.getenv("REPLICA_DATABASE_URLS", "").split(",") if u.strip()]
+# Replicas further behind than this are skipped until they catch up
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "5"))
+REPLICA_HEALTH_CHECK_SECONDS = float(os.getenv("REPLICA_HEALTH_CHECK_SECONDS", "10"))
+# After a write, reads for the same key stay on the primary for this long
+# (long enough to cover the rest of a booking conversation)
+READ_YOUR_WRITES_SECONDS = float(os.getenv("READ_YOUR_WRITES_SECONDS", "300"))
+
+# Replay lag in seconds; 0 when the replica has applied everything it received,
+# so an idle primary does not make a caught-up replica look stale
+LAG_QUERY = text("""
+    SELECT pg_is_in_recovery() AS in_recovery,
+           CASE WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+                ELSE COALESCE(EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()), 0)
+           END AS lag_seconds
+""")
+
+
+class _Replica:
+    def __init__(self, url: str):
+        self.url = url
+        is_cloud = "pooler.supabase.com" in url or "neon.tech" in url
+        self.engine = create_engine(
+            url,
+            echo=False,
+            pool_pre_ping=True,
+            poolclass=NullPool if is_cloud else None,
+            connect_args={"connect_timeout": 3},
+        )
+        self.session_factory = sessionmaker(autocommit=False, autoflush=False, bind=self.engine)
+        self.healthy = True
+        self.lag_seconds = 0.0
+
+    @property
+    def host(self) -> str:
+        return self.engine.url.host or "replica"
+
+
+class ReplicaRouter:
+    """
+    Picks the database for read-only work: the least lagged healthy replica,
+    or the primary when no replica qualifies or the caller recently wrote.
+    Health and lag are re-checked at most every REPLICA_HEALTH_CHECK_SECONDS,
+    by whichever request gets there first.
+
+    Write pins are kept per process; with several tool server workers a read
+    can land on a worker that has not seen the pin, which the lag limit bounds.
+    """
+
+    def __init__(self, urls: List[str]):
+        self.replicas = [_Replica(url) for url in urls]
+        self._last_check = 0.0
+        self._check_lock = threading.Lock()
+        self._pinned_until: Dict[str, float] = {}
+        self._pins_lock = threading.Lock()
+
+    # ---- read-your-writes ----
+    def pin_to_primary(self, key: Optional[str]):
+        if not key or not self.replicas:
+            return
+        with self._pins_lock:
+            now = time.monotonic()
+            self._pinned_until[str(key)] = now + READ_YOUR_WRITES_SECONDS
+            # Drop expired pins so the map stays bounded
+            if len(self._pinned_until) > 10_000:
+                self._pinned_until = {k: t for k, t in self._pinned_until.items() if t > now}
+
+    def is_pinned(self, key: Optional[str]) -> bool:
+        if not key:
+            return False
+        return self._pinned_until.get(str(key), 0) > time.monotonic()
+
+    # ---- health ----
+    def _check_replica(self, replica: _Replica):
+        try:
+            with replica.engine.connect() as conn:
+                row = conn.execute(LAG_QUERY).mappings().one()
+            replica.lag_seconds = float(row["lag_seconds"] or 0)
+            replica.healthy = replica.lag_seconds <= REPLICA_MAX_LAG_SECONDS
+            if not row["in_recovery"]:
+                # Misconfigured URL pointing at a primary still serves correct reads
+                replica.lag_seconds = 0.0
+                replica.healthy = True
+        except Exception as e:
+            if replica.healthy:
+                logger.warning(f"Replica {replica.host} unavailable: {e}")
+            replica.healthy = False
+
+    def refresh_health(self, force: bool = False):
+        if not force and time.monotonic() - self._last_check < REPLICA_HEALTH_CHECK_SECONDS:
+            return
+        # Only one thread checks; the rest keep using the last known state
+        if not self._check_lock.acquire(blocking=force):
+            return
+        try:
+            for replica in self.replicas:
+                self._check_replica(replica)
+            self._last_check = time.monotonic()
+        finally:
+            self._check_lock.release()
+
+    def _choose(self) -> Optional[_Replica]:
+        self.refresh_health()
+        healthy = [r for r in self.replicas if r.healthy]
+        if not healthy:
+            return None
+        return min(healthy, key=lambda r: r.lag_seconds)
+
+    # ---- sessions ----
+    def read_session(self, sticky_key: Optional[str] = None) -> Session:
+        if not self.replicas or self.is_pinned(sticky_key):
+            return SessionLocal()
+
+        replica = self._choose()
+        if replica is None:
+            return SessionLocal()
+
+        db = replica.session_factory()
+        try:
+            # Check out the connection now so a dead replica falls back here
+            # instead of failing the tool call halfway through
+            db.connection()
+            return db
+        except OperationalError as e:
+            db.close()
+            logger.warning(f"Replica {replica.host} failed, reading from primary: {e}")
+            replica.healthy = False
+            return SessionLocal()
+
+    def status(self) -> List[dict]:
+        return [
+            {"host": r.host, "healthy": r.healthy, "lag_seconds": round(r.lag_seconds, 3)}
+            for r in self.replicas
+        ]
+
+
+replica_router = ReplicaRouter(REPLICA_DATABASE_URLS)
+
+
+@contextmanager
+def read_session(sticky_key: Optional[str] = None) -> Iterator[Session]:
+    """
+    Session for read-only work. Goes to a replica when one is healthy and
+    within the lag limit, unless `sticky_key` (e.g. a doctor_id) was written
+    to recently, in which case the primary is used so the caller sees its
+    own writes.
+    """
+    db = replica_router.read_session(sticky_key)
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+def is_replica(db: Session) -> bool:
+    """True when `db` reads from a replica, i.e. may not show the latest commits."""
+    bind = db.get_bind()
+    return any(bind is r.engine for r in replica_router.replicas)
+
+
+def mark_written(sticky_key: Optional[str]):
+    """Routes reads for `sticky_key` to the primary for READ_YOUR_WRITES_SECONDS."""
+    replica_router.pin_to_primary(sticky_key)
+
+
+def get_read_db() -> Iterator[Session]:
+    """FastAPI dependency counterpart of get_db for read-only endpoints."""
+    with read_session() as db:
+        yield db
@@ -0,0 +1,92 @@
+"""
+Tags appointments booked before symptom normalization existed.
+
+    python -m app.jobs.backfill_symptom_tags                # untagged rows only
+    python -m app.jobs.backfill_symptom_tags --retag-all    # after a vocabulary change
+    python -m app.jobs.backfill_symptom_tags --batch-size 2000
+
+Walks the table in primary-key order with a keyset cursor and commits each
+batch separately, so it holds no long transaction and can be stopped and rerun.
+
+The rollup's symptom bucket is a row's first tag, so a row whose first tag
+changes is moved between appointment_daily_stats buckets in the same
+transaction as its new tags. Batch rows are locked while they are retagged,
+so a concurrent cancellation cannot be counted under its old status.
+"""
+import argparse
+import time
+from collections import Counter
+from datetime import timedelta, timezone
+
+from sqlalchemy import func, update
+
+from app.db.database import SessionLocal
+from app.db.models import Appointment
+from app.services.analytics_service import adjust_daily_rollup
+from app.services.symptom_tagger import OTHER_TAG, normalize_symptoms
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+DEFAULT_BATCH_SIZE = 500
+
+
+def backfill_symptom_tags(batch_size: int = DEFAULT_BATCH_SIZE, retag_all: bool = False) -> int:
+    updated = 0
+    last_id = None
+    started = time.perf_counter()
+
+    while True:
+        with SessionLocal() as db:
+            query = db.query(
+                Appointment.id, Appointment.start_at, Appointment.symptoms,
+                Appointment.symptom_tags, Appointment.doctor_id, Appointment.status,
+            )
+            if not retag_all:
+                query = query.filter(func.cardinality(Appointment.symptom_tags) == 0)
+            if last_id is not None:
+                query = query.filter(Appointment.id > last_id)
+            batch = query.order_by(Appointment.id.asc()).limit(batch_size).with_for_update().all()
+
+            if not batch:
+                break
+
+            rows = []
+            # (doctor_id, day, status, bucket) -> net change for the rollup
+            moved: Counter = Counter()
+            for appt_id, start_at, symptoms, old_tags, doctor_id, status in batch:
+                new_tags = normalize_symptoms(symptoms)
+                # (id, start_at) is the primary key of the partitioned table
+                rows.append({"id": appt_id, "start_at": start_at, "symptom_tags": new_tags})
+                old_bucket = old_tags[0] if old_tags else OTHER_TAG
+                new_bucket = new_tags[0] if new_tags else OTHER_TAG
+                if old_bucket != new_bucket:
+                    day = start_at.astimezone(IST).date()
+                    moved[(doctor_id, day, status, old_bucket)] -= 1
+                    moved[(doctor_id, day, status, new_bucket)] += 1
+
+            db.execute(update(Appointment), rows)
+            for (doctor_id, day, status, bucket), delta in moved.items():
+                if delta:
+                    adjust_daily_rollup(db, doctor_id, day, status, [bucket], delta=delta)
+            db.commit()
+
+        last_id = batch[-1][0]
+        updated += len(batch)
+        print(f"… tagged {updated} appointments")
+
+    elapsed = time.perf_counter() - started
+    print(f"✅ Backfill complete: {updated} appointments in {elapsed:.1f}s")
+    return updated
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill canonical symptom tags on appointments.")
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE)
+    parser.add_argument("--retag-all", action="store_true", help="Recompute tags for every row, not just untagged ones.")
+    args = parser.parse_args()
+
+    backfill_symptom_tags(args.batch_size, args.retag_all)
+
+
+if __name__ == "__main__":
+    main()
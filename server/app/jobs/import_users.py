@@ -0,0 +1,55 @@
+"""
+Bulk-creates doctors and patients from a CSV or NDJSON file (or stdin).
+
+    python -m app.jobs.import_users staff.csv
+    python -m app.jobs.import_users patients.ndjson --workers 8 --batch-size 2000
+    cat export.jsonl | python -m app.jobs.import_users - --format ndjson
+
+Columns/fields: full_name, email, role (doctor|patient), password or password_hash.
+Emails that already exist are skipped, so a partial import can be re-run.
+"""
+import argparse
+import sys
+
+from app.db.database import SessionLocal
+from app.services.user_import import (
+    FORMATS,
+    IMPORT_BATCH_SIZE,
+    IMPORT_HASH_WORKERS,
+    detect_format,
+    import_users,
+)
+
+
+def _progress(report, elapsed: float):
+    rate = report.rows / elapsed if elapsed else 0
+    print(f"… {report.rows} rows read, {report.inserted} inserted ({rate:.0f} rows/s)", file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import users with COPY.")
+    parser.add_argument("path", help="CSV/NDJSON file, or - for stdin")
+    parser.add_argument("--format", choices=FORMATS, default=None, help="Default: from the file extension")
+    parser.add_argument("--batch-size", type=int, default=IMPORT_BATCH_SIZE)
+    parser.add_argument("--workers", type=int, default=IMPORT_HASH_WORKERS, help="Password hashing processes")
+    args = parser.parse_args()
+
+    fmt = args.format or detect_format(args.path)
+    stream = sys.stdin if args.path == "-" else open(args.path, encoding="utf-8-sig", newline="")
+    try:
+        with SessionLocal() as db:
+            report = import_users(db, stream, fmt, args.batch_size, args.workers, progress=_progress)
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+    print(
+        f"✅ {report.inserted} users imported in {report.seconds:.1f}s ({report.rows_per_second} rows/s); "
+        f"{report.existing} already registered, {report.duplicates_in_file} duplicates in file, {report.invalid} invalid"
+    )
+    for error in report.errors:
+        print(f"   line {error['line']}: {error['error']}")
+
+
+if __name__ == "__main__":
+    main()
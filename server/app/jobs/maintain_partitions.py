@@ -0,0 +1,61 @@
+"""
+Creates upcoming monthly partitions of `appointments` and archives old ones.
+
+    python -m app.jobs.maintain_partitions                         # next 12 months
+    python -m app.jobs.maintain_partitions --from 2022-01          # also backfill older months
+    python -m app.jobs.maintain_partitions --archive-before 2023-01            # move to archive schema
+    python -m app.jobs.maintain_partitions --archive-before 2023-01 --drop     # delete instead
+
+Schedule it monthly (creation is a no-op for months that exist). Bookings never
+fail for a missing month: they land in appointments_default until it runs.
+Archived months keep their counts in appointment_daily_stats when the rollup is used.
+"""
+import argparse
+from datetime import datetime
+
+from app.db.database import SessionLocal
+from app.services.partitioning import (
+    PARTITION_MONTHS_AHEAD,
+    archive_partitions_before,
+    ensure_future_partitions,
+    ensure_partitions,
+    list_partitions,
+)
+
+
+def _month(value: str):
+    return datetime.strptime(value, "%Y-%m").date()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain monthly appointments partitions.")
+    parser.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    parser.add_argument("--from", dest="from_month", type=_month, default=None,
+                        help="Also create partitions from this month (YYYY-MM), e.g. before importing history")
+    parser.add_argument("--archive-before", type=_month, default=None,
+                        help="Detach partitions for months before this one (YYYY-MM)")
+    parser.add_argument("--drop", action="store_true", help="Drop detached partitions instead of archiving them")
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        created = ensure_future_partitions(db, args.months_ahead)
+        if args.from_month:
+            existing = list_partitions(db)
+            if existing:
+                created += ensure_partitions(db, args.from_month, existing[0])
+        for name in created:
+            print(f"➕ Created {name}")
+
+        if args.archive_before:
+            for name in archive_partitions_before(db, args.archive_before, drop=args.drop):
+                print(f"📦 {'Dropped' if args.drop else 'Archived'} {name}")
+
+        months = list_partitions(db)
+    if months:
+        print(f"✅ {len(months)} monthly partitions: {months[0]:%Y-%m} … {months[-1]:%Y-%m}")
+    else:
+        print("✅ No monthly partitions")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,19 @@
+"""
+Deletes expired idempotency keys (see app/services/idempotency.py).
+
+    python -m app.jobs.purge_idempotency_keys
+
+Schedule it daily; expired keys are already ignored, this only reclaims space.
+"""
+from app.db.database import SessionLocal
+from app.services.idempotency import purge_expired
+
+
+def main():
+    with SessionLocal() as db:
+        deleted = purge_expired(db)
+    print(f"✅ Purged {deleted} expired idempotency keys")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,20 @@
+"""
+Deletes expired slot holds (see app/services/slot_holds.py).
+
+    python -m app.jobs.purge_slot_holds
+
+Schedule it every few minutes; expired holds are already ignored, this only
+reclaims the rows so the primary key scans behind availability stay short.
+"""
+from app.db.database import SessionLocal
+from app.services.slot_holds import purge_expired
+
+
+def main():
+    with SessionLocal() as db:
+        deleted = purge_expired(db)
+    print(f"✅ Purged {deleted} expired slot holds")
+
+
+if __name__ == "__main__":
+    main()
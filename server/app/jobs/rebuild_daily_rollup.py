@@ -0,0 +1,26 @@
+"""
+Seeds or repairs the appointment_daily_stats rollup from the appointments table.
+
+    python -m app.jobs.rebuild_daily_rollup                # all doctors
+    python -m app.jobs.rebuild_daily_rollup --doctor-id ID # a single doctor
+
+Run once before setting ANALYTICS_ROLLUP_ENABLED=true; bookings keep it current afterwards.
+"""
+import argparse
+
+from app.db.database import SessionLocal
+from app.services.analytics_service import rebuild_daily_rollup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the appointment_daily_stats rollup.")
+    parser.add_argument("--doctor-id", default=None)
+    args = parser.parse_args()
+
+    with SessionLocal() as db:
+        rows = rebuild_daily_rollup(db, args.doctor_id)
+    print(f"✅ appointment_daily_stats rebuilt ({rows} rows)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Sends due appointment reminders (24h and 1h before start) by email and Slack.
+See app/services/reminders.py.
+
+    python -m app.jobs.send_reminders                       # one pass, 4 worker threads
+    python -m app.jobs.send_reminders --workers 8 --batch-size 200
+    python -m app.jobs.send_reminders --loop --interval 60  # long-running dispatcher
+
+Run it every minute from cron, or as a --loop service. Several copies can
+run at once (on one host or many): workers claim batches with SKIP LOCKED,
+so adding workers adds throughput without duplicate reminders.
+"""
+import argparse
+import time
+
+from app.db.database import SessionLocal
+from app.services.reminders import KINDS, REMINDER_BATCH_SIZE, Channels, run_workers
+
+
+def run_once(args, channels: Channels):
+    started = time.perf_counter()
+    stats = run_workers(SessionLocal, args.workers, [KINDS[k] for k in args.kinds], args.batch_size, channels)
+    elapsed = time.perf_counter() - started
+    if stats.claimed:
+        rate = stats.sent / elapsed if elapsed else 0.0
+        print(
+            f"✅ Sent {stats.sent} reminders ({', '.join(f'{k}: {n}' for k, n in stats.by_kind.items())}) "
+            f"in {stats.batches} batches, {elapsed:.2f}s ({rate:.1f}/s); {stats.failed} deferred"
+        )
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dispatch appointment reminders.")
+    parser.add_argument("--workers", type=int, default=4, help="Worker threads claiming batches")
+    parser.add_argument("--batch-size", type=int, default=REMINDER_BATCH_SIZE)
+    parser.add_argument("--kinds", nargs="+", choices=list(KINDS), default=list(KINDS))
+    parser.add_argument("--loop", action="store_true", help="Keep running, one pass every --interval seconds")
+    parser.add_argument("--interval", type=float, default=60.0)
+    args = parser.parse_args()
+
+    # Pooled SMTP connections and the Slack client live across passes
+    channels = Channels(workers=args.workers)
+    try:
+        if not args.loop:
+            stats = run_once(args, channels)
+            if not stats.claimed:
+                print("✅ No reminders due")
+            return
+        print(f"⏰ Reminder dispatcher running every {args.interval:.0f}s with {args.workers} workers")
+        while True:
+            started = time.monotonic()
+            run_once(args, channels)
+            time.sleep(max(0.0, args.interval - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        channels.close()
+
+
+if __name__ == "__main__":
+    main()
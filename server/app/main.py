@@ -1,25 +1,59 @@
-from fastapi import FastAPI, Response, APIRouter, Depends
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import engine
-from app.db import models
-from app.routes import auth, chat
-from app.services.dependencies import require_role
+from fastapi.middleware.gzip import GZipMiddleware
+from app.routes import auth, chat, appointments, admin, calendar, dashboard
 from contextlib import asynccontextmanager
-from app.services.agent.mcp_client import init_mcp, shutdown_mcp
+from app.services.agent.mcp_client import MCP_TRANSPORT, init_mcp, shutdown_mcp
+from app.services.serialization import FastJSONResponse
+from app.services import metrics, resilience, profiling, logging_setup
+import os
+import logging
 import fastmcp 
-import app.mcp_server.server 
+
+# In-process tools are registered with FastMCP at import; in http mode the
+# agent calls them on the MCP servers, so the FastMCP server is not built here
+# (routes such as /appointments still import tool functions and the DB layer)
+if MCP_TRANSPORT != "http":
+    import app.mcp_server.server
+
+# JSON logs written off the request path (app/services/logging_setup.py)
+logging_setup.configure_logging()
+logger = logging.getLogger(__name__)
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    print("📦 Connecting to DB and creating tables...")
-    models.Base.metadata.create_all(bind=engine)
-    
-    print("🚀 Initializing MCP Tools...")
+    # Schema changes are applied by `python -m app.db.migrate upgrade` as a
+    # release step, so boot does no DDL or table introspection.
+    logger.info("🚀 Initializing MCP Tools...")
     await init_mcp()
     yield
     await shutdown_mcp()
 
-app = FastAPI(lifespan=lifespan)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Opt-in request profiling (X-Profile + X-Admin-Token, or PROFILE_SAMPLE_RATE).
+# Installed innermost and only when configured, so other requests pay nothing.
+if profiling.profiling_configured():
+    if profiling.PROFILING_AVAILABLE:
+        app.add_middleware(profiling.ProfilingMiddleware)
+    else:
+        logger.warning("⚠️ pyinstrument is not installed, request profiling disabled")
+
+# Response compression: gzip (default), brotli (needs the optional `brotli-asgi`
+# package; falls back to gzip for clients without br) or none. Bodies smaller
+# than the threshold are sent as-is, where compression costs more than it saves.
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "gzip").lower()
+COMPRESSION_MIN_BYTES = int(os.getenv("COMPRESSION_MIN_BYTES", "1024"))
+
+if RESPONSE_COMPRESSION == "brotli":
+    try:
+        from brotli_asgi import BrotliMiddleware
+        app.add_middleware(BrotliMiddleware, minimum_size=COMPRESSION_MIN_BYTES, gzip_fallback=True)
+    except ImportError:
+        logger.warning("⚠️ brotli-asgi is not installed, using gzip")
+        RESPONSE_COMPRESSION = "gzip"
+if RESPONSE_COMPRESSION == "gzip":
+    app.add_middleware(GZipMiddleware, minimum_size=COMPRESSION_MIN_BYTES, compresslevel=6)
 
 origins = [
     "http://localhost:5173",
@@ -33,27 +67,33 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Request-ID"],
 )
 
+# Outermost: every request's log records carry its ID
+app.add_middleware(logging_setup.RequestContextMiddleware)
+
 app.include_router(auth.router)
 app.include_router(chat.router)
-
-router = APIRouter(tags=["Protected"])
-
-@router.get("/doctor/dashboard")
-def doctor_dashboard(current_user=Depends(require_role(["doctor"]))):
-    return {"msg": f"Welcome Doctor {current_user['id']}"}
-
-@router.get("/patient/dashboard")
-def patient_dashboard(current_user=Depends(require_role(["patient"]))):
-    return {"msg": f"Welcome Patient {current_user['id']}"}
+app.include_router(appointments.router)
+app.include_router(admin.router)
+app.include_router(calendar.router)
+app.include_router(dashboard.router)
 
 @app.get("/favicon.ico", include_in_schema=False)
 async def favicon():
     return Response(status_code=204)
 
-app.include_router(router)
-
 @app.get("/")
 def health():
-    return {"status": "ok"}
\ No newline at end of file
+    return {"status": "ok"}
+
+@app.get("/health/dependencies")
+def dependency_health():
+    # Breaker and bulkhead state of each external integration used by this process
+    return {"dependencies": resilience.status()}
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
\ No newline at end of file
@@ -0,0 +1,77 @@
+"""
+ASGI app serving the MCP tools over streamable HTTP, for running the tool layer
+as its own horizontally scaled pool:
+
+    MCP_SERVER_TOKEN=... uvicorn app.mcp_server.http_app:app --host 10.0.0.5 --port 8001 --workers 4
+
+The API then points at one or more instances, with the same token:
+
+    MCP_TRANSPORT=http MCP_SERVER_TOKEN=... MCP_SERVER_URLS=http://tools-1:8001/mcp,http://tools-2:8001/mcp
+
+The tools act for any doctor or patient ID they are given, so /mcp only
+answers requests carrying the shared secret in X-MCP-Token; with
+MCP_SERVER_TOKEN unset it refuses every call. Bind to a private interface,
+never a public one. /health and /metrics stay open for probes and scrapers.
+
+Sessions are stateless, so any worker (or instance behind a load balancer)
+can serve any request.
+"""
+import os
+import hmac
+import logging
+
+from starlette.middleware import Middleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+
+from app.mcp_server.server import mcp
+from app.services import metrics, resilience, logging_setup
+
+logging_setup.configure_logging()
+logger = logging.getLogger(__name__)
+
+# Shared secret the API sends on every tool call; unset disables /mcp
+MCP_SERVER_TOKEN = os.getenv("MCP_SERVER_TOKEN", "")
+MCP_TOKEN_HEADER = b"x-mcp-token"
+
+if not MCP_SERVER_TOKEN:
+    logger.warning("⚠️ MCP_SERVER_TOKEN is not set; every /mcp request will be refused")
+
+
+class SharedSecretMiddleware:
+    """Pure ASGI middleware: /mcp requests need a matching X-MCP-Token header."""
+
+    def __init__(self, app, path: str):
+        self.app = app
+        self.path = path
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"].startswith(self.path):
+            token = dict(scope["headers"]).get(MCP_TOKEN_HEADER, b"").decode("latin-1")
+            if not MCP_SERVER_TOKEN or not hmac.compare_digest(token, MCP_SERVER_TOKEN):
+                status = 403 if not MCP_SERVER_TOKEN else 401
+                detail = "MCP server token is not configured" if not MCP_SERVER_TOKEN else "Invalid MCP token"
+                await JSONResponse({"detail": detail}, status_code=status)(scope, receive, send)
+                return
+        await self.app(scope, receive, send)
+
+
+@mcp.custom_route("/health", methods=["GET"])
+async def health(request: Request) -> JSONResponse:
+    return JSONResponse({"status": "ok", "dependencies": resilience.status()})
+
+
+@mcp.custom_route("/metrics", methods=["GET"])
+async def prometheus_metrics(request: Request) -> Response:
+    body, content_type = metrics.render_latest()
+    return Response(content=body, media_type=content_type)
+
+
+app = mcp.http_app(
+    path="/mcp",
+    stateless_http=True,
+    middleware=[
+        Middleware(logging_setup.RequestContextMiddleware),
+        Middleware(SharedSecretMiddleware, path="/mcp"),
+    ],
+)
@@ -1,24 +1,30 @@
 from fastmcp import FastMCP
+from starlette.concurrency import run_in_threadpool
 from app.db.database import SessionLocal
+from app.db.replicas import read_session, mark_written
+from app.services.serialization import dumps as serialize_result
 import logging
-import sys
 
 # tools
 from app.mcp_server.tools.list_available_doctors import list_available_doctors
 from app.mcp_server.tools.search_doctor_by_name import search_doctor_by_name
 from app.mcp_server.tools.fetch_available_appointment_slots import fetch_available_appointment_slots
 from app.mcp_server.tools.book_appointment import book_appointment
+from app.mcp_server.tools.hold_appointment_slot import hold_appointment_slot
 
 from app.mcp_server.tools.get_appointments_by_range import get_doctor_appointments_range
+from app.mcp_server.tools.get_appointments_page import get_doctor_appointments_page
 from app.mcp_server.tools.get_appointments_by_symptoms import search_appointments_by_symptoms
+from app.mcp_server.tools.find_similar_appointments import find_similar_appointments
+from app.mcp_server.tools.get_appointment_stats import get_appointment_statistics
 from app.mcp_server.tools.notify_on_slack import notify_on_slack
 
-# Configure logging to see INFO level logs
-logging.basicConfig(level=logging.INFO, format="%(levelname)s: %(message)s", stream=sys.stderr)
+# Handlers are installed by the hosting app (app/services/logging_setup.py)
 logger = logging.getLogger(__name__)
 
 # initialize the MCP server
-mcp = FastMCP("DoctorPatientAssistant")
+# Tool results are serialized with the same fast JSON codec as API responses
+mcp = FastMCP("DoctorPatientAssistant", tool_serializer=serialize_result)
 
 
 @mcp.tool()
@@ -27,7 +33,7 @@ async def get_doctors() -> dict:
     Fetches a list of all registered doctors in the system.
     Use this tool when the user wants to see which doctors are available.
     """
-    with SessionLocal() as db:
+    with read_session() as db:
         return list_available_doctors(db)
 
 @mcp.tool()
@@ -37,30 +43,55 @@ async def find_doctor(name: str) -> dict:
     Use this tool IMMEDIATELY when a user mentions a doctor's name (e.g., 'Dr. Smith' or 'Ahuja').
     You MUST have the doctor_id returned by this tool before you can check slots or book appointments.
     """
-    with SessionLocal() as db:
+    with read_session() as db:
         return search_doctor_by_name(db, name)
 
 @mcp.tool()
-async def get_available_slots(doctor_id: str, date_str: str) -> dict:
+async def get_available_slots(doctor_id: str, date_str: str, requester_id: str = "") -> dict:
     """
     Retrieves available 1-hour appointment windows for a specific doctor on a specific date.
     Trigger this when a user selects a doctor and asks 'When is he free?' or 'Check slots for tomorrow'.
     :param doctor_id: The UUID of the doctor (get this from find_doctor).
     :param date_str: The date in YYYY-MM-DD format (IST).
+    :param requester_id: Set by the agent, not the model; slots held by this patient are still listed.
+    """
+    with read_session(doctor_id) as db:
+        return fetch_available_appointment_slots(db, doctor_id, date_str, requester_id or None)
+
+@mcp.tool()
+async def hold_slot(doctor_id: str, start_at: str, requester_id: str = "") -> dict:
+    """
+    Reserves a slot for the patient for a few minutes, so nobody else can take it while you collect the booking details.
+    Call this AS SOON AS the patient picks a slot from get_available_slots, before asking for symptoms.
+    If it returns 'conflict', the slot is gone: offer the other slots instead.
+    :param doctor_id: The UUID of the doctor.
+    :param start_at: The exact ISO start time of the chosen slot (e.g., '2026-01-25T14:00:00+05:30').
+    :param requester_id: Set by the agent, not the model; the signed-in patient the slot is held for.
     """
     with SessionLocal() as db:
-        return fetch_available_appointment_slots(db, doctor_id, date_str)
+        result = hold_appointment_slot(db, doctor_id, requester_id, start_at)
+    if result.get("status") == "held":
+        # Other patients' slot lookups for this doctor must see the hold at once
+        mark_written(doctor_id)
+    return result
 
 @mcp.tool()
-async def book_new_appointment(doctor_id: str, patient_id: str, start_at: str, symptoms: str = "not provided") -> dict:
+async def book_new_appointment(doctor_id: str, patient_id: str, start_at: str, symptoms: str = "not provided", idempotency_key: str = "") -> dict:
     """
     Finalizes and books a medical appointment in the database and Google Calendar.
     Use this ONLY after the user has confirmed a specific time slot from get_available_slots.
     :param start_at: The ISO format start time (e.g., '2026-01-25T14:00:00+05:30') provided by the slot tool.
     :param symptoms: A brief description of the patient's condition.
+    :param idempotency_key: Set by the agent, not the model; repeated calls with the same key return the first result.
     """
+    # In a worker thread: the email and calendar calls (and their retry backoff) block
     with SessionLocal() as db:
-        return book_appointment(db, doctor_id, patient_id, start_at, symptoms)
+        result = await run_in_threadpool(book_appointment, db, doctor_id, patient_id, start_at, symptoms, idempotency_key or None)
+    if result.get("status") == "success":
+        # Keep the doctor's slot and schedule reads, and both dashboards, on the primary for a while
+        mark_written(doctor_id)
+        mark_written(patient_id)
+    return result
 
 @mcp.tool()
 async def get_doctor_appointments_by_date_range(doctor_id: str, start_date_str: str, end_date_str: str) -> dict:
@@ -73,9 +104,24 @@ async def get_doctor_appointments_by_date_range(doctor_id: str, start_date_str:
     :param end_date_str: The end date in YYYY-MM-DD format.
     Returns a summary including total count and a schedule breakdown.
     """
-    with SessionLocal() as db:
+    with read_session(doctor_id) as db:
         return get_doctor_appointments_range(db, doctor_id, start_date_str, end_date_str)
 
+@mcp.tool()
+async def get_doctor_appointments_paginated(doctor_id: str, start_date_str: str, end_date_str: str, cursor: str = "", limit: int = 20) -> dict:
+    """
+    Fetches one page of a doctor's appointments within a date range, in chronological order.
+    Use this instead of get_doctor_appointments_by_date_range for long ranges (more than a week, e.g. 'this month' or 'this year').
+    :param doctor_id: The UUID of the doctor.
+    :param start_date_str: The start date in YYYY-MM-DD format.
+    :param end_date_str: The end date in YYYY-MM-DD format.
+    :param cursor: Leave empty for the first page; pass next_cursor from the previous result to get the next page.
+    :param limit: Number of appointments per page (max 100).
+    Returns the page of appointments and a next_cursor (null when there are no more pages).
+    """
+    with read_session(doctor_id) as db:
+        return get_doctor_appointments_page(db, doctor_id, start_date_str, end_date_str, cursor or None, limit)
+
 @mcp.tool()
 async def search_appointments_by_symptom_keyword(doctor_id: str, symptom_keyword: str, start_date_str: str, end_date_str: str) -> dict:
     """
@@ -88,9 +134,45 @@ async def search_appointments_by_symptom_keyword(doctor_id: str, symptom_keyword
     :param end_date_str: The end date in YYYY-MM-DD format.
     Returns a list of matching appointments with patient details.
     """
-    with SessionLocal() as db:
+    with read_session(doctor_id) as db:
         return search_appointments_by_symptoms(db, doctor_id, symptom_keyword, start_date_str, end_date_str)
 
+@mcp.tool()
+async def find_similar_cases(doctor_id: str, symptoms: str = "", appointment_id: str = "", top_k: int = 10, start_date_str: str = "", end_date_str: str = "") -> dict:
+    """
+    Finds the doctor's past appointments whose complaints are most SIMILAR to a description, ranked by a similarity score.
+    Use this when the doctor asks 'show me patients with similar complaints to X' or 'who else came in with something like this?'.
+    Unlike search_appointments_by_symptom_keyword it matches whole descriptions, related wording and misspellings.
+    :param doctor_id: The UUID of the doctor.
+    :param symptoms: The complaint to compare with, in the doctor's words (e.g. 'dry cough and fever at night').
+    :param appointment_id: Instead of symptoms, an appointment ID from a previous result to find cases similar to it.
+    :param top_k: Number of results (max 50).
+    :param start_date_str: Optional earliest date in YYYY-MM-DD format.
+    :param end_date_str: Optional latest date in YYYY-MM-DD format.
+    Returns the matching appointments with patient details and a score between 0 and 1.
+    """
+    # In a worker thread: a doctor's first search builds their index (seconds for a large practice)
+    with read_session(doctor_id) as db:
+        return await run_in_threadpool(
+            find_similar_appointments, db, doctor_id, symptoms, appointment_id or None, top_k, start_date_str or None, end_date_str or None
+        )
+
+@mcp.tool()
+async def get_appointment_stats(doctor_id: str, start_date_str: str, end_date_str: str, granularity: str = "day", symptom_keyword: str = "") -> dict:
+    """
+    Returns compact appointment COUNTS for a doctor, computed in the database: totals per day/week/month,
+    per status and per primary symptom tag (e.g. fever, cough, cold, headache, back_pain, follow_up, other).
+    Use this for any counting or trend question, e.g. 'How many fever cases this month?' or 'Which day is busiest this week?'.
+    Prefer it over listing appointments whenever the doctor only needs numbers.
+    :param doctor_id: The UUID of the doctor.
+    :param start_date_str: The start date in YYYY-MM-DD format.
+    :param end_date_str: The end date in YYYY-MM-DD format.
+    :param granularity: 'day', 'week' or 'month' for the per-period counts.
+    :param symptom_keyword: Optional keyword to count only matching appointments (e.g. 'fever').
+    """
+    with read_session(doctor_id) as db:
+        return get_appointment_statistics(db, doctor_id, start_date_str, end_date_str, granularity, symptom_keyword)
+
 @mcp.tool()
 async def send_summary_report_to_slack(doctor_id: str, content: str) -> dict:
     """
@@ -102,3 +184,22 @@ async def send_summary_report_to_slack(doctor_id: str, content: str) -> dict:
     with SessionLocal() as db:
         return notify_on_slack(db, doctor_id, content)
 
+
+if __name__ == "__main__":
+    # Standalone MCP server over streamable HTTP (single process):
+    #   MCP_SERVER_TOKEN=... python -m app.mcp_server.server --port 8001
+    # For a multi-worker pool use app/mcp_server/http_app.py with uvicorn --workers.
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Run the MCP tool server over HTTP.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8001)
+    args = parser.parse_args()
+
+    # The same app as the uvicorn pool, so /mcp requires X-MCP-Token here too
+    import uvicorn
+    from app.mcp_server.http_app import MCP_SERVER_TOKEN, app
+
+    if not MCP_SERVER_TOKEN:
+        raise SystemExit("❌ Set MCP_SERVER_TOKEN; the tool server does not run without a shared secret")
+    uvicorn.run(app, host=args.host, port=args.port)
@@ -1,21 +1,52 @@
 import uuid
 from datetime import datetime, timedelta, timezone
-from app.db.models import Appointment, AppointmentStatus, User
+from app.db.models import Appointment, AppointmentStatus, User, MAX_APPOINTMENT_DURATION
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from app.services.email_service import send_appointment_email_confirmation
 from app.services.google_calendar_service import create_calendar_event
+from app.services.analytics_service import adjust_daily_rollup
+from app.services.symptom_tagger import normalize_symptoms
+from app.services import availability_cache
+from app.services import idempotency
+from app.services import slot_holds
+from app.services import similar_cases
+from typing import Optional
 
 import logging
 logger = logging.getLogger(__name__)
 
 IST = timezone(timedelta(hours=5, minutes=30))
 
-def book_appointment(db: Session, doctor_id: str, patient_id: str, start_at: str, symptoms: str) -> dict:
+def book_appointment(db: Session, doctor_id: str, patient_id: str, start_at: str, symptoms: str, idempotency_key: Optional[str] = None) -> dict:
     """
     Books an appointment, syncs with Google Calendar, and sends email confirmation.
     Includes validation for user existence and slot availability.
+    With an idempotency_key, a repeated request returns the first result
+    without touching the appointments table or resending email/calendar.
     """
+    if not idempotency_key:
+        return _book_appointment(db, doctor_id, patient_id, start_at, symptoms)
+
+    try:
+        previous = idempotency.claim(db, idempotency_key, scope="book_appointment")
+    except Exception as e:
+        # Never block a booking on the key table; the overlap check still applies
+        db.rollback()
+        logger.warning(f"Idempotency check failed, booking without it: {e}")
+        return _book_appointment(db, doctor_id, patient_id, start_at, symptoms)
+
+    if previous is not None:
+        return previous
+
+    result = _book_appointment(db, doctor_id, patient_id, start_at, symptoms, idempotency_key)
+    if result.get("status") != "success":
+        # Let a retry run again (e.g. after a technical error)
+        idempotency.release(db, idempotency_key)
+    return result
+
+
+def _book_appointment(db: Session, doctor_id: str, patient_id: str, start_at: str, symptoms: str, idempotency_key: Optional[str] = None) -> dict:
     try:
         # 1. Parse Time and Verify User Existence
         try:
@@ -44,7 +75,9 @@ def book_appointment(db: Session, doctor_id: str, patient_id: str, start_at: str
             Appointment.status == AppointmentStatus.booked,
             and_(
                 Appointment.start_at < end_at,
-                Appointment.end_at > start_at
+                Appointment.end_at > start_at,
+                # Implied by end_at > start_at; gives the planner a start_at range to prune on
+                Appointment.start_at > start_at - MAX_APPOINTMENT_DURATION
             )
         ).first()
 
@@ -54,17 +87,39 @@ def book_appointment(db: Session, doctor_id: str, patient_id: str, start_at: str
                 "message": f"The slot starting at {start_at.strftime('%I:%M %p')} is no longer available. Please select another time."
             }
 
+        # Another patient picked this slot first and is still completing the booking
+        if slot_holds.held_by_other(db, doctor_id, patient_id, start_at, end_at):
+            return {
+                "status": "conflict",
+                "message": f"The slot starting at {start_at.strftime('%I:%M %p')} is being booked by another patient. Please select another time."
+            }
+
         # If no overlap, proceed with booking
+        # Normalize free-text symptoms into canonical tags for indexed search/analytics
+        symptoms = symptoms or "No symptoms provided"
+        symptom_tags = normalize_symptoms(symptoms)
         new_appt = Appointment(
             id=str(uuid.uuid4()),
             doctor_id=doctor_id,
             patient_id=patient_id,
             start_at=start_at,
             end_at=end_at,
-            symptoms=symptoms or "No symptoms provided",
+            symptoms=symptoms,
+            symptom_tags=symptom_tags,
             status=AppointmentStatus.booked
         )
         db.add(new_appt)
+        # The booking replaces the patient's hold (same transaction)
+        slot_holds.release(db, doctor_id, patient_id)
+
+        # Keep the daily stats rollup in step with this booking (same transaction)
+        adjust_daily_rollup(
+            db,
+            doctor_id=doctor_id,
+            day=start_at.astimezone(IST).date(),
+            status=AppointmentStatus.booked,
+            symptom_tags=new_appt.symptom_tags,
+        )
 
         try:
             # Send email confirmation
@@ -82,19 +137,29 @@ def book_appointment(db: Session, doctor_id: str, patient_id: str, start_at: str
                 patient_name=patient.full_name,
                 start_dt=start_at,
                 end_dt=end_at,
-                symptoms=symptoms
+                symptoms=symptoms,
+                appointment_id=new_appt.id
             )
         except Exception as service_err:
             logger.warning(f"External service sync partially failed: {service_err}")
 
 
-        # only commit after email and google calendar confirmation
-        db.commit()
-        return {
+        result = {
             "status": "success",
             "appointment_id": new_appt.id,
             "message": f"Appointment successfully booked with {doctor.full_name} for {start_at.strftime('%B %d at %I:%M %p')}. Confirmation email sent."
         }
+        # Stored in the same transaction, so duplicates replay only a booking that committed
+        if idempotency_key:
+            idempotency.complete(db, idempotency_key, result)
+
+        # only commit after email and google calendar confirmation
+        db.commit()
+
+        # Update cached free slots in place so the next lookup needs no query
+        availability_cache.mark_booked(doctor_id, start_at, end_at)
+        similar_cases.add(doctor_id, result["appointment_id"], start_at, symptoms, symptom_tags)
+        return result
 
     except Exception as e:
         db.rollback()
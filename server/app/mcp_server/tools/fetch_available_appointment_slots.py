@@ -1,14 +1,52 @@
 from sqlalchemy.orm import Session
-from app.db.models import Appointment, AppointmentStatus
-from datetime import datetime, time, timezone, timedelta 
+from app.db.models import Appointment, AppointmentStatus, MAX_APPOINTMENT_DURATION
+from datetime import date, datetime, time, timezone, timedelta
+from typing import Optional, Set
 from sqlalchemy import and_
+from app.db.database import SessionLocal
+from app.db.replicas import is_replica
+from app.services import availability_cache
+from app.services import slot_holds
+from app.services.availability_cache import CLINIC_OPEN_HOUR, CLINIC_CLOSE_HOUR
 import logging
 logger = logging.getLogger(__name__)
 IST = timezone(timedelta(hours=5, minutes=30))
 
-def fetch_available_appointment_slots(db: Session, doctor_id: str, date_str: str) -> dict:
+def compute_free_hours(db: Session, doctor_id: str, target_date: date) -> Set[int]:
+    """
+    Hours (IST) in the clinic window whose 1-hour slot is not covered by a booked appointment.
+    """
+    # 1. Define the 10 AM - 5 PM IST window
+    search_start = datetime.combine(target_date, time(CLINIC_OPEN_HOUR, 0)).replace(tzinfo=IST)
+    search_end = datetime.combine(target_date, time(CLINIC_CLOSE_HOUR, 0)).replace(tzinfo=IST)
+
+    # 2. Fetch booked appointment windows (plain columns, no ORM objects)
+    booked = db.query(Appointment.start_at, Appointment.end_at).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.status == AppointmentStatus.booked,
+        and_(
+            Appointment.start_at < search_end,
+            Appointment.end_at > search_start,
+            # Implied by end_at > search_start; gives the planner a start_at range to prune on
+            Appointment.start_at > search_start - MAX_APPOINTMENT_DURATION
+        )
+    ).all()
+
+    # 3. Keep hours with no overlap
+    free_hours = set()
+    for hour in range(CLINIC_OPEN_HOUR, CLINIC_CLOSE_HOUR):
+        slot_start = datetime.combine(target_date, time(hour, 0)).replace(tzinfo=IST)
+        slot_end = slot_start + timedelta(hours=1)
+        if not any(slot_start < end_at and slot_end > start_at for start_at, end_at in booked):
+            free_hours.add(hour)
+    return free_hours
+
+
+def fetch_available_appointment_slots(db: Session, doctor_id: str, date_str: str, requester_id: Optional[str] = None) -> dict:
     """
     Calculates 1-hour gaps. Returns a summary for the LLM and raw data for tools.
+    Slots held by other patients (app/services/slot_holds.py) are left out;
+    the requester's own hold stays visible.
     """
     try:
         # 1. Parse date and check if it's in the past
@@ -23,44 +61,42 @@ def fetch_available_appointment_slots(db: Session, doctor_id: str, date_str: str
                 "slots": []
             }
         
-        # 2. Define the 10 AM - 5 PM IST window
-        search_start_utc = datetime.combine(target_date, time(10, 0)).replace(tzinfo=IST)
-        search_end_utc = datetime.combine(target_date, time(17, 0)).replace(tzinfo=IST)
-
-        # 3. Fetch Booked appointments
-        booked_appointments = db.query(Appointment).filter(
-            Appointment.doctor_id == doctor_id,
-            Appointment.status == AppointmentStatus.booked,
-            and_(
-                Appointment.start_at < search_end_utc,
-                Appointment.end_at > search_start_utc
-            )
-        ).all()
+        # 2. Free hours for the day: served from the availability cache when
+        # present, otherwise computed from the appointments table and cached.
+        # Fills read the primary: a lagging replica's set would be shared by
+        # every worker for the cache TTL.
+        free_hours = availability_cache.get_free_hours(doctor_id, target_date)
+        if free_hours is None:
+            generation = availability_cache.generation(doctor_id, target_date)
+            if generation is not None and is_replica(db):
+                with SessionLocal() as primary:
+                    free_hours = compute_free_hours(primary, doctor_id, target_date)
+            else:
+                free_hours = compute_free_hours(db, doctor_id, target_date)
+            availability_cache.store_free_hours(doctor_id, target_date, free_hours, generation)
+        # Holds change by the minute, so they are applied on top of the cached hours
+        # (no query unless the day had a hold within the hold TTL)
+        free_hours = free_hours - slot_holds.held_hours(db, doctor_id, target_date, requester_id)
 
-        # 4. Calculate available slots
+        # 3. Build slots, skipping those that have already passed if the target date is today
         available_slots = []
         now_ist = datetime.now(IST)
 
-        for hour in range(10, 17):
+        for hour in sorted(free_hours):
             slot_start = datetime.combine(target_date, time(hour, 0)).replace(tzinfo=IST)
             slot_end = slot_start + timedelta(hours=1)
 
-            # Skip slots that have already passed if the target date is today
             if slot_end < now_ist:
                 continue
 
-            # Check for overlaps
-            is_blocked = any(slot_start < appt.end_at and slot_end > appt.start_at for appt in booked_appointments)
-            
-            if not is_blocked:
-                available_slots.append({
-                    "iso_start": slot_start.isoformat(), # Essential for the booking tool
-                    "time": slot_start.strftime("%I:%M %p"),
-                    "display": f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}"
-                })
+            available_slots.append({
+                "iso_start": slot_start.isoformat(), # Essential for the booking tool
+                "time": slot_start.strftime("%I:%M %p"),
+                "display": f"{slot_start.strftime('%I:%M %p')} - {slot_end.strftime('%I:%M %p')}"
+            })
 
         
-        # 5. Handle Scenarios
+        # 4. Handle Scenarios
         if not available_slots:
             msg = "The doctor is fully booked for today." if target_date == today_ist else f"No slots available on {date_str}."
             return {
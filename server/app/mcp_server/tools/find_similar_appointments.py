@@ -0,0 +1,105 @@
+from datetime import datetime, time, timezone, timedelta
+from typing import Optional
+from sqlalchemy.orm import Session
+from app.db.models import Appointment, AppointmentStatus, User
+from app.services import similar_cases
+import logging
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+DEFAULT_TOP_K = 10
+MAX_TOP_K = 50
+# Extra candidates fetched from the index, for rows cancelled since it was built
+CANDIDATE_SLACK = 10
+
+
+def find_similar_appointments(
+    db: Session,
+    doctor_id: str,
+    symptoms: str = "",
+    appointment_id: Optional[str] = None,
+    top_k: Optional[int] = None,
+    start_date_str: Optional[str] = None,
+    end_date_str: Optional[str] = None,
+) -> dict:
+    """
+    Finds the doctor's appointments whose symptoms are most similar to a
+    description (or to another appointment's symptoms), ranked by a TF-IDF
+    cosine score. Searches the doctor's in-memory index, see app/services/similar_cases.py.
+    """
+    try:
+        # 1. Input validation
+        top_k = min(top_k, MAX_TOP_K) if top_k and top_k > 0 else DEFAULT_TOP_K
+        try:
+            since = datetime.combine(datetime.fromisoformat(start_date_str).date(), time.min).replace(tzinfo=IST) if start_date_str else None
+            until = datetime.combine(datetime.fromisoformat(end_date_str).date(), time.max).replace(tzinfo=IST) if end_date_str else None
+        except ValueError:
+            return {"status": "error", "message": "Invalid date format. Use YYYY-MM-DD."}
+
+        # 2. The query text: given, or the reference appointment's symptoms
+        if appointment_id:
+            reference = db.query(Appointment.symptoms).filter(
+                Appointment.id == appointment_id,
+                Appointment.doctor_id == doctor_id,
+            ).first()
+            if not reference:
+                return {"status": "error", "message": "Appointment not found for this doctor. Please verify the appointment ID."}
+            symptoms = reference.symptoms or ""
+        if not symptoms or len(symptoms.strip()) < 3:
+            return {
+                "status": "error",
+                "message": "Please describe the symptoms (at least 3 characters) or give an appointment to compare with."
+            }
+
+        # 3. Rank in the index
+        matches = similar_cases.search(db, doctor_id, symptoms, top_k + CANDIDATE_SLACK, since, until, appointment_id)
+        if not matches:
+            return {
+                "status": "success",
+                "total_count": 0,
+                "message": f"I couldn't find any appointments with complaints similar to '{symptoms}'."
+            }
+
+        # 4. Current details from the database (drops appointments cancelled since indexing)
+        scores = {match_id: score for match_id, _, score in matches}
+        starts = [start_at for _, start_at, _ in matches]
+        rows = db.query(Appointment, User).join(
+            User, Appointment.patient_id == User.id
+        ).filter(
+            Appointment.doctor_id == doctor_id,
+            Appointment.id.in_(list(scores)),
+            # Lets the planner skip partitions outside the matches' months
+            Appointment.start_at.between(min(starts), max(starts)),
+            Appointment.status != AppointmentStatus.cancelled,
+        ).all()
+        rows.sort(key=lambda row: -scores[str(row[0].id)])
+
+        # 5. Format results
+        results = []
+        for appt, patient in rows[:top_k]:
+            start_at_ist = appt.start_at.astimezone(IST)
+            results.append({
+                "appointment_id": str(appt.id),
+                "date": start_at_ist.strftime("%Y-%m-%d (%A)"),
+                "time": start_at_ist.strftime("%I:%M %p"),
+                "patient_name": patient.full_name,
+                "symptoms": appt.symptoms,
+                "score": round(scores[str(appt.id)], 3),
+            })
+
+        return {
+            "status": "success",
+            "total_count": len(results),
+            "summary": f"Found {len(results)} appointments with complaints similar to '{symptoms}' (score 1.0 = same wording).",
+            "results": results
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Similar-case search error for doctor {doctor_id}: {e}")
+        return {
+            "status": "error",
+            "message": "An error occurred while searching patient records. Please try again later."
+        }
@@ -0,0 +1,63 @@
+from datetime import datetime, time, timezone, timedelta
+from sqlalchemy.orm import Session
+from app.services import analytics_service
+import logging
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+def get_appointment_statistics(
+    db: Session,
+    doctor_id: str,
+    start_date_str: str,
+    end_date_str: str,
+    granularity: str = "day",
+    symptom_keyword: str = ""
+) -> dict:
+    """
+    Returns appointment counts by period, status and symptom category, computed in the database.
+    """
+    try:
+        # 1. Validate inputs
+        try:
+            start_date = datetime.fromisoformat(start_date_str).date()
+            end_date = datetime.fromisoformat(end_date_str).date()
+        except ValueError:
+            return {"status": "error", "message": "Invalid date format. Use YYYY-MM-DD."}
+
+        if start_date > end_date:
+            return {"status": "error", "message": "The start date cannot be after the end date."}
+
+        granularity = (granularity or "day").lower()
+        if granularity not in analytics_service.GRANULARITIES:
+            return {"status": "error", "message": "granularity must be one of: day, week, month."}
+
+        keyword = (symptom_keyword or "").strip()
+        if keyword and len(keyword) < 3:
+            return {"status": "error", "message": "Please provide a symptom keyword with at least 3 characters."}
+
+        # 2. Aggregate (the rollup cannot filter by free-text keyword)
+        if analytics_service.ROLLUP_ENABLED and not keyword:
+            stats = analytics_service.compute_stats_from_rollup(db, doctor_id, start_date, end_date, granularity)
+        else:
+            start_ist = datetime.combine(start_date, time.min).replace(tzinfo=IST)
+            end_ist = datetime.combine(end_date, time.max).replace(tzinfo=IST)
+            stats = analytics_service.compute_stats_from_appointments(
+                db, doctor_id, start_ist, end_ist, granularity, keyword or None
+            )
+
+        return {
+            "status": "success",
+            "range": f"{start_date_str} to {end_date_str}",
+            "granularity": granularity,
+            "symptom_keyword": keyword or None,
+            **stats
+        }
+
+    except Exception as e:
+        logger.error(f"Statistics error for {doctor_id}: {e}")
+        return {
+            "status": "error",
+            "message": "Failed to compute appointment statistics due to a database error."
+        }
@@ -2,6 +2,8 @@ from datetime import datetime, time, timezone, timedelta
 from sqlalchemy.orm import Session
 from sqlalchemy import and_
 from app.db.models import Appointment, User, AppointmentStatus
+from app.services.analytics_service import symptom_filter
+from app.services.symptom_tagger import tags_for_keyword
 import logging
 
 logger = logging.getLogger(__name__)
@@ -39,14 +41,18 @@ def search_appointments_by_symptoms(
         start_ist = datetime.combine(start_date, time.min).replace(tzinfo=IST)
         end_ist = datetime.combine(end_date, time.max).replace(tzinfo=IST)
 
-        # 3. Perform Case-Insensitive Fuzzy Search
-        # ILIKE %keyword% ensures we catch "High Fever" if searching for "fever"
+        # 3. Match on canonical symptom tags (GIN index) when the keyword is in the
+        # vocabulary, e.g. "vomiting" -> nausea; otherwise, and for rows the tagger
+        # could not place, a case-insensitive ILIKE %keyword% over the raw text
+        matched_tags = tags_for_keyword(symptom_keyword)
+        symptom_clause = symptom_filter(symptom_keyword)
+
         appointments = db.query(Appointment, User).join(
             User, Appointment.patient_id == User.id
         ).filter(
             Appointment.doctor_id == doctor_id,
             Appointment.status == AppointmentStatus.booked,
-            Appointment.symptoms.ilike(f"%{symptom_keyword.strip()}%"),
+            symptom_clause,
             and_(
                 Appointment.start_at >= start_ist,
                 Appointment.start_at <= end_ist
@@ -77,6 +83,7 @@ def search_appointments_by_symptoms(
             "status": "success",
             "total_count": len(results),
             "summary": f"Found {len(results)} patients with symptoms matching '{symptom_keyword}'.",
+            "matched_tags": matched_tags or None,
             "results": results
         }
 
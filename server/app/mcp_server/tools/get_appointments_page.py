@@ -0,0 +1,167 @@
+import base64
+import uuid
+from datetime import datetime, time, timezone, timedelta
+from typing import Iterator, Optional, Tuple
+from sqlalchemy.orm import Session
+from sqlalchemy import and_, tuple_
+from app.db.models import Appointment, User, AppointmentStatus
+import logging
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+# Rows are pulled from the cursor in chunks of this size while streaming
+STREAM_CHUNK_SIZE = 50
+
+
+class InvalidCursorError(ValueError):
+    pass
+
+
+def encode_cursor(start_at: datetime, appointment_id) -> str:
+    """Opaque keyset cursor: the (start_at, id) of the last row on a page."""
+    raw = f"{start_at.isoformat()}|{appointment_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        start_str, id_str = base64.urlsafe_b64decode(padded.encode()).decode().split("|", 1)
+        return datetime.fromisoformat(start_str), uuid.UUID(id_str)
+    except Exception:
+        raise InvalidCursorError("Invalid or corrupted page cursor.")
+
+
+def parse_date_range(start_date_str: str, end_date_str: str) -> Tuple[datetime, datetime]:
+    """Turns inclusive YYYY-MM-DD bounds into IST datetimes. Raises ValueError."""
+    try:
+        start_date = datetime.fromisoformat(start_date_str).date()
+        end_date = datetime.fromisoformat(end_date_str).date()
+    except ValueError:
+        raise ValueError("Invalid date format. Please use YYYY-MM-DD.")
+
+    if start_date > end_date:
+        raise ValueError("The start date cannot be after the end date.")
+
+    start_ist = datetime.combine(start_date, time.min).replace(tzinfo=IST)
+    end_ist = datetime.combine(end_date, time.max).replace(tzinfo=IST)
+    return start_ist, end_ist
+
+
+def clamp_page_size(limit: Optional[int]) -> int:
+    if not limit or limit < 1:
+        return DEFAULT_PAGE_SIZE
+    return min(limit, MAX_PAGE_SIZE)
+
+
+def iter_appointment_rows(
+    db: Session,
+    doctor_id: str,
+    start_ist: datetime,
+    end_ist: datetime,
+    after: Optional[Tuple[datetime, uuid.UUID]],
+    limit: int,
+) -> Iterator[dict]:
+    """
+    Yields at most `limit + 1` rows ordered by (start_at, id) starting after the cursor.
+    The extra row only tells the caller whether another page exists.
+    Selects plain columns (no ORM hydration) and streams them off a server-side cursor.
+    """
+    query = db.query(
+        Appointment.id,
+        Appointment.start_at,
+        Appointment.symptoms,
+        User.full_name,
+    ).join(
+        User, Appointment.patient_id == User.id
+    ).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.status == AppointmentStatus.booked,
+        and_(
+            Appointment.start_at >= start_ist,
+            Appointment.start_at <= end_ist
+        )
+    )
+
+    if after is not None:
+        query = query.filter(tuple_(Appointment.start_at, Appointment.id) > tuple_(*after))
+
+    query = query.order_by(
+        Appointment.start_at.asc(), Appointment.id.asc()
+    ).limit(limit + 1).execution_options(yield_per=STREAM_CHUNK_SIZE)
+
+    for appt_id, start_at, symptoms, patient_name in query:
+        start_at_ist = start_at.astimezone(IST)
+        yield {
+            "id": appt_id,
+            "start_at": start_at,
+            "date": start_at_ist.strftime("%Y-%m-%d (%A)"),
+            "time": start_at_ist.strftime("%I:%M %p"),
+            "patient_name": patient_name,
+            "symptoms": symptoms or "Not specified",
+        }
+
+
+def get_doctor_appointments_page(
+    db: Session,
+    doctor_id: str,
+    start_date_str: str,
+    end_date_str: str,
+    cursor: Optional[str] = None,
+    limit: Optional[int] = None,
+) -> dict:
+    """
+    Returns one bounded page of a doctor's booked appointments in a date range.
+    Pass the returned `next_cursor` back to continue; it is None on the last page.
+    """
+    try:
+        try:
+            start_ist, end_ist = parse_date_range(start_date_str, end_date_str)
+        except ValueError as e:
+            return {"status": "error", "message": str(e)}
+
+        try:
+            after = decode_cursor(cursor) if cursor else None
+        except InvalidCursorError as e:
+            return {"status": "error", "message": str(e)}
+
+        page_size = clamp_page_size(limit)
+        rows = list(iter_appointment_rows(db, doctor_id, start_ist, end_ist, after, page_size))
+
+        has_more = len(rows) > page_size
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1]["start_at"], rows[-1]["id"]) if has_more else None
+
+        if not rows:
+            return {
+                "status": "success",
+                "count": 0,
+                "message": f"No more appointments between {start_date_str} and {end_date_str}." if after
+                else f"You have no appointments scheduled between {start_date_str} and {end_date_str}.",
+                "appointments": [],
+                "next_cursor": None
+            }
+
+        return {
+            "status": "success",
+            "range": f"{start_date_str} to {end_date_str}",
+            "count": len(rows),
+            "appointments": [
+                {k: row[k] for k in ("date", "time", "patient_name", "symptoms")}
+                for row in rows
+            ],
+            "next_cursor": next_cursor,
+            "note": "More appointments exist. Call again with next_cursor to continue." if has_more else None
+        }
+
+    except Exception as e:
+        logger.error(f"Error fetching appointment page for {doctor_id}: {e}")
+        return {
+            "status": "error",
+            "message": "Failed to retrieve the appointment schedule due to a database error."
+        }
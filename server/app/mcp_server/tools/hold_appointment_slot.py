@@ -0,0 +1,83 @@
+from datetime import datetime, timedelta, timezone
+from sqlalchemy import and_
+from sqlalchemy.orm import Session
+from app.db.models import Appointment, AppointmentStatus, User, UserRole, MAX_APPOINTMENT_DURATION
+from app.services import slot_holds
+from app.services.availability_cache import CLINIC_OPEN_HOUR, CLINIC_CLOSE_HOUR
+
+import logging
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+def hold_appointment_slot(db: Session, doctor_id: str, patient_id: str, start_at: str) -> dict:
+    """
+    Reserves a slot for the patient for a few minutes while the booking details
+    are collected. Other patients do not see a held slot and cannot book it.
+    """
+    try:
+        # 1. Parse time
+        try:
+            start_at = datetime.fromisoformat(start_at)
+            if start_at.tzinfo is None:
+                start_at = start_at.replace(tzinfo=IST)
+            end_at = start_at + slot_holds.HOLD_LENGTH
+        except ValueError:
+            return {"status": "error", "message": "Invalid date/time format. Please use ISO format."}
+
+        if end_at <= datetime.now(IST):
+            return {"status": "error", "message": "This slot is in the past. Please pick an upcoming slot."}
+
+        # Only the slots get_available_slots offers: on the hour, within clinic hours (IST)
+        start_ist = start_at.astimezone(IST)
+        on_the_hour = start_ist.minute == 0 and start_ist.second == 0 and start_ist.microsecond == 0
+        if not on_the_hour or not CLINIC_OPEN_HOUR <= start_ist.hour < CLINIC_CLOSE_HOUR:
+            return {
+                "status": "error",
+                "message": "Slots start on the hour between 10 AM and 5 PM IST. Please pick one of the slots from get_available_slots."
+            }
+
+        # 2. Verify users
+        patient_exists = db.query(User.id).filter(User.id == patient_id, User.role == UserRole.patient).first()
+        doctor_exists = db.query(User.id).filter(User.id == doctor_id, User.role == UserRole.doctor).first()
+        if not doctor_exists:
+            return {"status": "error", "message": "Doctor not found. Please verify the doctor ID."}
+        if not patient_exists:
+            return {"status": "error", "message": "Patient not found. Please verify the patient ID."}
+
+        # 3. Already booked?
+        booked = db.query(Appointment.id).filter(
+            Appointment.doctor_id == doctor_id,
+            Appointment.status == AppointmentStatus.booked,
+            and_(
+                Appointment.start_at < end_at,
+                Appointment.end_at > start_at,
+                Appointment.start_at > start_at - MAX_APPOINTMENT_DURATION
+            )
+        ).first()
+        if booked:
+            db.rollback()
+            return {
+                "status": "conflict",
+                "message": f"The slot starting at {start_at.astimezone(IST).strftime('%I:%M %p')} has just been booked. Please select another time."
+            }
+
+        # 4. Hold it, unless another patient already does
+        expires_at = slot_holds.hold(db, doctor_id, patient_id, start_at, end_at)
+        if expires_at is None:
+            return {
+                "status": "conflict",
+                "message": f"The slot starting at {start_at.astimezone(IST).strftime('%I:%M %p')} is being booked by another patient. Please select another time."
+            }
+
+        return {
+            "status": "held",
+            "start_at": start_at.isoformat(),
+            "held_until": expires_at.astimezone(IST).isoformat(),
+            "message": f"The slot is reserved for {slot_holds.SLOT_HOLD_TTL_SECONDS // 60} minutes. Book it before then."
+        }
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error holding slot for {doctor_id} at {start_at}: {e}")
+        return {"status": "error", "message": "Technical error reserving the slot. You can still try to book it."}
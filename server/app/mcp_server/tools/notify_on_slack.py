@@ -3,6 +3,7 @@ import logging
 from slack_sdk import WebClient
 from slack_sdk.errors import SlackApiError
 from app.db.models import User
+from app.services import resilience
 from sqlalchemy.orm import Session
 from dotenv import load_dotenv
 
@@ -11,6 +12,19 @@ load_dotenv()
 # Set up logging for debugging
 logger = logging.getLogger(__name__)
 
+
+def _classify_slack_error(exc: BaseException) -> str:
+    if isinstance(exc, SlackApiError):
+        status = getattr(exc.response, "status_code", 0) or 0
+        if exc.response.get("error") == "ratelimited" or status >= 500:
+            return resilience.TRANSIENT
+        # users_not_found, invalid_auth, ...: an answer from a healthy Slack
+        return resilience.CLIENT_ERROR
+    return resilience.TRANSIENT
+
+
+SLACK = resilience.dependency("slack", classify=_classify_slack_error)
+
 def notify_on_slack(db: Session, doctor_id: str, report_content: str) -> dict:
     """
     Sends a formatted medical report or appointment summary to a doctor's Slack DM.
@@ -28,18 +42,23 @@ def notify_on_slack(db: Session, doctor_id: str, report_content: str) -> dict:
 
     doctor = db.query(User).filter(User.id == doctor_id, User.role == "doctor").first()
     doctor_email = doctor.email
-    logger.info(f"Doctor email: {doctor_email}")
-    logger.info(f"Report content: {report_content}")
+    # Reports hold patient details: log their size, never their content
+    logger.info(f"Sending Slack report to doctor {doctor_id} ({len(report_content)} chars)")
         
-    client = WebClient(token=token)
+    # SLACK_API_URL lets tests and load runs point at a local Slack stand-in
+    client = WebClient(
+        token=token,
+        base_url=os.getenv("SLACK_API_URL", WebClient.BASE_URL),
+        timeout=int(SLACK.timeout),
+    )
 
     try:
         # 2. Look up the Slack User ID by Email
-        lookup = client.users_lookupByEmail(email=doctor_email)
+        lookup = SLACK.call(lambda: client.users_lookupByEmail(email=doctor_email))
         slack_user_id = lookup["user"]["id"]
 
-        # 3. Send the message
-        client.chat_postMessage(
+        # 3. Send the message (not retried: Slack would post it twice)
+        SLACK.call(lambda: client.chat_postMessage(
             channel=slack_user_id,
             text="🏥 New Clinical Report",
             blocks=[
@@ -56,7 +75,7 @@ def notify_on_slack(db: Session, doctor_id: str, report_content: str) -> dict:
                 },
                 {"type": "divider"}
             ]
-        )
+        ), retries=0)
         
         return {
             "status": "success",
@@ -64,6 +83,13 @@ def notify_on_slack(db: Session, doctor_id: str, report_content: str) -> dict:
             "message": "Report delivered successfully."
         }
 
+    except resilience.DependencyUnavailableError as e:
+        return {
+            "status": "error",
+            "error_type": "unavailable",
+            "message": f"Slack is temporarily unavailable ({e.reason}). Try again in a minute."
+        }
+
     except SlackApiError as e:
         error_code = e.response["error"]
         
@@ -0,0 +1,71 @@
+import io
+import os
+import tempfile
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.responses import FileResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.db.database import SessionLocal
+from app.services.dependencies import require_admin_token
+from app.services.profiling import PROFILE_DIR
+from app.services.user_import import FORMATS, detect_format, import_users
+
+router = APIRouter(prefix="/admin", tags=["Admin"], dependencies=[Depends(require_admin_token)])
+
+# Uploads are spooled to disk past this size instead of held in memory
+SPOOL_MAX_MEMORY = 8 * 1024 * 1024
+
+
+def _run_import(spool, fmt: str) -> dict:
+    with SessionLocal() as db:
+        return import_users(db, spool, fmt).to_dict()
+
+
+@router.post("/users/import")
+async def bulk_import_users(
+    request: Request,
+    format: Optional[str] = Query(None, description="csv or ndjson (default: from Content-Type)"),
+):
+    """
+    Bulk-creates doctors and patients from a CSV or NDJSON request body
+    (columns: full_name, email, role, password or password_hash).
+    Existing emails are skipped. Returns counts and rows per second.
+    """
+    fmt = (format or detect_format(None, request.headers.get("content-type"))).lower()
+    if fmt not in FORMATS:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Unsupported format. Must be one of: {', '.join(FORMATS)}",
+        )
+
+    # 1. Stream the body into a spool file without buffering it all in memory
+    with tempfile.SpooledTemporaryFile(max_size=SPOOL_MAX_MEMORY, mode="w+b") as raw:
+        async for chunk in request.stream():
+            raw.write(chunk)
+        raw.seek(0)
+
+        # 2. Import off the event loop (bcrypt and COPY are blocking)
+        text_stream = io.TextIOWrapper(raw, encoding="utf-8-sig", newline="")
+        try:
+            return await run_in_threadpool(_run_import, text_stream, fmt)
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Body must be UTF-8 encoded")
+
+
+@router.get("/profiles")
+def list_profiles(limit: int = Query(50, ge=1, le=500)):
+    """Most recent request profiles written by the profiling middleware."""
+    if not os.path.isdir(PROFILE_DIR):
+        return {"profiles": []}
+    entries = sorted(os.scandir(PROFILE_DIR), key=lambda e: e.stat().st_mtime, reverse=True)[:limit]
+    return {"profiles": [{"name": e.name, "bytes": e.stat().st_size} for e in entries if e.is_file()]}
+
+
+@router.get("/profiles/{name}")
+def download_profile(name: str):
+    path = os.path.join(PROFILE_DIR, os.path.basename(name))
+    if not os.path.isfile(path):
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Profile not found")
+    return FileResponse(path, filename=os.path.basename(name))
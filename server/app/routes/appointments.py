@@ -0,0 +1,74 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi.responses import StreamingResponse
+
+from app.db.replicas import read_session
+from app.services import serialization
+from app.services.dependencies import require_role
+from app.mcp_server.tools.get_appointments_page import (
+    DEFAULT_PAGE_SIZE,
+    MAX_PAGE_SIZE,
+    InvalidCursorError,
+    decode_cursor,
+    encode_cursor,
+    iter_appointment_rows,
+    parse_date_range,
+)
+
+router = APIRouter(prefix="/doctor/appointments", tags=["Appointments"])
+
+
+def _stream_page(doctor_id: str, start_ist, end_ist, after, limit: int):
+    """
+    Writes the page as JSON while rows come off the database cursor, so neither
+    the full row list nor the full response body is ever held in memory.
+    """
+    with read_session(doctor_id) as db:
+        yield '{"appointments":['
+
+        last = None
+        sent = 0
+        has_more = False
+        for row in iter_appointment_rows(db, doctor_id, start_ist, end_ist, after, limit):
+            if sent == limit:
+                has_more = True
+                break
+            item = {
+                "id": str(row["id"]),
+                "start_at": row["start_at"].isoformat(),
+                "date": row["date"],
+                "time": row["time"],
+                "patient_name": row["patient_name"],
+                "symptoms": row["symptoms"],
+            }
+            yield ("," if sent else "") + serialization.dumps(item)
+            last = row
+            sent += 1
+
+        next_cursor = encode_cursor(last["start_at"], last["id"]) if has_more else None
+        yield f'],"count":{sent},"next_cursor":{serialization.dumps(next_cursor)}}}'
+
+
+@router.get("")
+def list_appointments(
+    start_date: str = Query(..., description="Inclusive start date, YYYY-MM-DD (IST)"),
+    end_date: str = Query(..., description="Inclusive end date, YYYY-MM-DD (IST)"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    current_user=Depends(require_role(["doctor"])),
+):
+    """
+    Keyset-paginated list of the logged-in doctor's booked appointments,
+    ordered by (start_at, id). Memory and response size are bounded by `limit`
+    regardless of how wide the date range is.
+    """
+    try:
+        start_ist, end_ist = parse_date_range(start_date, end_date)
+        after = decode_cursor(cursor) if cursor else None
+    except (ValueError, InvalidCursorError) as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    return StreamingResponse(
+        _stream_page(current_user["id"], start_ist, end_ist, after, limit),
+        media_type="application/json",
+    )
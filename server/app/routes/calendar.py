@@ -0,0 +1,90 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, Response, status
+from sqlalchemy.orm import Session
+
+from app.db.database import get_db
+from app.db.replicas import mark_written, read_session
+from app.services.dependencies import require_role
+from app.services.calendar_feed import (
+    CALENDAR_FEED_MAX_AGE_SECONDS,
+    InvalidFeedTokenError,
+    build_feed,
+    compute_etag,
+    create_feed_token,
+    decode_feed_token,
+    etag_matches,
+    feed_version,
+    feed_window,
+    last_modified,
+    rotate_feed_version,
+    verify_feed_version,
+)
+
+router = APIRouter(prefix="/doctor/calendar", tags=["Calendar"])
+
+
+def _feed_urls(request: Request, doctor_id: str, version: int) -> dict:
+    url = str(request.url_for("calendar_feed").include_query_params(token=create_feed_token(doctor_id, version)))
+    return {"url": url, "webcal_url": "webcal://" + url.split("://", 1)[1]}
+
+
+@router.get("/feed-url")
+def get_feed_url(request: Request, db: Session = Depends(get_db), current_user=Depends(require_role(["doctor"]))):
+    """Subscription URL for the logged-in doctor's calendar feed (add it to Google/Apple/Outlook calendar)."""
+    version = feed_version(db, current_user["id"])
+    if version is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found")
+    return _feed_urls(request, current_user["id"], version)
+
+
+@router.post("/feed-url/rotate")
+def rotate_feed_url(request: Request, db: Session = Depends(get_db), current_user=Depends(require_role(["doctor"]))):
+    """New subscription URL; every URL handed out before stops working at once."""
+    try:
+        version = rotate_feed_version(db, current_user["id"])
+    except InvalidFeedTokenError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Doctor not found")
+    # Feed polls on this worker must not accept the old version from a lagging replica
+    mark_written(current_user["id"])
+    return _feed_urls(request, current_user["id"], version)
+
+
+@router.get("/feed.ics", name="calendar_feed")
+def calendar_feed(
+    token: str = Query(..., description="Feed token from /doctor/calendar/feed-url"),
+    if_none_match: Optional[str] = Header(None),
+):
+    """
+    iCalendar feed of the doctor's appointments. Answers 304 Not Modified when
+    If-None-Match carries the current ETag, which costs a primary key lookup
+    (the token version) and a single index lookup.
+    """
+    try:
+        doctor_id, version = decode_feed_token(token)
+    except InvalidFeedTokenError as e:
+        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+    window = feed_window()
+    with read_session(doctor_id) as db:
+        try:
+            verify_feed_version(db, doctor_id, version)
+        except InvalidFeedTokenError as e:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail=str(e))
+
+        # 1. Validator first: clients polling an unchanged feed stop here
+        etag = compute_etag(doctor_id, last_modified(db, doctor_id), window[0])
+        headers = {
+            "ETag": etag,
+            "Cache-Control": f"private, max-age={CALENDAR_FEED_MAX_AGE_SECONDS}",
+        }
+        if etag_matches(if_none_match, etag):
+            return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+        # 2. Changed (or first fetch): render the whole window
+        body = build_feed(db, doctor_id, window)
+
+    return Response(
+        content=body,
+        media_type="text/calendar; charset=utf-8",
+        headers={**headers, "Content-Disposition": 'inline; filename="appointments.ics"'},
+    )
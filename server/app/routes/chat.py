@@ -1,4 +1,4 @@
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, Header, Query
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.services.dependencies import get_current_user
@@ -18,6 +18,8 @@ class ChatRequest(BaseModel):
     message: str
     messages: List[Dict[str, str]]  # History: [{"role": "user", "content": "..."}]
     user_info: Optional[UserContext] = None
+    # Stable per chat thread; scopes idempotency keys for bookings made in it
+    conversation_id: Optional[str] = None
 
 class SummaryRequest(BaseModel):
     input: str
@@ -26,12 +28,14 @@ class SummaryRequest(BaseModel):
 async def chat_with_agent(
     payload: ChatRequest,
     current_user = Depends(get_current_user),
+    idempotency_key: Optional[str] = Header(None, alias="Idempotency-Key"),
 ):
     result = await run_agent_chat(
         user_message = payload.message,
         history = payload.messages,
         current_user = current_user,
-        user_info = payload.user_info.model_dump() if payload.user_info else None
+        user_info = payload.user_info.model_dump() if payload.user_info else None,
+        conversation_id = idempotency_key or payload.conversation_id,
     )
 
     return result
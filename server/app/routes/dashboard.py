@@ -0,0 +1,39 @@
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, Response, status
+
+from app.db.replicas import read_session
+from app.services.calendar_feed import etag_matches
+from app.services.dashboard import DASHBOARD_CACHE_TTL_SECONDS, get_dashboard
+from app.services.dependencies import require_role
+from app.services.serialization import FastJSONResponse
+
+router = APIRouter(tags=["Dashboard"])
+
+
+def _respond(role: str, user_id: str, if_none_match: Optional[str]):
+    with read_session(user_id) as db:
+        payload, etag = get_dashboard(db, role, user_id)
+
+    # The browser may reuse it for the cache TTL, then revalidates with the ETag
+    headers = {"ETag": etag, "Cache-Control": f"private, max-age={DASHBOARD_CACHE_TTL_SECONDS}"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+    return FastJSONResponse(payload, headers=headers)
+
+
+@router.get("/doctor/dashboard")
+def doctor_dashboard(
+    if_none_match: Optional[str] = Header(None),
+    current_user=Depends(require_role(["doctor"])),
+):
+    """Today's schedule, upcoming counts and the recent symptom mix, from one query."""
+    return _respond("doctor", current_user["id"], if_none_match)
+
+
+@router.get("/patient/dashboard")
+def patient_dashboard(
+    if_none_match: Optional[str] = Header(None),
+    current_user=Depends(require_role(["patient"])),
+):
+    """Next and upcoming visits, visit counts and recent symptoms, from one query."""
+    return _respond("patient", current_user["id"], if_none_match)
@@ -1,14 +1,66 @@
 import os
-import json
+import time
+import logging
+import groq
 from groq import Groq
+from starlette.concurrency import run_in_threadpool
 from app.services.agent.mcp_client import list_tools_from_server, call_mcp_tool
+from app.services.agent import recorder
+from app.services.agent.result_shaping import ResultShaper
+from app.services.agent import tool_args
+from app.services.agent import prefetch
 from app.services.agent.prompts import DOCTOR_PROMPT, PATIENT_PROMPT
+from app.services.idempotency import derive_key
+from app.services import serialization
+from app.services import resilience
+from app.services import profiling
+from app.services import logging_setup
+from app.services import metrics
 from typing import List, Dict, Optional, Any
 from datetime import datetime, timezone, timedelta
 
-# Initialize Groq Client
-client = Groq(api_key=os.getenv("GROQ_API_KEY"))
+
+def _classify_groq_error(exc: BaseException) -> str:
+    if isinstance(exc, (groq.APIConnectionError, groq.RateLimitError, groq.InternalServerError)):
+        return resilience.TRANSIENT
+    if isinstance(exc, (groq.AuthenticationError, groq.PermissionDeniedError)):
+        return resilience.FAILURE
+    if isinstance(exc, groq.APIStatusError):
+        return resilience.TRANSIENT if exc.status_code >= 500 else resilience.CLIENT_ERROR
+    return resilience.TRANSIENT
+
+
+logger = logging.getLogger(__name__)
+
+GROQ = resilience.dependency("groq", classify=_classify_groq_error)
+
+# Initialize Groq Client; retries and timeouts are owned by GROQ (app/services/resilience.py)
+client = Groq(api_key=os.getenv("GROQ_API_KEY"), timeout=GROQ.timeout, max_retries=0)
 MODEL = "llama-3.3-70b-versatile"
+UNAVAILABLE_ANSWER = "The assistant is temporarily unavailable. Please try again in a minute."
+
+# Side-effecting tools get an idempotency key derived from the conversation and
+# the arguments that identify the request, so a repeated call (model re-issuing
+# it in a later iteration, or a retried HTTP request) returns the first result.
+IDEMPOTENT_TOOLS = {
+    "book_new_appointment": ("doctor_id", "patient_id", "start_at"),
+}
+# Tools told who is asking: slot lookups treat the user's own holds as theirs,
+# and holds are always placed for the signed-in patient, never a model-chosen ID
+REQUESTER_TOOLS = {"get_available_slots", "hold_slot"}
+# Tool parameters filled in by the agent and never shown to the model
+HIDDEN_TOOL_PARAMS = {"idempotency_key", "requester_id"}
+
+
+def _is_error_result(readable_result: str) -> bool:
+    # Tools report failures as {"status": "error", ...}
+    if '"error"' not in readable_result:
+        return False
+    try:
+        result = serialization.loads(readable_result)
+    except ValueError:
+        return False
+    return isinstance(result, dict) and result.get("status") == "error"
 
 
 def map_mcp_to_groq_tool(mcp_tool: Any) -> Dict[str, Any]:
@@ -17,8 +69,19 @@ def map_mcp_to_groq_tool(mcp_tool: Any) -> Dict[str, Any]:
     """
     name = getattr(mcp_tool, "name", "unknown")
     description = getattr(mcp_tool, "description", "")
-    # FastMCP uses '.parameters' for the JSON schema
-    parameters = getattr(mcp_tool, "parameters", {"type": "object", "properties": {}})
+    # FastMCP tools use '.parameters' for the JSON schema; MCP protocol tools
+    # (listed over HTTP) carry the same schema as '.inputSchema'
+    parameters = (
+        getattr(mcp_tool, "parameters", None)
+        or getattr(mcp_tool, "inputSchema", None)
+        or {"type": "object", "properties": {}}
+    )
+    if HIDDEN_TOOL_PARAMS & set(parameters.get("properties", {})):
+        parameters = {
+            **parameters,
+            "properties": {k: v for k, v in parameters["properties"].items() if k not in HIDDEN_TOOL_PARAMS},
+            "required": [r for r in parameters.get("required", []) if r not in HIDDEN_TOOL_PARAMS],
+        }
 
     return {
         "type": "function",
@@ -35,9 +98,38 @@ async def run_agent_chat(
     history: List[Dict[str, str]],
     current_user: Dict[str, Any],
     user_info: Optional[Dict[str, Any]],
+    conversation_id: Optional[str] = None,
+):
+    # Record hook (see recorder.py); None in normal operation. Closed (written)
+    # even when the turn fails, so failing conversations can be replayed too.
+    recording = recorder.start_recording({
+        "user_message": user_message,
+        "history": history,
+        "current_user": current_user,
+        "user_info": user_info,
+    })
+    try:
+        return await _run_agent_chat(user_message, history, current_user, user_info, conversation_id, recording)
+    finally:
+        if recording:
+            recording.close()
+
+
+async def _run_agent_chat(
+    user_message: str,
+    history: List[Dict[str, str]],
+    current_user: Dict[str, Any],
+    user_info: Optional[Dict[str, Any]],
+    conversation_id: Optional[str],
+    recording: Optional[recorder.ConversationRecorder],
 ):
+    logging_setup.bind_conversation(conversation_id)
+
     # 1. Identity & Time Extraction
     user_id = current_user.get("id")
+    # Scope for idempotency keys; without a client-supplied id, repeats are
+    # deduplicated per user within the key TTL
+    idempotency_scope = conversation_id or f"user:{user_id}"
     user_role = current_user.get("role")
     user_name = user_info.get("user_name", "User") if user_info else "User"
 
@@ -47,13 +139,17 @@ async def run_agent_chat(
 
     DOCTOR_TOOLS = [
         "get_doctor_appointments_by_date_range",
+        "get_doctor_appointments_paginated",
         "search_appointments_by_symptom_keyword",
+        "find_similar_cases",
+        "get_appointment_stats",
         "send_summary_report_to_slack",
     ]
     PATIENT_TOOLS = [
         "get_doctors",
         "find_doctor",
         "get_available_slots",
+        "hold_slot",
         "book_new_appointment",
     ]
 
@@ -84,18 +180,55 @@ async def run_agent_chat(
     max_iterations = 5
     response_text = ""
 
+    # Tool name -> parameter schema, for checking arguments before dispatch
+    tool_schemas = {t["function"]["name"]: t["function"]["parameters"] for t in available_tools}
+    # Set when a tool call of the previous iteration failed; an iteration that
+    # follows one is a retry, recorded per turn in metrics.AGENT_TURNS
+    had_tool_error = False
+    retried = False
+
+    # Replay hook (see recorder.py); None in normal operation
+    replay = recorder.current_replay()
+    trace = replay or recording
+    # Patient flow only; replays measure the tool layer without speculative calls
+    prefetching = prefetch.ENABLED and not replay and prefetch.SLOTS_TOOL in tool_schemas
+
+    # Compacts tool results for the prompt and maps ID aliases back in arguments;
+    # aliases are per user, so they still resolve in the user's next request
+    shaper = ResultShaper(f"user:{user_id}")
+
     for i in range(max_iterations):
+        retried = retried or had_tool_error
+        had_tool_error = False
+        profiling.step(f"agent.iteration {i + 1}")
         tool_params = (
             {"tools": available_tools, "tool_choice": "auto"} if available_tools else {}
         )
 
-        response = client.chat.completions.create(
-            model=MODEL, messages=messages, temperature=0.1, **tool_params
-        )
+        llm_started = time.perf_counter()
+        if replay:
+            response = replay.next_completion()
+        else:
+            try:
+                # Off the event loop, so a slow completion does not stall other requests
+                with profiling.span("groq.completion"):
+                    response = await run_in_threadpool(
+                        GROQ.call,
+                        lambda: client.chat.completions.create(
+                            model=MODEL, messages=messages, temperature=0.1, **tool_params
+                        ),
+                    )
+            except resilience.DependencyUnavailableError as e:
+                logger.warning(f"⚠️ Groq unavailable: {e}")
+                response_text = UNAVAILABLE_ANSWER
+                break
 
         response_message = response.choices[0].message
         tool_calls = response_message.tool_calls
 
+        if trace:
+            trace.llm(response_message, (time.perf_counter() - llm_started) * 1000, len(messages))
+
         if response_message.content:
             response_text = response_message.content
 
@@ -108,13 +241,56 @@ async def run_agent_chat(
         for tool_call in tool_calls:
             function_name = tool_call.function.name
             args_str = tool_call.function.arguments or "{}"
-            function_args = json.loads(args_str)
+            try:
+                function_args = serialization.loads(args_str)
+            except ValueError:
+                # Truncated or invalid JSON: reported below as missing arguments
+                function_args = {}
             if not isinstance(function_args, dict):
                 function_args = {}
+            function_args = shaper.expand_args(function_args)
+
+            # Repair what can be repaired here instead of spending a round
+            # trip on the tool's error; only the rest goes back to the model
+            if tool_args.ENABLED:
+                if function_name not in tool_schemas:
+                    rejection = f"Error: unknown tool {function_name}"
+                else:
+                    checked = tool_args.check_tool_args(function_name, function_args, tool_schemas[function_name], now_ist)
+                    function_args = checked.arguments
+                    rejection = None if checked.ok else checked.error_message(function_name)
+                if rejection:
+                    had_tool_error = True
+                    if trace:
+                        trace.tool(function_name, function_args, rejection, 0.0, ok=False)
+                    messages.append(
+                        {
+                            "tool_call_id": tool_call.id,
+                            "role": "tool",
+                            "name": function_name,
+                            "content": rejection,
+                        }
+                    )
+                    continue
+
+            call_args = function_args
+            if function_name in IDEMPOTENT_TOOLS:
+                call_args = {
+                    **function_args,
+                    "idempotency_key": derive_key(
+                        idempotency_scope, function_name, function_args, IDEMPOTENT_TOOLS[function_name]
+                    ),
+                }
+            if function_name in REQUESTER_TOOLS:
+                call_args = {**call_args, "requester_id": str(user_id)}
 
+            tool_started = time.perf_counter()
             try:
-                print(f"🛠️ Tool calling: {function_name}")
-                mcp_result = await call_mcp_tool(function_name, function_args)
+                logger.info(f"🛠️ Tool calling: {function_name}")
+                with profiling.span(f"tool:{function_name}"):
+                    mcp_result = await prefetch.take(idempotency_scope, function_name, call_args) if prefetching else None
+                    if mcp_result is None:
+                        mcp_result = await call_mcp_tool(function_name, call_args)
 
                 # Extract text from FastMCP result content list
                 if hasattr(mcp_result, "content"):
@@ -125,18 +301,33 @@ async def run_agent_chat(
                         ]
                     )
                 else:
-                    readable_result = json.dumps(mcp_result)
+                    readable_result = serialization.dumps(mcp_result)
+
+                if _is_error_result(readable_result):
+                    had_tool_error = True
+                if prefetching:
+                    # Slots for a just-identified doctor load during the next LLM call
+                    doctor_id = prefetch.unambiguous_doctor(function_name, readable_result)
+                    if doctor_id:
+                        prefetch.schedule(idempotency_scope, doctor_id, now_ist.date(), str(user_id))
+                    elif function_name == "book_new_appointment":
+                        prefetch.forget_doctor(idempotency_scope, call_args.get("doctor_id"))
+                if trace:
+                    trace.tool(function_name, function_args, readable_result, (time.perf_counter() - tool_started) * 1000)
 
                 messages.append(
                     {
                         "tool_call_id": tool_call.id,
                         "role": "tool",
                         "name": function_name,
-                        "content": readable_result,
+                        "content": shaper.shape(function_name, readable_result),
                     }
                 )
             except Exception as e:
-                print(f"❌ Tool Error: {e}")
+                logger.warning(f"❌ Tool {function_name} failed: {e}")
+                had_tool_error = True
+                if trace:
+                    trace.tool(function_name, function_args, f"Error: {str(e)}", (time.perf_counter() - tool_started) * 1000, ok=False)
                 messages.append(
                     {
                         "tool_call_id": tool_call.id,
@@ -146,4 +337,7 @@ async def run_agent_chat(
                     }
                 )
 
+    profiling.step(None)
+
+    metrics.AGENT_TURNS.labels("true" if retried else "false").inc()
     return {"answer": response_text}
@@ -1,6 +1,142 @@
-import sys
-from typing import List, Dict, Any
-from app.mcp_server.server import mcp
+import os
+import time
+import logging
+import random
+import asyncio
+from contextlib import AsyncExitStack
+from typing import List, Dict, Any, Optional
+
+logger = logging.getLogger(__name__)
+
+# -------- CONFIG --------
+# inprocess: call the FastMCP tool manager directly (default, single process)
+# http:      call separately deployed MCP servers over streamable HTTP
+MCP_TRANSPORT = os.getenv("MCP_TRANSPORT", "inprocess").lower()
+MCP_SERVER_URLS = [u.strip() for u in os.getenv("MCP_SERVER_URLS", "http://127.0.0.1:8001/mcp").split(",") if u.strip()]
+# Shared secret sent as X-MCP-Token; must match the tool servers' MCP_SERVER_TOKEN
+MCP_SERVER_TOKEN = os.getenv("MCP_SERVER_TOKEN", "")
+# Persistent client sessions kept open per server URL
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "4"))
+MCP_CALL_TIMEOUT_SECONDS = float(os.getenv("MCP_CALL_TIMEOUT_SECONDS", "30"))
+# Tool definitions rarely change; avoid a list_tools round-trip per chat request
+MCP_TOOLS_CACHE_SECONDS = float(os.getenv("MCP_TOOLS_CACHE_SECONDS", "300"))
+# How long a failing server is skipped before being tried again
+MCP_UNHEALTHY_COOLDOWN_SECONDS = float(os.getenv("MCP_UNHEALTHY_COOLDOWN_SECONDS", "10"))
+
+
+class _PooledSession:
+    def __init__(self, url: str, client):
+        self.url = url
+        self.client = client
+        self.in_flight = 0
+
+
+class MCPClientPool:
+    """
+    Persistent fastmcp client sessions to one or more MCP server instances.
+    Each call goes to the least busy session on a healthy instance; an instance
+    that fails to connect is skipped for a cooldown period.
+    """
+
+    def __init__(self, urls: List[str], size_per_url: int):
+        self.urls = urls
+        self.size_per_url = max(1, size_per_url)
+        self._sessions: List[_PooledSession] = []
+        self._unhealthy_until: Dict[str, float] = {}
+        self._stack: Optional[AsyncExitStack] = None
+        self._tools_cache: Optional[List[Any]] = None
+        self._tools_cached_at = 0.0
+
+    async def start(self):
+        from fastmcp import Client
+        from fastmcp.client.transports import StreamableHttpTransport
+
+        if not MCP_SERVER_TOKEN:
+            logger.warning("⚠️ MCP_SERVER_TOKEN is not set; the MCP servers will refuse tool calls")
+        headers = {"X-MCP-Token": MCP_SERVER_TOKEN}
+        self._stack = AsyncExitStack()
+        for url in self.urls:
+            for _ in range(self.size_per_url):
+                client = Client(StreamableHttpTransport(url, headers=headers), timeout=MCP_CALL_TIMEOUT_SECONDS)
+                try:
+                    await self._stack.enter_async_context(client)
+                    self._sessions.append(_PooledSession(url, client))
+                except Exception as e:
+                    logger.error(f"❌ Could not connect to MCP server {url}: {e}")
+                    self._mark_unhealthy(url)
+                    break
+        if not self._sessions:
+            raise RuntimeError(f"No MCP server reachable at {', '.join(self.urls)}")
+
+    async def close(self):
+        if self._stack:
+            await self._stack.aclose()
+        self._sessions = []
+
+    def _mark_unhealthy(self, url: str):
+        self._unhealthy_until[url] = time.monotonic() + MCP_UNHEALTHY_COOLDOWN_SECONDS
+
+    def _pick(self, exclude_url: Optional[str] = None) -> _PooledSession:
+        now = time.monotonic()
+        healthy = [
+            s for s in self._sessions
+            if self._unhealthy_until.get(s.url, 0) <= now and s.url != exclude_url
+        ]
+        candidates = healthy or [s for s in self._sessions if s.url != exclude_url] or self._sessions
+        least = min(s.in_flight for s in candidates)
+        return random.choice([s for s in candidates if s.in_flight == least])
+
+    async def _run(self, method: str, *args, retry_on_connect_error: bool = True):
+        import httpx
+
+        session = self._pick()
+        session.in_flight += 1
+        try:
+            return await getattr(session.client, method)(*args)
+        except (httpx.ConnectError, httpx.ConnectTimeout) as e:
+            # The request never reached the server, so trying another instance is safe
+            self._mark_unhealthy(session.url)
+            if not retry_on_connect_error or len(set(self.urls)) < 2:
+                raise
+            logger.warning(f"⚠️ MCP server {session.url} unreachable ({e}); retrying on another instance")
+            fallback = self._pick(exclude_url=session.url)
+            fallback.in_flight += 1
+            try:
+                return await getattr(fallback.client, method)(*args)
+            finally:
+                fallback.in_flight -= 1
+        finally:
+            session.in_flight -= 1
+
+    async def list_tools(self) -> List[Any]:
+        if self._tools_cache is None or time.monotonic() - self._tools_cached_at > MCP_TOOLS_CACHE_SECONDS:
+            self._tools_cache = await self._run("list_tools")
+            self._tools_cached_at = time.monotonic()
+        return self._tools_cache
+
+    async def call_tool(self, tool_name: str, arguments: Dict[str, Any]):
+        return await self._run("call_tool", tool_name, arguments)
+
+
+_pool: Optional[MCPClientPool] = None
+_pool_lock = asyncio.Lock()
+
+
+async def _get_pool() -> MCPClientPool:
+    global _pool
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                pool = MCPClientPool(MCP_SERVER_URLS, MCP_POOL_SIZE)
+                await pool.start()
+                _pool = pool
+    return _pool
+
+
+def _local_mcp():
+    # Imported lazily so the HTTP mode does not load tools or the DB layer here
+    from app.mcp_server.server import mcp
+    return mcp
 
 
 async def list_tools_from_server() -> List[Any]:
@@ -8,29 +144,41 @@ async def list_tools_from_server() -> List[Any]:
     to get tools from a FastMCP instance
     """
     try:
-        tools_dict = await mcp._tool_manager.get_tools()
+        if MCP_TRANSPORT == "http":
+            return await (await _get_pool()).list_tools()
+        tools_dict = await _local_mcp()._tool_manager.get_tools()
         return list(tools_dict.values())
     except Exception as e:
-        sys.stderr.write(f"❌ Tool Listing Error: {e}\n")
+        logger.error(f"❌ Tool Listing Error: {e}")
         return []
 
 
 async def call_mcp_tool(tool_name: str, arguments: Dict[str, Any]):
     """
-    Direct call to FastMCP tool execution.
+    Executes a tool in-process, or on a remote MCP server in http mode.
     """
     try:
-        return await mcp._tool_manager.call_tool(tool_name, arguments)
+        if MCP_TRANSPORT == "http":
+            return await (await _get_pool()).call_tool(tool_name, arguments)
+        return await _local_mcp()._tool_manager.call_tool(tool_name, arguments)
     except Exception as e:
-        sys.stderr.write(f"❌ Error calling tool {tool_name}: {e}\n")
+        logger.warning(f"❌ Error calling tool {tool_name}: {e}")
         raise
 
 
 async def init_mcp():
     """Lifecycle hook for FastAPI startup"""
-    print("✅ MCP Tools initialized In-Process")
+    if MCP_TRANSPORT == "http":
+        pool = await _get_pool()
+        logger.info(f"✅ MCP client pool connected: {len(pool._sessions)} sessions to {', '.join(MCP_SERVER_URLS)}")
+    else:
+        logger.info("✅ MCP Tools initialized In-Process")
 
 
 async def shutdown_mcp():
     """Lifecycle hook for FastAPI shutdown"""
-    print("🛑 MCP Session Closed")
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
+    logger.info("🛑 MCP Session Closed")
@@ -0,0 +1,146 @@
+"""
+Speculative availability prefetch for the patient flow.
+
+Once find_doctor (or get_doctors) has returned exactly one doctor, the model
+almost always asks for that doctor's slots on its next iteration. Instead of
+waiting for that LLM round trip, the agent starts get_available_slots for the
+next AGENT_PREFETCH_DAYS days in the background (through the same MCP tool
+path as any other call) and keeps the results per conversation. When the
+model then asks for one of those days, the prefetched result is returned,
+or awaited if it is still running.
+
+Prefetching only ever reads. At most AGENT_PREFETCH_MAX_IN_FLIGHT prefetch
+calls run at once per process; when the cap is reached, new prefetches are
+skipped, not queued. Results expire after AGENT_PREFETCH_TTL_SECONDS and a
+booking in the conversation drops that doctor's entries, so a result served
+from here is at most that old; the booking tool re-checks overlaps anyway.
+"""
+import os
+import time
+import asyncio
+import logging
+from collections import OrderedDict
+from datetime import date, timedelta
+from typing import Any, Dict, Optional, Tuple
+
+from app.services import metrics, serialization
+from app.services.agent.mcp_client import call_mcp_tool
+
+logger = logging.getLogger(__name__)
+
+# -------- CONFIG --------
+ENABLED = os.getenv("AGENT_PREFETCH_AVAILABILITY", "true").lower() == "true"
+# Days fetched, starting today (IST)
+PREFETCH_DAYS = int(os.getenv("AGENT_PREFETCH_DAYS", "3"))
+PREFETCH_MAX_IN_FLIGHT = int(os.getenv("AGENT_PREFETCH_MAX_IN_FLIGHT", "4"))
+PREFETCH_TTL_SECONDS = float(os.getenv("AGENT_PREFETCH_TTL_SECONDS", "60"))
+PREFETCH_MAX_CONVERSATIONS = int(os.getenv("AGENT_PREFETCH_MAX_CONVERSATIONS", "1000"))
+
+SLOTS_TOOL = "get_available_slots"
+DOCTOR_TOOLS = {"find_doctor", "get_doctors"}
+
+# conversation scope -> {(doctor_id, date_str): (expires_at, task)}
+_Entries = Dict[Tuple[str, str], Tuple[float, asyncio.Task]]
+_conversations: "OrderedDict[str, _Entries]" = OrderedDict()
+_in_flight = 0
+
+
+def unambiguous_doctor(tool_name: str, readable_result: str) -> Optional[str]:
+    """The doctor ID when a doctor lookup returned exactly one doctor."""
+    if tool_name not in DOCTOR_TOOLS:
+        return None
+    try:
+        result = serialization.loads(readable_result)
+    except ValueError:
+        return None
+    if not isinstance(result, dict) or result.get("status") != "success":
+        return None
+    doctors = result.get("doctors") or []
+    if len(doctors) != 1:
+        return None
+    return str(doctors[0].get("id") or "").lower() or None
+
+
+def _entries(scope: str) -> _Entries:
+    entries = _conversations.get(scope)
+    if entries is None:
+        if len(_conversations) >= PREFETCH_MAX_CONVERSATIONS:
+            # Least recently used conversation first
+            _, dropped = _conversations.popitem(last=False)
+            for _, task in dropped.values():
+                task.cancel()
+        entries = _conversations[scope] = {}
+    else:
+        _conversations.move_to_end(scope)
+    return entries
+
+
+async def _fetch(doctor_id: str, date_str: str, requester_id: str):
+    return await call_mcp_tool(SLOTS_TOOL, {"doctor_id": doctor_id, "date_str": date_str, "requester_id": requester_id})
+
+
+def _done(task: asyncio.Task):
+    # Runs for cancelled tasks too, including ones cancelled before they started
+    global _in_flight
+    _in_flight -= 1
+    # Retrieve the exception so a failed prefetch is not reported as unhandled
+    if not task.cancelled() and task.exception() is not None:
+        metrics.AGENT_PREFETCH.labels("failed").inc()
+        logger.info(f"Availability prefetch failed: {task.exception()}")
+
+
+def schedule(scope: str, doctor_id: str, today: date, requester_id: str):
+    """Starts background slot lookups for doctor_id from today on; never blocks."""
+    global _in_flight
+    entries = _entries(scope)
+    now = time.monotonic()
+    for offset in range(PREFETCH_DAYS):
+        key = (doctor_id, (today + timedelta(days=offset)).isoformat())
+        current = entries.get(key)
+        if current is not None and current[0] > now:
+            continue
+        if _in_flight >= PREFETCH_MAX_IN_FLIGHT:
+            metrics.AGENT_PREFETCH.labels("skipped").inc()
+            continue
+        _in_flight += 1
+        task = asyncio.create_task(_fetch(*key, requester_id))
+        task.add_done_callback(_done)
+        entries[key] = (now + PREFETCH_TTL_SECONDS, task)
+        metrics.AGENT_PREFETCH.labels("started").inc()
+
+
+async def take(scope: str, tool_name: str, arguments: Dict[str, Any]) -> Optional[Any]:
+    """
+    The prefetched result for this slots call, waiting for it if still
+    running; None when there is none (or it failed), so the caller calls the tool.
+    """
+    if tool_name != SLOTS_TOOL or scope not in _conversations:
+        return None
+    key = (str(arguments.get("doctor_id", "")).lower(), str(arguments.get("date_str", "")))
+    entry = _conversations[scope].pop(key, None)
+    if entry is None:
+        return None
+    expires_at, task = entry
+    if expires_at <= time.monotonic():
+        task.cancel()
+        return None
+    in_flight = not task.done()
+    try:
+        result = await asyncio.shield(task)
+    except asyncio.CancelledError:
+        if task.cancelled():
+            return None
+        raise
+    except Exception:
+        return None
+    metrics.AGENT_PREFETCH.labels("hit_in_flight" if in_flight else "hit").inc()
+    return result
+
+
+def forget_doctor(scope: str, doctor_id: Optional[str]):
+    """Drops a conversation's prefetched days for a doctor (after it booked with them)."""
+    entries = _conversations.get(scope)
+    if not entries or not doctor_id:
+        return
+    for key in [k for k in entries if k[0] == str(doctor_id).lower()]:
+        entries.pop(key)[1].cancel()
@@ -0,0 +1,161 @@
+"""
+Record/replay of agent conversations.
+
+Recording (AGENT_RECORD_DIR=/path): every run_agent_chat call writes one gzipped
+JSON-lines file with the conversation input, each LLM response and each MCP tool
+call (arguments, result, duration). Requests to the LLM are not stored in full,
+only their size, which keeps files small. Recordings contain patient data;
+enable this only on test or staging environments.
+
+Replay (benchmarks/replay.py): the recorded LLM turns are fed back in order while
+the real tools run against a database, so tool-layer cost can be measured and
+compared between commits without LLM latency or nondeterminism.
+"""
+import gzip
+import hashlib
+import json
+import os
+import time
+import uuid
+from contextlib import contextmanager
+from contextvars import ContextVar
+from types import SimpleNamespace
+from typing import Any, Dict, Iterator, List, Optional
+
+import logging
+logger = logging.getLogger(__name__)
+
+RECORD_DIR = os.getenv("AGENT_RECORD_DIR")
+FORMAT_VERSION = 1
+
+
+def _digest(text: str) -> str:
+    return hashlib.sha1((text or "").encode()).hexdigest()[:16]
+
+
+def serialize_message(message: Any) -> Dict[str, Any]:
+    """Keeps only what the agent loop reads from an LLM response message."""
+    return {
+        "content": getattr(message, "content", None),
+        "tool_calls": [
+            {"id": tc.id, "name": tc.function.name, "arguments": tc.function.arguments}
+            for tc in (getattr(message, "tool_calls", None) or [])
+        ],
+    }
+
+
+class ConversationRecorder:
+    """Appends conversation events to <AGENT_RECORD_DIR>/<time>-<id>.jsonl.gz."""
+
+    def __init__(self, directory: str, meta: Dict[str, Any]):
+        os.makedirs(directory, exist_ok=True)
+        name = f"{time.strftime('%Y%m%dT%H%M%S')}-{uuid.uuid4().hex[:8]}.jsonl.gz"
+        self.path = os.path.join(directory, name)
+        self._events: List[Dict[str, Any]] = [{"type": "meta", "version": FORMAT_VERSION, **meta}]
+
+    def llm(self, message: Any, duration_ms: float, prompt_messages: int) -> None:
+        self._events.append({
+            "type": "llm",
+            "ms": round(duration_ms, 2),
+            "prompt_messages": prompt_messages,
+            "message": serialize_message(message),
+        })
+
+    def tool(self, name: str, arguments: Dict[str, Any], result: str, duration_ms: float, ok: bool = True) -> None:
+        self._events.append({
+            "type": "tool",
+            "name": name,
+            "arguments": arguments,
+            "ms": round(duration_ms, 2),
+            "ok": ok,
+            "result": result,
+            "result_digest": _digest(result),
+        })
+
+    def close(self) -> None:
+        # Written once at the end so recording adds no I/O inside the agent loop
+        try:
+            with gzip.open(self.path, "wt", encoding="utf-8") as f:
+                for event in self._events:
+                    f.write(json.dumps(event, default=str, separators=(",", ":")) + "\n")
+        except Exception as e:
+            logger.warning(f"Could not write conversation recording {self.path}: {e}")
+
+
+def start_recording(meta: Dict[str, Any]) -> Optional[ConversationRecorder]:
+    """Returns a recorder when AGENT_RECORD_DIR is set and no replay is active."""
+    if not RECORD_DIR or current_replay() is not None:
+        return None
+    return ConversationRecorder(RECORD_DIR, meta)
+
+
+def load_recording(path: str) -> Dict[str, Any]:
+    with gzip.open(path, "rt", encoding="utf-8") as f:
+        events = [json.loads(line) for line in f if line.strip()]
+    if not events or events[0].get("type") != "meta":
+        raise ValueError(f"{path} is not a conversation recording")
+    return {"path": path, "meta": events[0], "events": events[1:]}
+
+
+def iter_recordings(paths: List[str]) -> Iterator[Dict[str, Any]]:
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if name.endswith(".jsonl.gz"):
+                    yield load_recording(os.path.join(path, name))
+        else:
+            yield load_recording(path)
+
+
+# -------- REPLAY --------
+def _as_completion(message: Dict[str, Any]) -> Any:
+    """Rebuilds the attribute shape of a Groq ChatCompletion from a recorded message."""
+    tool_calls = [
+        SimpleNamespace(id=tc["id"], type="function", function=SimpleNamespace(name=tc["name"], arguments=tc["arguments"]))
+        for tc in message.get("tool_calls") or []
+    ] or None
+    msg = SimpleNamespace(role="assistant", content=message.get("content"), tool_calls=tool_calls)
+    return SimpleNamespace(choices=[SimpleNamespace(message=msg)])
+
+
+class ReplaySession:
+    """Serves recorded LLM turns in order and collects timings of the real tool calls."""
+
+    def __init__(self, recording: Dict[str, Any]):
+        self.recording = recording
+        self._turns = [e["message"] for e in recording["events"] if e["type"] == "llm"]
+        self._expected = [e for e in recording["events"] if e["type"] == "tool"]
+        self.tool_timings: List[Dict[str, Any]] = []
+        self.divergent_results = 0
+
+    def next_completion(self) -> Any:
+        if not self._turns:
+            # The live conversation ran longer than the recording: end it
+            return _as_completion({"content": "", "tool_calls": []})
+        return _as_completion(self._turns.pop(0))
+
+    def llm(self, message: Any, duration_ms: float, prompt_messages: int) -> None:
+        pass
+
+    def tool(self, name: str, arguments: Dict[str, Any], result: str, duration_ms: float, ok: bool = True) -> None:
+        index = len(self.tool_timings)
+        expected = self._expected[index] if index < len(self._expected) else None
+        if expected is None or expected["result_digest"] != _digest(result):
+            self.divergent_results += 1
+        self.tool_timings.append({"name": name, "ms": duration_ms, "ok": ok})
+
+
+_replay: ContextVar[Optional[ReplaySession]] = ContextVar("agent_replay", default=None)
+
+
+def current_replay() -> Optional[ReplaySession]:
+    return _replay.get()
+
+
+@contextmanager
+def replaying(session: ReplaySession):
+    token = _replay.set(session)
+    try:
+        yield session
+    finally:
+        _replay.reset(token)
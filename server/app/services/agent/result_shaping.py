@@ -0,0 +1,234 @@
+"""
+Compact encodings for tool results before they enter the LLM message list.
+
+Every tool result is re-sent to the model on each later iteration, so the
+verbose dicts the tools return (which stay unchanged for other callers) are
+reshaped here per tool:
+  - row lists become columnar tables: {"cols": [...], "rows": [[...], ...]}
+  - fields derivable from others are dropped (slot 'time'/'display', prose 'summary')
+  - UUIDs are replaced by short aliases (D1, P1, A1) and expanded back to
+    UUIDs in tool arguments before dispatch
+Unknown tools and non-JSON results pass through untouched.
+
+Aliases are kept per user for AGENT_ALIAS_TTL_SECONDS after their last use,
+not per request: a booking spans several chat requests, and the model may
+reuse "D1" from an earlier turn's answer. They live in this process, so with
+several API workers a turn that lands on another worker will not recognise
+older aliases, and the argument checker asks the model for the full ID.
+"""
+import os
+import re
+import time
+import threading
+import logging
+from collections import OrderedDict
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.services import serialization
+
+logger = logging.getLogger(__name__)
+
+ENABLED = os.getenv("AGENT_COMPACT_TOOL_RESULTS", "true").lower() == "true"
+ALIAS_TTL_SECONDS = float(os.getenv("AGENT_ALIAS_TTL_SECONDS", "3600"))
+ALIAS_MAX_USERS = int(os.getenv("AGENT_ALIAS_MAX_USERS", "10000"))
+
+UUID_RE = re.compile(r"^[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}$")
+ALIAS_RE = re.compile(r"^[A-Z]\d+$")
+_TOKEN_RE = re.compile(r"[A-Za-z]+|\d+|[^\sA-Za-z\d]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Cheap BPE-like estimate: each run of letters costs about one token per 4
+    characters, digit runs one per 3, punctuation one each. Accurate enough to
+    compare encodings, without loading a tokenizer.
+    """
+    total = 0
+    for tok in _TOKEN_RE.findall(text or ""):
+        if tok[0].isalpha():
+            total += -(-len(tok) // 4)
+        elif tok[0].isdigit():
+            total += -(-len(tok) // 3)
+        else:
+            total += 1
+    return total
+
+
+def _dumps(data: Any) -> str:
+    return serialization.dumps(data)
+
+
+class IdAliases:
+    """Per-user two-way map between UUIDs and short aliases."""
+
+    def __init__(self):
+        self._by_id: Dict[str, str] = {}
+        self._by_alias: Dict[str, str] = {}
+        self._counters: Dict[str, int] = {}
+
+    def alias(self, value: Any, prefix: str) -> Any:
+        if not isinstance(value, str) or not UUID_RE.match(value):
+            return value
+        key = value.lower()
+        if key not in self._by_id:
+            self._counters[prefix] = self._counters.get(prefix, 0) + 1
+            short = f"{prefix}{self._counters[prefix]}"
+            self._by_id[key] = short
+            self._by_alias[short] = value
+        return self._by_id[key]
+
+    def expand(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return {
+            k: self._by_alias.get(v, v) if isinstance(v, str) and ALIAS_RE.match(v) else v
+            for k, v in arguments.items()
+        }
+
+
+def _table(rows: List[Dict[str, Any]], cols: List[str], transform: Dict[str, Callable] = None) -> Dict[str, Any]:
+    transform = transform or {}
+    return {
+        "cols": cols,
+        "rows": [[transform.get(c, lambda v: v)(row.get(c)) for c in cols] for row in rows],
+    }
+
+
+def _drop_empty(data: Dict[str, Any], *keys: str) -> Dict[str, Any]:
+    return {k: v for k, v in data.items() if v is not None and k not in keys}
+
+
+# -------- PER-TOOL ENCODERS --------
+def _doctors(data: dict, aliases: IdAliases) -> dict:
+    if "doctors" in data:
+        data["doctors"] = _table(data["doctors"], ["id", "full_name"], {"id": lambda v: aliases.alias(v, "D")})
+    return _drop_empty(data)
+
+
+def _slots(data: dict, aliases: IdAliases) -> dict:
+    # 'time' and 'display' are derivable from iso_start, which booking needs verbatim
+    if data.get("slots"):
+        data["slots"] = [s["iso_start"] for s in data["slots"]]
+    return _drop_empty(data, "summary") if data.get("slots") else _drop_empty(data)
+
+
+def _booking(data: dict, aliases: IdAliases) -> dict:
+    if "appointment_id" in data:
+        data["appointment_id"] = aliases.alias(str(data["appointment_id"]), "A")
+    return _drop_empty(data)
+
+
+def _schedule(data: dict, aliases: IdAliases) -> dict:
+    schedule = data.get("schedule")
+    if schedule:
+        cols = ["time", "patient_name", "symptoms"]
+        data["schedule"] = {"cols": cols, "days": {day: _table(items, cols)["rows"] for day, items in schedule.items()}}
+    return _drop_empty(data, "summary") if schedule else _drop_empty(data)
+
+
+def _symptom_results(data: dict, aliases: IdAliases) -> dict:
+    if data.get("results"):
+        data["results"] = _table(data["results"], ["date", "time", "patient_name", "symptoms"])
+        return _drop_empty(data, "summary")
+    return _drop_empty(data)
+
+
+def _similar_cases(data: dict, aliases: IdAliases) -> dict:
+    if data.get("results"):
+        data["results"] = _table(
+            data["results"], ["appointment_id", "date", "time", "patient_name", "symptoms", "score"],
+            {"appointment_id": lambda v: aliases.alias(v, "A")},
+        )
+        return _drop_empty(data, "summary")
+    return _drop_empty(data)
+
+
+def _appointment_page(data: dict, aliases: IdAliases) -> dict:
+    if data.get("appointments"):
+        data["appointments"] = _table(data["appointments"], ["date", "time", "patient_name", "symptoms"])
+    return _drop_empty(data)
+
+
+ENCODERS: Dict[str, Callable[[dict, IdAliases], dict]] = {
+    "get_doctors": _doctors,
+    "find_doctor": _doctors,
+    "get_available_slots": _slots,
+    "book_new_appointment": _booking,
+    "get_doctor_appointments_by_date_range": _schedule,
+    "get_doctor_appointments_paginated": _appointment_page,
+    "search_appointments_by_symptom_keyword": _symptom_results,
+    "find_similar_cases": _similar_cases,
+}
+
+
+# -------- ALIAS STORE --------
+# user scope -> (last used, aliases)
+_aliases: "OrderedDict[str, Tuple[float, IdAliases]]" = OrderedDict()
+_aliases_lock = threading.Lock()
+
+
+def aliases_for(scope: str) -> IdAliases:
+    """The scope's aliases from earlier requests, or a new map when none are live."""
+    now = time.monotonic()
+    with _aliases_lock:
+        entry = _aliases.get(scope)
+        if entry is not None and now - entry[0] <= ALIAS_TTL_SECONDS:
+            aliases = entry[1]
+            _aliases.move_to_end(scope)
+        else:
+            aliases = IdAliases()
+            # Least recently used first; expired entries are replaced on next use
+            while len(_aliases) >= ALIAS_MAX_USERS:
+                _aliases.popitem(last=False)
+        _aliases[scope] = (now, aliases)
+    return aliases
+
+
+def clear_aliases():
+    """Forgets every scope's aliases (benchmarks, so replays number IDs as recorded)."""
+    with _aliases_lock:
+        _aliases.clear()
+
+
+# -------- STATS --------
+_stats_lock = threading.Lock()
+SHAPING_STATS: Dict[str, Dict[str, int]] = {}
+
+
+def _record(tool_name: str, raw_tokens: int, shaped_tokens: int) -> None:
+    with _stats_lock:
+        entry = SHAPING_STATS.setdefault(tool_name, {"calls": 0, "raw_tokens": 0, "shaped_tokens": 0})
+        entry["calls"] += 1
+        entry["raw_tokens"] += raw_tokens
+        entry["shaped_tokens"] += shaped_tokens
+
+
+class ResultShaper:
+    """One per run_agent_chat call; shares ID aliases with the scope's earlier calls."""
+
+    def __init__(self, scope: Optional[str] = None, enabled: bool = ENABLED):
+        self.enabled = enabled
+        self.aliases = aliases_for(scope) if scope and enabled else IdAliases()
+
+    def expand_args(self, arguments: Dict[str, Any]) -> Dict[str, Any]:
+        return self.aliases.expand(arguments) if self.enabled else arguments
+
+    def shape(self, tool_name: str, raw: str) -> str:
+        encoder = ENCODERS.get(tool_name)
+        if not self.enabled or encoder is None:
+            return raw
+        try:
+            data = serialization.loads(raw)
+        except (TypeError, ValueError):
+            return raw
+        if not isinstance(data, dict):
+            return raw
+
+        try:
+            shaped = _dumps(encoder(data, self.aliases))
+        except Exception as e:
+            logger.warning(f"Result shaping failed for {tool_name}, sending raw result: {e}")
+            return raw
+
+        raw_tokens, shaped_tokens = estimate_tokens(raw), estimate_tokens(shaped)
+        _record(tool_name, raw_tokens, shaped_tokens)
+        logger.debug(f"{tool_name} result: {raw_tokens} -> {shaped_tokens} tokens")
+        return shaped
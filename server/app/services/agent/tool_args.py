@@ -0,0 +1,237 @@
+"""
+Checks tool arguments against the tool's MCP parameter schema before dispatch
+and repairs the mistakes models commonly make, so they do not cost a tool
+call plus another LLM iteration:
+  - relative or free-form dates ('tomorrow', 'next monday', '25/01/2026',
+    'Jan 25') become YYYY-MM-DD, resolved against the IST clock
+  - datetimes without an offset get IST; other offsets are converted to IST
+  - IDs in a non-canonical UUID form (upper case, braces, no hyphens) are
+    normalized
+  - scalars of the wrong JSON type are coerced ('20' -> 20), parameters the
+    tool does not take are dropped
+Which parameters hold dates or IDs is read from their names (`*date_str`,
+`start_at`, `*_id`), the same convention all tools in app/mcp_server follow.
+Whatever cannot be repaired (missing arguments, a name where a UUID belongs,
+an unreadable date) is returned as one error message for the model.
+"""
+import os
+import re
+import uuid
+import logging
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+ENABLED = os.getenv("AGENT_CHECK_TOOL_ARGS", "true").lower() == "true"
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+RELATIVE_DAYS = {"today": 0, "tomorrow": 1, "yesterday": -1, "day after tomorrow": 2, "day before yesterday": -2}
+# Day-first like the rest of the app's users (IST); ISO is tried before these
+DATE_FORMATS = ["%Y/%m/%d", "%d-%m-%Y", "%d/%m/%Y", "%d.%m.%Y", "%d %B %Y", "%d %b %Y", "%B %d %Y", "%b %d %Y"]
+DATE_FORMATS_NO_YEAR = ["%d %B", "%d %b", "%B %d", "%b %d"]
+TIME_FORMATS = ["%H:%M", "%H:%M:%S", "%I %p", "%I%p", "%I:%M %p", "%I:%M%p"]
+
+_IN_DAYS_RE = re.compile(r"^in (\d+) days?$")
+_ORDINAL_RE = re.compile(r"(\d+)(st|nd|rd|th)\b")
+_ISO_DATE_RE = re.compile(r"^\d{4}-\d{2}-\d{2}")
+
+
+@dataclass
+class CheckedArgs:
+    arguments: Dict[str, Any]
+    # (parameter, kind of repair), e.g. ("date_str", "relative_date")
+    repairs: List[Tuple[str, str]] = field(default_factory=list)
+    errors: List[str] = field(default_factory=list)
+
+    @property
+    def ok(self) -> bool:
+        return not self.errors
+
+    def error_message(self, tool_name: str) -> str:
+        return f"Error: invalid arguments for {tool_name}: " + "; ".join(self.errors)
+
+
+class _Unfixable(ValueError):
+    pass
+
+
+def _resolve_date(value: str, today: date) -> Tuple[date, Optional[str]]:
+    """Parses a date written any common way; returns (date, repair kind or None if already ISO)."""
+    text = value.strip()
+    if _ISO_DATE_RE.match(text):
+        try:
+            parsed = datetime.fromisoformat(text).date()
+            return parsed, (None if text == parsed.isoformat() else "date_format")
+        except ValueError:
+            pass
+
+    lowered = _ORDINAL_RE.sub(r"\1", text.lower().replace(",", " "))
+    lowered = " ".join(lowered.split())
+    if lowered in RELATIVE_DAYS:
+        return today + timedelta(days=RELATIVE_DAYS[lowered]), "relative_date"
+    match = _IN_DAYS_RE.match(lowered)
+    if match:
+        return today + timedelta(days=int(match.group(1))), "relative_date"
+    words = lowered.split()
+    if words and words[-1] in WEEKDAYS and len(words) <= 2 and words[0] in (words[-1], "this", "next", "coming"):
+        ahead = (WEEKDAYS.index(words[-1]) - today.weekday()) % 7
+        if ahead == 0 and words[0] == "next":
+            ahead = 7
+        return today + timedelta(days=ahead), "relative_date"
+
+    for fmt in DATE_FORMATS:
+        try:
+            return datetime.strptime(lowered, fmt).date(), "date_format"
+        except ValueError:
+            continue
+    for fmt in DATE_FORMATS_NO_YEAR:
+        try:
+            parsed = datetime.strptime(f"{lowered} {today.year}", f"{fmt} %Y").date()
+        except ValueError:
+            continue
+        # A month-and-day more than two months back means next year's
+        if parsed < today - timedelta(days=60):
+            parsed = parsed.replace(year=today.year + 1)
+        return parsed, "date_format"
+    raise _Unfixable(f"could not read {value!r} as a date (use YYYY-MM-DD)")
+
+
+def _resolve_time(text: str) -> time:
+    compact = text.strip().lower().replace(".", "")
+    for fmt in TIME_FORMATS:
+        try:
+            return datetime.strptime(compact, fmt).time()
+        except ValueError:
+            continue
+    raise ValueError(text)
+
+
+def _resolve_datetime(value: str, today: date) -> Tuple[str, Optional[str]]:
+    """ISO datetime in IST for booking times; accepts '<any date> <time>' too."""
+    text = value.strip()
+    try:
+        parsed = datetime.fromisoformat(text.replace("Z", "+00:00"))
+        if parsed.tzinfo is None:
+            return parsed.replace(tzinfo=IST).isoformat(), "timezone"
+        if parsed.utcoffset() != IST.utcoffset(None):
+            return parsed.astimezone(IST).isoformat(), "timezone"
+        return text, None
+    except ValueError:
+        pass
+
+    # "tomorrow 11am", "25/01/2026 2:30 pm", "next monday at 10:00"
+    words = text.replace(" at ", " ").split()
+    for split in range(len(words) - 1, 0, -1):
+        try:
+            clock = _resolve_time(" ".join(words[split:]))
+            day, _ = _resolve_date(" ".join(words[:split]), today)
+        except ValueError:
+            continue
+        return datetime.combine(day, clock, tzinfo=IST).isoformat(), "datetime_format"
+    raise _Unfixable(f"could not read {value!r} as a date and time (use ISO format, e.g. 2026-01-25T14:00:00+05:30)")
+
+
+def _normalize_uuid(value: str) -> Tuple[str, Optional[str]]:
+    try:
+        canonical = str(uuid.UUID(value.strip()))
+    except ValueError:
+        raise _Unfixable(f"{value!r} is not a UUID; use the id returned by a previous tool call")
+    return canonical, (None if canonical == value else "uuid")
+
+
+def _coerce(value: Any, expected: str) -> Tuple[Any, Optional[str]]:
+    if expected == "string":
+        if isinstance(value, str):
+            return value, None
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return str(value), "type"
+    elif expected == "integer":
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value, None
+        if isinstance(value, float) and value.is_integer():
+            return int(value), "type"
+        if isinstance(value, str) and value.strip().lstrip("-").isdigit():
+            return int(value.strip()), "type"
+    elif expected == "number":
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return value, None
+        if isinstance(value, str):
+            try:
+                return float(value), "type"
+            except ValueError:
+                pass
+    elif expected == "boolean":
+        if isinstance(value, bool):
+            return value, None
+        if isinstance(value, str) and value.lower() in ("true", "false"):
+            return value.lower() == "true", "type"
+    else:
+        return value, None
+    raise _Unfixable(f"expected {expected}, got {value!r}")
+
+
+def _expected_type(spec: Dict[str, Any]) -> Optional[str]:
+    if "type" in spec:
+        return spec["type"]
+    # Optional[...] parameters: anyOf [{type: X}, {type: null}]
+    types = [s.get("type") for s in spec.get("anyOf", []) if s.get("type") != "null"]
+    return types[0] if len(types) == 1 else None
+
+
+def _repair_value(name: str, value: Any, today: date) -> Tuple[Any, Optional[str]]:
+    if not isinstance(value, str):
+        return value, None
+    if name.endswith("date_str"):
+        day, kind = _resolve_date(value, today)
+        return day.isoformat(), kind
+    if name == "start_at":
+        return _resolve_datetime(value, today)
+    if name.endswith("_id"):
+        return _normalize_uuid(value)
+    return value, None
+
+
+def check_tool_args(tool_name: str, arguments: Dict[str, Any], schema: Dict[str, Any], now: Optional[datetime] = None) -> CheckedArgs:
+    """Validates and repairs one tool call's arguments against its parameter schema."""
+    today = (now or datetime.now(IST)).astimezone(IST).date()
+    properties = schema.get("properties", {})
+    result = CheckedArgs(arguments={})
+
+    for name, value in arguments.items():
+        if name not in properties:
+            result.repairs.append((name, "unknown_param"))
+            continue
+        spec = properties[name]
+        try:
+            # Models fill optional string parameters with "" as often as they omit them
+            if value is None or value == "":
+                if name in schema.get("required", []):
+                    raise _Unfixable("is required")
+                continue
+            repaired, kind = _coerce(value, _expected_type(spec))
+            repaired, value_kind = _repair_value(name, repaired, today)
+            kind = value_kind or kind
+            if kind:
+                result.repairs.append((name, kind))
+            result.arguments[name] = repaired
+        except _Unfixable as e:
+            result.errors.append(f"{name}: {e}")
+
+    for name in schema.get("required", []):
+        if name not in arguments:
+            result.errors.append(f"{name}: is required")
+
+    for param, kind in result.repairs:
+        metrics.TOOL_ARG_REPAIRS.labels(tool_name, kind).inc()
+    if result.repairs:
+        logger.info(f"Repaired {tool_name} arguments: {', '.join(f'{p} ({k})' for p, k in result.repairs)}")
+    if result.errors:
+        metrics.TOOL_ARG_REJECTIONS.labels(tool_name).inc()
+        logger.info(f"Rejected {tool_name} arguments: {'; '.join(result.errors)}")
+    return result
@@ -0,0 +1,199 @@
+import os
+import logging
+from datetime import date, datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy import Date, and_, cast, func, or_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import Appointment, AppointmentDailyStat, AppointmentStatus
+from app.services.symptom_tagger import OTHER_TAG, tags_for_keyword
+
+logger = logging.getLogger(__name__)
+
+# -------- CONFIG --------
+# When enabled, bookings increment appointment_daily_stats and stats queries
+# read the rollup instead of scanning appointments.
+ROLLUP_ENABLED = os.getenv("ANALYTICS_ROLLUP_ENABLED", "false").lower() == "true"
+
+LOCAL_TZ = "Asia/Kolkata"
+GRANULARITIES = ("day", "week", "month")
+
+# Symptom buckets are the primary canonical tag assigned at booking
+# (see app/services/symptom_tagger.py); untagged legacy rows count as 'other'.
+
+
+def symptom_bucket_expr():
+    """SQL expression for an appointment's symptom bucket: its first (primary) tag."""
+    return func.coalesce(Appointment.symptom_tags[1], OTHER_TAG)
+
+
+def symptom_filter(symptom_keyword: str):
+    """
+    WHERE clause for a symptom keyword: an indexed tag-overlap lookup when the
+    keyword is in the tag vocabulary, a substring match otherwise. Rows the
+    tagger could not place (not backfilled yet, or only 'other') are still
+    matched on their text, so "pain" finds "severe pain".
+    """
+    text_match = Appointment.symptoms.ilike(f"%{symptom_keyword.strip()}%")
+    tags = tags_for_keyword(symptom_keyword)
+    if not tags:
+        return text_match
+    return or_(
+        Appointment.symptom_tags.overlap(tags),
+        # '{}' and '{other}' are both contained by {other}
+        and_(Appointment.symptom_tags.contained_by([OTHER_TAG]), text_match),
+    )
+
+
+def _local_start_at():
+    return func.timezone(LOCAL_TZ, Appointment.start_at)
+
+
+def _as_key(value) -> str:
+    return value.isoformat() if isinstance(value, (date, datetime)) else str(value)
+
+
+def _summarize(by_period: Dict[str, int], by_status: Dict[str, int], by_symptom: Dict[str, int]) -> dict:
+    busiest = max(by_period.items(), key=lambda kv: kv[1]) if by_period else None
+    return {
+        "total": sum(by_status.values()),
+        "by_period": by_period,
+        "by_status": by_status,
+        "by_symptom": dict(sorted(by_symptom.items(), key=lambda kv: -kv[1])),
+        "busiest_period": {"period": busiest[0], "count": busiest[1]} if busiest else None,
+    }
+
+
+def compute_stats_from_appointments(
+    db: Session,
+    doctor_id: str,
+    start_at: datetime,
+    end_at: datetime,
+    granularity: str = "day",
+    symptom_keyword: Optional[str] = None,
+) -> dict:
+    """
+    Counts a doctor's appointments in [start_at, end_at] grouped by period
+    (date_trunc in IST), status and symptom bucket in a single GROUP BY query.
+    """
+    period = cast(func.date_trunc(granularity, _local_start_at()), Date).label("period")
+    bucket = symptom_bucket_expr().label("bucket")
+
+    query = db.query(
+        period,
+        Appointment.status,
+        bucket,
+        func.count().label("n"),
+    ).filter(
+        Appointment.doctor_id == doctor_id,
+        Appointment.start_at >= start_at,
+        Appointment.start_at <= end_at,
+    )
+    if symptom_keyword:
+        query = query.filter(symptom_filter(symptom_keyword))
+
+    rows = query.group_by(period, Appointment.status, bucket).all()
+    return _fold_rows(rows)
+
+
+def compute_stats_from_rollup(
+    db: Session,
+    doctor_id: str,
+    start_date: date,
+    end_date: date,
+    granularity: str = "day",
+) -> dict:
+    """Same shape as compute_stats_from_appointments, read from appointment_daily_stats."""
+    period = cast(func.date_trunc(granularity, AppointmentDailyStat.day), Date).label("period")
+
+    rows = db.query(
+        period,
+        AppointmentDailyStat.status,
+        AppointmentDailyStat.symptom_bucket,
+        func.sum(AppointmentDailyStat.count).label("n"),
+    ).filter(
+        AppointmentDailyStat.doctor_id == doctor_id,
+        AppointmentDailyStat.day >= start_date,
+        AppointmentDailyStat.day <= end_date,
+    ).group_by(
+        period, AppointmentDailyStat.status, AppointmentDailyStat.symptom_bucket
+    ).all()
+    return _fold_rows(rows)
+
+
+def _fold_rows(rows) -> dict:
+    by_period: Dict[str, int] = {}
+    by_status: Dict[str, int] = {}
+    by_symptom: Dict[str, int] = {}
+
+    for period, status, bucket, n in rows:
+        n = int(n)
+        status_key = status.value if isinstance(status, AppointmentStatus) else str(status)
+        by_status[status_key] = by_status.get(status_key, 0) + n
+        # Volume by period and symptom only counts appointments that actually happen
+        if status_key == AppointmentStatus.cancelled.value:
+            continue
+        by_period[_as_key(period)] = by_period.get(_as_key(period), 0) + n
+        by_symptom[bucket] = by_symptom.get(bucket, 0) + n
+
+    return _summarize(dict(sorted(by_period.items())), by_status, by_symptom)
+
+
+def adjust_daily_rollup(
+    db: Session,
+    doctor_id: str,
+    day: date,
+    status: AppointmentStatus,
+    symptom_tags: List[str],
+    delta: int = 1,
+) -> None:
+    """
+    Upserts one rollup counter. Runs inside the caller's transaction so the
+    rollup commits (or rolls back) together with the appointment change.
+    For a status change call it twice: -1 for the old status, +1 for the new.
+    """
+    if not ROLLUP_ENABLED:
+        return
+
+    stmt = insert(AppointmentDailyStat).values(
+        doctor_id=doctor_id,
+        day=day,
+        status=status,
+        symptom_bucket=symptom_tags[0] if symptom_tags else OTHER_TAG,
+        count=delta,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["doctor_id", "day", "status", "symptom_bucket"],
+        set_={"count": AppointmentDailyStat.count + stmt.excluded.count},
+    )
+    db.execute(stmt)
+
+
+def rebuild_daily_rollup(db: Session, doctor_id: Optional[str] = None) -> int:
+    """
+    Recomputes appointment_daily_stats from appointments (all doctors, or one).
+    Used to seed the rollup when it is first enabled. Returns the number of rows written.
+    """
+    day = cast(_local_start_at(), Date)
+    bucket = symptom_bucket_expr()
+
+    delete_q = db.query(AppointmentDailyStat)
+    source = db.query(
+        Appointment.doctor_id, day, Appointment.status, bucket, func.count()
+    )
+    if doctor_id:
+        delete_q = delete_q.filter(AppointmentDailyStat.doctor_id == doctor_id)
+        source = source.filter(Appointment.doctor_id == doctor_id)
+    source = source.group_by(Appointment.doctor_id, day, Appointment.status, bucket)
+
+    delete_q.delete(synchronize_session=False)
+    result = db.execute(
+        insert(AppointmentDailyStat).from_select(
+            ["doctor_id", "day", "status", "symptom_bucket", "count"], source.statement
+        )
+    )
+    db.commit()
+    logger.info(f"Rebuilt appointment_daily_stats: {result.rowcount} rows")
+    return result.rowcount
@@ -0,0 +1,329 @@
+import os
+import time
+import logging
+import threading
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, Iterable, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# -------- CONFIG --------
+# memory: per-process dict (single worker / development)
+# redis:  shared by every API and MCP worker (AVAILABILITY_CACHE_URL=redis://...)
+# none:   disabled, every lookup recomputes from the database
+CACHE_BACKEND = os.getenv("AVAILABILITY_CACHE_BACKEND", "memory").lower()
+CACHE_URL = os.getenv("AVAILABILITY_CACHE_URL", "redis://localhost:6379/0")
+# Upper bound on staleness if a write path ever misses an update
+CACHE_TTL_SECONDS = int(os.getenv("AVAILABILITY_CACHE_TTL_SECONDS", "300"))
+
+# Bookable 1-hour slots start on the hour between these IST hours
+CLINIC_OPEN_HOUR = 10
+CLINIC_CLOSE_HOUR = 17
+
+KEY_PREFIX = "availability"
+# Per (doctor, day) counter bumped by every booking. A fill stores its free
+# set only if the counter is unchanged since it started reading, so a
+# booking that commits mid-fill cannot be overwritten by the older set.
+GENERATION_PREFIX = "availability-gen"
+# Present while a (doctor, day) may have live slot holds, so lookups for the
+# other days (almost all of them) skip the holds query
+HOLDS_PREFIX = "availability-holds"
+
+
+def _key(doctor_id: str, day: date) -> str:
+    return f"{KEY_PREFIX}:{str(doctor_id).lower()}:{day.isoformat()}"
+
+
+def _generation_key(key: str) -> str:
+    return GENERATION_PREFIX + key[len(KEY_PREFIX):]
+
+
+def _holds_key(key: str) -> str:
+    return HOLDS_PREFIX + key[len(KEY_PREFIX):]
+
+
+def overlapping_hours(start_at: datetime, end_at: datetime) -> Dict[date, Set[int]]:
+    """Slot start hours (per IST day) whose 1-hour window overlaps [start_at, end_at)."""
+    start_ist = start_at.astimezone(IST)
+    end_ist = end_at.astimezone(IST)
+    affected: Dict[date, Set[int]] = {}
+
+    day = start_ist.date()
+    while day <= end_ist.date():
+        for hour in range(CLINIC_OPEN_HOUR, CLINIC_CLOSE_HOUR):
+            slot_start = datetime(day.year, day.month, day.day, hour, tzinfo=IST)
+            if slot_start < end_ist and slot_start + timedelta(hours=1) > start_ist:
+                affected.setdefault(day, set()).add(hour)
+        day += timedelta(days=1)
+    return affected
+
+
+# -------- BACKENDS --------
+class MemoryBackend:
+    """Process-local store. Correct only when one process serves all bookings."""
+
+    def __init__(self, ttl: int):
+        self.ttl = ttl
+        self._data: Dict[str, Tuple[float, Set[int]]] = {}
+        # generation key -> (last bumped, generation)
+        self._generations: Dict[str, Tuple[float, int]] = {}
+        # holds key -> expiry of the latest hold placed on that day
+        self._holds: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Set[int]]:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, hours = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            return set(hours)
+
+    def generation(self, key: str) -> int:
+        with self._lock:
+            return self._generations.get(_generation_key(key), (0, 0))[1]
+
+    def bump(self, key: str) -> None:
+        with self._lock:
+            now = time.monotonic()
+            gen_key = _generation_key(key)
+            self._generations[gen_key] = (now, self._generations.get(gen_key, (0, 0))[1] + 1)
+            # A generation only has to outlive the fills in flight; keep the map bounded
+            if len(self._generations) > 10_000:
+                self._generations = {k: v for k, v in self._generations.items() if now - v[0] < self.ttl}
+
+    def set_if_generation(self, key: str, hours: Iterable[int], generation: int) -> bool:
+        with self._lock:
+            if self._generations.get(_generation_key(key), (0, 0))[1] != generation:
+                return False
+            self._data[key] = (time.monotonic() + self.ttl, set(hours))
+            return True
+
+    def mark_held(self, key: str, ttl: int) -> None:
+        with self._lock:
+            now = time.monotonic()
+            self._holds[_holds_key(key)] = now + ttl
+            if len(self._holds) > 10_000:
+                self._holds = {k: t for k, t in self._holds.items() if t > now}
+
+    def may_have_holds(self, key: str) -> bool:
+        with self._lock:
+            return self._holds.get(_holds_key(key), 0) > time.monotonic()
+
+    def discard(self, key: str, hours: Iterable[int]) -> None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None:
+                entry[1].difference_update(hours)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generations.clear()
+            self._holds.clear()
+
+
+class RedisBackend:
+    """
+    Shared store: one Redis set of free hours per (doctor, day).
+    A sentinel member keeps fully booked days cached as an (otherwise) empty set.
+    In-place updates only touch keys that already exist, so a partial set is never created.
+    """
+
+    SENTINEL = "-"
+    _UPDATE_IF_EXISTS = """
+    if redis.call('EXISTS', KEYS[1]) == 1 then
+        return redis.call(ARGV[1], KEYS[1], unpack(ARGV, 2))
+    end
+    return -1
+    """
+    # KEYS: free set, generation; ARGV: expected generation, ttl, members
+    _SET_IF_GENERATION = """
+    if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[1] then
+        return 0
+    end
+    redis.call('DEL', KEYS[1])
+    redis.call('SADD', KEYS[1], unpack(ARGV, 3))
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return 1
+    """
+
+    def __init__(self, url: str, ttl: int):
+        try:
+            import redis
+        except ImportError:
+            raise RuntimeError("AVAILABILITY_CACHE_BACKEND=redis requires the 'redis' package.")
+        self.ttl = ttl
+        self._client = redis.Redis.from_url(url, socket_timeout=0.5, socket_connect_timeout=0.5)
+        self._update = self._client.register_script(self._UPDATE_IF_EXISTS)
+        self._set_if_generation = self._client.register_script(self._SET_IF_GENERATION)
+
+    def get(self, key: str) -> Optional[Set[int]]:
+        members = self._client.smembers(key)
+        if not members:
+            return None
+        return {int(m) for m in members if m.decode() != self.SENTINEL}
+
+    def generation(self, key: str) -> int:
+        return int(self._client.get(_generation_key(key)) or 0)
+
+    def bump(self, key: str) -> None:
+        pipe = self._client.pipeline(transaction=True)
+        pipe.incr(_generation_key(key))
+        pipe.expire(_generation_key(key), self.ttl)
+        pipe.execute()
+
+    def set_if_generation(self, key: str, hours: Iterable[int], generation: int) -> bool:
+        args = [str(generation), str(self.ttl), self.SENTINEL, *[str(h) for h in hours]]
+        return bool(self._set_if_generation(keys=[key, _generation_key(key)], args=args))
+
+    def mark_held(self, key: str, ttl: int) -> None:
+        self._client.set(_holds_key(key), 1, ex=ttl)
+
+    def may_have_holds(self, key: str) -> bool:
+        return bool(self._client.exists(_holds_key(key)))
+
+    def discard(self, key: str, hours: Iterable[int]) -> None:
+        hours = [str(h) for h in hours]
+        if hours:
+            self._update(keys=[key], args=["SREM", *hours])
+
+    def delete(self, key: str) -> None:
+        self._client.delete(key)
+
+    def clear(self) -> None:
+        for prefix in (KEY_PREFIX, GENERATION_PREFIX, HOLDS_PREFIX):
+            for key in self._client.scan_iter(match=f"{prefix}:*", count=1000):
+                self._client.delete(key)
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """Lazily builds the configured backend (None when caching is disabled)."""
+    global _backend
+    if CACHE_BACKEND == "none":
+        return None
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                if CACHE_BACKEND == "redis":
+                    _backend = RedisBackend(CACHE_URL, CACHE_TTL_SECONDS)
+                else:
+                    _backend = MemoryBackend(CACHE_TTL_SECONDS)
+    return _backend
+
+
+# -------- PUBLIC API --------
+# The cache is an optimization only: backend failures are logged and treated
+# as a miss, and the booking path still re-checks overlaps in the database.
+
+def get_free_hours(doctor_id: str, day: date) -> Optional[Set[int]]:
+    backend = get_backend()
+    if backend is None:
+        return None
+    try:
+        return backend.get(_key(doctor_id, day))
+    except Exception as e:
+        logger.warning(f"Availability cache read failed: {e}")
+        return None
+
+
+def generation(doctor_id: str, day: date) -> Optional[int]:
+    """
+    The day's booking generation, read before computing a free set to store;
+    None when caching is disabled or the backend failed (then do not store).
+    """
+    backend = get_backend()
+    if backend is None:
+        return None
+    try:
+        return backend.generation(_key(doctor_id, day))
+    except Exception as e:
+        logger.warning(f"Availability cache read failed: {e}")
+        return None
+
+
+def store_free_hours(doctor_id: str, day: date, hours: Iterable[int], generation: Optional[int]) -> None:
+    """
+    Caches a free set computed from the primary, unless a booking for the day
+    landed since `generation` was read (the set may predate it).
+    """
+    backend = get_backend()
+    if backend is None or generation is None:
+        return
+    try:
+        if not backend.set_if_generation(_key(doctor_id, day), hours, generation):
+            logger.debug(f"Availability for {doctor_id} on {day} changed while computing; not cached")
+    except Exception as e:
+        logger.warning(f"Availability cache write failed: {e}")
+
+
+def mark_booked(doctor_id: str, start_at: datetime, end_at: datetime) -> None:
+    """Removes the slots covered by a newly committed booking from cached days."""
+    backend = get_backend()
+    if backend is None:
+        return
+    try:
+        for day, hours in overlapping_hours(start_at, end_at).items():
+            backend.bump(_key(doctor_id, day))
+            backend.discard(_key(doctor_id, day), hours)
+    except Exception as e:
+        logger.warning(f"Availability cache update failed, invalidating: {e}")
+        invalidate(doctor_id, start_at, end_at)
+
+
+def invalidate(doctor_id: str, start_at: datetime, end_at: datetime) -> None:
+    backend = get_backend()
+    if backend is None:
+        return
+    for day in overlapping_hours(start_at, end_at):
+        try:
+            backend.bump(_key(doctor_id, day))
+            backend.delete(_key(doctor_id, day))
+        except Exception as e:
+            logger.error(f"Availability cache invalidation failed for {doctor_id} on {day}: {e}")
+
+
+def clear() -> None:
+    """Drops every cached day (benchmarks, between runs against reset data)."""
+    backend = get_backend()
+    if backend is not None:
+        backend.clear()
+
+
+def mark_held(doctor_id: str, day: date, ttl: int) -> None:
+    """Records that the day has a slot hold for the next `ttl` seconds."""
+    backend = get_backend()
+    if backend is None:
+        return
+    try:
+        backend.mark_held(_key(doctor_id, day), ttl)
+    except Exception as e:
+        logger.warning(f"Availability cache hold marker write failed: {e}")
+
+
+def may_have_holds(doctor_id: str, day: date) -> bool:
+    """
+    False only when no hold was placed on the day within the hold TTL, so
+    the holds query can be skipped; True when unsure (cache disabled or failing).
+    """
+    backend = get_backend()
+    if backend is None:
+        return True
+    try:
+        return backend.may_have_holds(_key(doctor_id, day))
+    except Exception as e:
+        logger.warning(f"Availability cache read failed: {e}")
+        return True
@@ -0,0 +1,216 @@
+"""
+Per-doctor iCalendar (RFC 5545) feed built straight from `appointments`.
+
+Calendar apps subscribe to a URL carrying a signed feed token (they cannot
+send our bearer JWT) and poll it every few minutes. The token carries the
+doctor's `calendar_feed_version`; rotating the URL bumps it, which revokes
+every token issued before. Each poll checks the version (a primary key
+lookup), then computes the ETag, which is one small query:
+    - max(updated_at) over the doctor's appointments (index probe per partition)
+    - the first day of the feed window, which moves once a day
+and only renders the feed when the client's If-None-Match does not match.
+"""
+import os
+import hashlib
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Iterable, List, Optional, Tuple
+
+from jose import jwt, JWTError
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.db.models import Appointment, AppointmentStatus, User, UserRole
+from app.services.auth_service import SECRET_KEY, ALGORITHM
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# -------- CONFIG --------
+CALENDAR_FEED_PAST_DAYS = int(os.getenv("CALENDAR_FEED_PAST_DAYS", "90"))
+CALENDAR_FEED_FUTURE_DAYS = int(os.getenv("CALENDAR_FEED_FUTURE_DAYS", "365"))
+# Polling interval suggested to calendar apps
+CALENDAR_FEED_REFRESH_MINUTES = int(os.getenv("CALENDAR_FEED_REFRESH_MINUTES", "5"))
+# How long clients may reuse a feed without revalidating
+CALENDAR_FEED_MAX_AGE_SECONDS = int(os.getenv("CALENDAR_FEED_MAX_AGE_SECONDS", "60"))
+
+FEED_TOKEN_SCOPE = "calendar_feed"
+# Bump when the rendered output changes, so cached feeds are replaced
+FEED_FORMAT_VERSION = "2"
+PRODID = "-//Smart Doctor Patient Assistant//Appointments//EN"
+UID_DOMAIN = "smart-doctor-assistant"
+
+ICS_STATUS = {
+    AppointmentStatus.booked: "CONFIRMED",
+    AppointmentStatus.completed: "CONFIRMED",
+    AppointmentStatus.cancelled: "CANCELLED",
+}
+
+
+class InvalidFeedTokenError(ValueError):
+    pass
+
+
+# -------- TOKENS --------
+def create_feed_token(doctor_id: str, version: int) -> str:
+    """
+    Token for one doctor's feed, valid until the doctor rotates the feed URL
+    (which bumps `version`). It carries no role, so it is rejected as an API
+    access token, and only opens the read-only feed.
+    """
+    return jwt.encode({"sub": str(doctor_id), "scope": FEED_TOKEN_SCOPE, "ver": version}, SECRET_KEY, algorithm=ALGORITHM)
+
+
+def decode_feed_token(token: str) -> Tuple[str, int]:
+    """Returns (doctor_id, version); check the version with verify_feed_version."""
+    try:
+        payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    except JWTError:
+        raise InvalidFeedTokenError("Invalid calendar feed token")
+    if payload.get("scope") != FEED_TOKEN_SCOPE or not payload.get("sub"):
+        raise InvalidFeedTokenError("Invalid calendar feed token")
+    # Tokens issued before versioning count as version 0
+    version = payload.get("ver", 0)
+    if not isinstance(version, int):
+        raise InvalidFeedTokenError("Invalid calendar feed token")
+    return payload["sub"], version
+
+
+def feed_version(db: Session, doctor_id: str) -> Optional[int]:
+    """The doctor's current feed version, or None when no such doctor exists."""
+    return (
+        db.query(User.calendar_feed_version)
+        .filter(User.id == doctor_id, User.role == UserRole.doctor)
+        .scalar()
+    )
+
+
+def verify_feed_version(db: Session, doctor_id: str, version: int):
+    if feed_version(db, doctor_id) != version:
+        raise InvalidFeedTokenError("Calendar feed URL was revoked")
+
+
+def rotate_feed_version(db: Session, doctor_id: str) -> int:
+    """Revokes every feed token issued so far and returns the new version. Commits."""
+    updated = (
+        db.query(User)
+        .filter(User.id == doctor_id, User.role == UserRole.doctor)
+        .update({User.calendar_feed_version: User.calendar_feed_version + 1}, synchronize_session=False)
+    )
+    if not updated:
+        raise InvalidFeedTokenError("Unknown doctor")
+    db.commit()
+    return feed_version(db, doctor_id)
+
+
+# -------- WINDOW & ETAG --------
+def feed_window(today: Optional[date] = None) -> Tuple[datetime, datetime]:
+    today = today or datetime.now(IST).date()
+    start = datetime.combine(today - timedelta(days=CALENDAR_FEED_PAST_DAYS), time.min).replace(tzinfo=IST)
+    end = datetime.combine(today + timedelta(days=CALENDAR_FEED_FUTURE_DAYS + 1), time.min).replace(tzinfo=IST)
+    return start, end
+
+
+def last_modified(db: Session, doctor_id: str) -> Optional[datetime]:
+    return db.query(func.max(Appointment.updated_at)).filter(Appointment.doctor_id == doctor_id).scalar()
+
+
+def compute_etag(doctor_id: str, modified: Optional[datetime], window_start: datetime) -> str:
+    raw = f"{FEED_FORMAT_VERSION}|{doctor_id}|{modified.isoformat() if modified else '-'}|{window_start.date()}"
+    return '"' + hashlib.sha256(raw.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match comparison; weak validators (W/) match too, as RFC 9110 asks for GET."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = [c.strip() for c in if_none_match.split(",")]
+    return any((c[2:] if c.startswith("W/") else c) == etag for c in candidates)
+
+
+# -------- RENDERING --------
+def _escape(value: str) -> str:
+    return (
+        value.replace("\\", "\\\\")
+        .replace(";", "\\;")
+        .replace(",", "\\,")
+        .replace("\r\n", "\\n")
+        .replace("\n", "\\n")
+    )
+
+
+def _fold(line: str) -> str:
+    """Splits content lines longer than 75 octets (RFC 5545 3.1), never inside a UTF-8 character."""
+    data = line.encode("utf-8")
+    if len(data) <= 75:
+        return line
+    parts, limit = [], 75
+    while data:
+        cut = min(limit, len(data))
+        while cut < len(data) and (data[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(data[:cut].decode("utf-8"))
+        data = data[cut:]
+        limit = 74  # continuation lines start with a space
+    return "\r\n ".join(parts)
+
+
+def _utc(dt: datetime) -> str:
+    return dt.astimezone(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+
+
+def _event_lines(appt: Appointment, patient_name: str) -> List[str]:
+    # Symptoms stay out: calendar apps sync the feed to third-party servers
+    description = f"Patient: {patient_name}"
+    return [
+        "BEGIN:VEVENT",
+        f"UID:{appt.id}@{UID_DOMAIN}",
+        f"DTSTAMP:{_utc(appt.updated_at)}",
+        f"LAST-MODIFIED:{_utc(appt.updated_at)}",
+        f"CREATED:{_utc(appt.created_at)}",
+        f"DTSTART:{_utc(appt.start_at)}",
+        f"DTEND:{_utc(appt.end_at)}",
+        f"SUMMARY:{_escape(f'Appointment: {patient_name}')}",
+        f"DESCRIPTION:{_escape(description)}",
+        f"STATUS:{ICS_STATUS.get(appt.status, 'CONFIRMED')}",
+        "TRANSP:OPAQUE",
+        "END:VEVENT",
+    ]
+
+
+def render_ics(doctor_name: str, rows: Iterable[Tuple[Appointment, str]]) -> str:
+    lines = [
+        "BEGIN:VCALENDAR",
+        "VERSION:2.0",
+        f"PRODID:{PRODID}",
+        "CALSCALE:GREGORIAN",
+        "METHOD:PUBLISH",
+        f"X-WR-CALNAME:{_escape(f'Appointments - {doctor_name}')}",
+        "X-WR-TIMEZONE:Asia/Kolkata",
+        f"REFRESH-INTERVAL;VALUE=DURATION:PT{CALENDAR_FEED_REFRESH_MINUTES}M",
+        f"X-PUBLISHED-TTL:PT{CALENDAR_FEED_REFRESH_MINUTES}M",
+    ]
+    for appt, patient_name in rows:
+        lines.extend(_event_lines(appt, patient_name))
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_fold(line) for line in lines) + "\r\n"
+
+
+def build_feed(db: Session, doctor_id: str, window: Tuple[datetime, datetime]) -> str:
+    """
+    Renders every appointment in the window. Cancelled ones stay in as
+    STATUS:CANCELLED so subscribed calendars drop them rather than keep a stale copy.
+    """
+    doctor_name = db.query(User.full_name).filter(User.id == doctor_id).scalar() or "Doctor"
+    rows = (
+        db.query(Appointment, User.full_name)
+        .join(User, Appointment.patient_id == User.id)
+        .filter(
+            Appointment.doctor_id == doctor_id,
+            Appointment.start_at >= window[0],
+            Appointment.start_at < window[1],
+        )
+        .order_by(Appointment.start_at.asc())
+        .all()
+    )
+    return render_ics(doctor_name, rows)
@@ -0,0 +1,236 @@
+"""
+Dashboard data for doctors and patients, one round trip per load.
+
+Each role has a single multi-CTE query that returns the whole dashboard as
+one row of JSON columns. Results are cached per user for a few seconds and
+carry an ETag, so dashboards that reload often cost an index probe or a 304.
+
+A cached dashboard is only served while max(updated_at) over the user's
+appointments, probed in the caller's session, is what it was built from (the
+calendar feed's ETag works the same way). A booking or cancellation made by
+any process, API or MCP worker, shows up on the next load. A dashboard built
+from a lagging replica is never served past the point where that session
+sees the newer write.
+"""
+import os
+import time
+import hashlib
+import logging
+import threading
+from datetime import datetime, time as dt_time, timedelta, timezone
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services import serialization
+from app.services.symptom_tagger import OTHER_TAG
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# -------- CONFIG --------
+DASHBOARD_CACHE_TTL_SECONDS = int(os.getenv("DASHBOARD_CACHE_TTL_SECONDS", "30"))
+DASHBOARD_CACHE_MAX_ENTRIES = int(os.getenv("DASHBOARD_CACHE_MAX_ENTRIES", "10000"))
+# Window for the symptom breakdown
+DASHBOARD_SYMPTOM_DAYS = int(os.getenv("DASHBOARD_SYMPTOM_DAYS", "30"))
+UPCOMING_LIMIT = 5
+TOP_SYMPTOMS = 8
+
+DOCTOR_SQL = text("""
+    WITH today AS (
+        SELECT a.id, a.start_at, a.end_at, a.status, a.symptoms, p.full_name AS patient_name
+        FROM appointments a
+        JOIN users p ON p.id = a.patient_id
+        WHERE a.doctor_id = :user_id
+          AND a.start_at >= :today_start AND a.start_at < :tomorrow_start
+        ORDER BY a.start_at
+    ),
+    upcoming AS (
+        SELECT
+            count(*) FILTER (WHERE start_at < :tomorrow_start) AS remaining_today,
+            count(*) FILTER (WHERE start_at < :week_end) AS next_7_days,
+            count(*) AS total
+        FROM appointments
+        WHERE doctor_id = :user_id AND status = 'booked' AND start_at >= :now
+    ),
+    symptoms AS (
+        SELECT coalesce(symptom_tags[1], :other) AS bucket, count(*) AS n
+        FROM appointments
+        WHERE doctor_id = :user_id AND status <> 'cancelled'
+          AND start_at >= :recent_start AND start_at < :now
+        GROUP BY 1
+        ORDER BY n DESC, bucket
+        LIMIT :top_symptoms
+    )
+    SELECT
+        (SELECT coalesce(json_agg(json_build_object(
+            'id', id, 'start_at', start_at, 'end_at', end_at, 'status', status,
+            'symptoms', symptoms, 'patient_name', patient_name
+        ) ORDER BY start_at), '[]'::json) FROM today) AS today,
+        (SELECT row_to_json(upcoming) FROM upcoming) AS upcoming,
+        (SELECT coalesce(json_agg(json_build_object('symptom', bucket, 'count', n) ORDER BY n DESC, bucket), '[]'::json) FROM symptoms) AS symptoms
+""")
+
+PATIENT_SQL = text("""
+    WITH upcoming AS (
+        SELECT a.id, a.start_at, a.end_at, a.symptoms, d.full_name AS doctor_name
+        FROM appointments a
+        JOIN users d ON d.id = a.doctor_id
+        WHERE a.patient_id = :user_id AND a.status = 'booked' AND a.start_at >= :now
+        ORDER BY a.start_at
+        LIMIT :upcoming_limit
+    ),
+    counts AS (
+        SELECT
+            count(*) FILTER (WHERE status = 'booked' AND start_at >= :now) AS upcoming,
+            count(*) FILTER (WHERE status <> 'cancelled' AND start_at < :now) AS past_visits,
+            count(*) FILTER (WHERE status = 'cancelled') AS cancelled,
+            max(start_at) FILTER (WHERE status <> 'cancelled' AND start_at < :now) AS last_visit_at
+        FROM appointments
+        WHERE patient_id = :user_id
+    ),
+    symptoms AS (
+        SELECT coalesce(symptom_tags[1], :other) AS bucket, count(*) AS n
+        FROM appointments
+        WHERE patient_id = :user_id AND status <> 'cancelled'
+          AND start_at >= :recent_start AND start_at < :now
+        GROUP BY 1
+        ORDER BY n DESC, bucket
+        LIMIT :top_symptoms
+    )
+    SELECT
+        (SELECT coalesce(json_agg(json_build_object(
+            'id', id, 'start_at', start_at, 'end_at', end_at,
+            'symptoms', symptoms, 'doctor_name', doctor_name
+        ) ORDER BY start_at), '[]'::json) FROM upcoming) AS upcoming,
+        (SELECT row_to_json(counts) FROM counts) AS counts,
+        (SELECT coalesce(json_agg(json_build_object('symptom', bucket, 'count', n) ORDER BY n DESC, bucket), '[]'::json) FROM symptoms) AS symptoms
+""")
+
+
+LAST_MODIFIED_SQL = {
+    # ix_appointments_doctor_id_updated_at: one index probe per partition
+    "doctor": text("SELECT max(updated_at) FROM appointments WHERE doctor_id = :user_id"),
+    # ix_appointments_patient_id: a patient has few rows
+    "patient": text("SELECT max(updated_at) FROM appointments WHERE patient_id = :user_id"),
+}
+
+
+# -------- CACHE --------
+# (role, user_id) -> (expires at, last modified, payload, etag)
+_cache: Dict[Tuple[str, str], Tuple[float, Optional[datetime], Dict[str, Any], str]] = {}
+_cache_lock = threading.Lock()
+
+
+def _cache_get(key: Tuple[str, str], modified: Optional[datetime]) -> Optional[Tuple[Dict[str, Any], str]]:
+    with _cache_lock:
+        entry = _cache.get(key)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic() or entry[1] != modified:
+            del _cache[key]
+            return None
+        return entry[2], entry[3]
+
+
+def _cache_set(key: Tuple[str, str], modified: Optional[datetime], payload: Dict[str, Any], etag: str):
+    with _cache_lock:
+        if key not in _cache and len(_cache) >= DASHBOARD_CACHE_MAX_ENTRIES:
+            # Oldest insertion first
+            _cache.pop(next(iter(_cache)))
+        _cache[key] = (time.monotonic() + DASHBOARD_CACHE_TTL_SECONDS, modified, payload, etag)
+
+
+def clear():
+    """Drops every cached dashboard (benchmarks, between runs against reset data)."""
+    with _cache_lock:
+        _cache.clear()
+
+
+# -------- QUERIES --------
+def _params(user_id: str, now: datetime) -> Dict[str, Any]:
+    today = now.astimezone(IST).date()
+    today_start = datetime.combine(today, dt_time.min).replace(tzinfo=IST)
+    return {
+        "user_id": user_id,
+        "now": now,
+        "today_start": today_start,
+        "tomorrow_start": today_start + timedelta(days=1),
+        "week_end": today_start + timedelta(days=8),
+        "recent_start": now - timedelta(days=DASHBOARD_SYMPTOM_DAYS),
+        "other": OTHER_TAG,
+        "top_symptoms": TOP_SYMPTOMS,
+        "upcoming_limit": UPCOMING_LIMIT,
+    }
+
+
+def _display(row: Dict[str, Any]) -> Dict[str, Any]:
+    # json_agg renders timestamps in the session time zone; present them in IST like the tools do
+    start_ist = datetime.fromisoformat(row["start_at"]).astimezone(IST)
+    end_ist = datetime.fromisoformat(row["end_at"]).astimezone(IST)
+    return {
+        **row,
+        "start_at": start_ist.isoformat(),
+        "end_at": end_ist.isoformat(),
+        "date": start_ist.strftime("%Y-%m-%d"),
+        "time": start_ist.strftime("%I:%M %p"),
+        "symptoms": row.get("symptoms") or "Not specified",
+    }
+
+
+def doctor_dashboard(db: Session, doctor_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+    now = now or datetime.now(IST)
+    row = db.execute(DOCTOR_SQL, _params(doctor_id, now)).mappings().one()
+    today = [_display(r) for r in row["today"]]
+    return {
+        "date": now.astimezone(IST).date().isoformat(),
+        "today": {
+            "count": sum(1 for r in today if r["status"] == "booked"),
+            "appointments": today,
+        },
+        "upcoming": row["upcoming"],
+        "recent_symptoms": {"days": DASHBOARD_SYMPTOM_DAYS, "buckets": row["symptoms"]},
+    }
+
+
+def patient_dashboard(db: Session, patient_id: str, now: Optional[datetime] = None) -> Dict[str, Any]:
+    now = now or datetime.now(IST)
+    row = db.execute(PATIENT_SQL, _params(patient_id, now)).mappings().one()
+    counts = dict(row["counts"])
+    if counts["last_visit_at"]:
+        counts["last_visit_at"] = datetime.fromisoformat(counts["last_visit_at"]).astimezone(IST).isoformat()
+    upcoming = [_display(r) for r in row["upcoming"]]
+    return {
+        "date": now.astimezone(IST).date().isoformat(),
+        "next_appointment": upcoming[0] if upcoming else None,
+        "upcoming": upcoming,
+        "counts": counts,
+        "recent_symptoms": {"days": DASHBOARD_SYMPTOM_DAYS, "buckets": row["symptoms"]},
+    }
+
+
+BUILDERS = {"doctor": doctor_dashboard, "patient": patient_dashboard}
+
+
+def last_modified(db: Session, role: str, user_id: str) -> Optional[datetime]:
+    return db.execute(LAST_MODIFIED_SQL[role], {"user_id": user_id}).scalar()
+
+
+def get_dashboard(db: Session, role: str, user_id: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Returns (payload, etag) for the user's dashboard, from the cache when it
+    is fresh and none of the user's appointments changed since it was built.
+    The ETag hashes the payload, so it only changes with the data.
+    """
+    key = (role, str(user_id).lower())
+    modified = last_modified(db, role, user_id)
+    cached = _cache_get(key, modified)
+    if cached is not None:
+        return cached
+
+    payload = BUILDERS[role](db, user_id)
+    etag = '"' + hashlib.sha256(serialization.dumps_bytes(payload)).hexdigest()[:32] + '"'
+    _cache_set(key, modified, payload, etag)
+    return payload, etag
@@ -1,7 +1,9 @@
-from fastapi import Depends, HTTPException
+from fastapi import Depends, Header, HTTPException
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
 import uuid # Needed to validate UUID strings
+import hmac
+import os
 
 SECRET_KEY = "dev-secret-key"
 ALGORITHM = "HS256"
@@ -36,4 +38,14 @@ def require_role(allowed_roles: list):
                 detail="You do not have permission to access this resource"
             )
         return current_user
-    return wrapper
\ No newline at end of file
+    return wrapper
+
+# Shared secret for operator endpoints (bulk import etc.); unset disables them
+ADMIN_API_TOKEN = os.getenv("ADMIN_API_TOKEN", "")
+
+def require_admin_token(x_admin_token: str = Header(None, alias="X-Admin-Token")):
+    if not ADMIN_API_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if not x_admin_token or not hmac.compare_digest(x_admin_token, ADMIN_API_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    return True
@@ -1,10 +1,24 @@
 import os
+import queue
 import smtplib
 from email.message import EmailMessage
 import logging
+from app.services import resilience
 
 logger = logging.getLogger(__name__)
 
+
+def _classify_smtp_error(exc: BaseException) -> str:
+    # A refused address is about this message, not the server's health
+    if isinstance(exc, (smtplib.SMTPRecipientsRefused, smtplib.SMTPSenderRefused)):
+        return resilience.CLIENT_ERROR
+    if isinstance(exc, smtplib.SMTPAuthenticationError):
+        return resilience.FAILURE
+    return resilience.TRANSIENT
+
+
+SMTP = resilience.dependency("smtp", classify=_classify_smtp_error)
+
 def send_appointment_email_confirmation(to_email, patient_name, doctor_name, start_at, end_at):
    
     subject = "📅 Appointment Confirmed - Doctor Patient Assistant"
@@ -25,7 +39,7 @@ Your appointment with {doctor_name} is confirmed.
 
     # --- KEEP YOUR TEST MODE ---
     if os.getenv("EMAIL_TEST_MODE", "true").lower() == "true":
-        logger.info(f"TEST MODE: Email to {to_email} suppressed. Body: {body}")
+        logger.info(f"TEST MODE: Email to {to_email} suppressed ({len(body)} chars)")
         return True
 
     # --- PRODUCTION SENDING ---
@@ -33,6 +47,8 @@ Your appointment with {doctor_name} is confirmed.
     smtp_port = int(os.getenv("SMTP_PORT", "465"))
     smtp_user = os.getenv("SMTP_USER")
     smtp_pass = os.getenv("SMTP_PASS")
+    # ssl (default, implicit TLS on 465), starttls (587) or none (local sinks / load tests)
+    smtp_security = os.getenv("SMTP_SECURITY", "ssl").lower()
 
     msg = EmailMessage()
     msg["From"] = f"Smart Clinic <{smtp_user}>"
@@ -40,12 +56,110 @@ Your appointment with {doctor_name} is confirmed.
     msg["Subject"] = subject
     msg.set_content(body)
 
-    try:
-        # Added a 10-second timeout so the tool doesn't hang forever
-        with smtplib.SMTP_SSL(smtp_host, smtp_port, timeout=10) as server:
+    smtp_class = smtplib.SMTP_SSL if smtp_security == "ssl" else smtplib.SMTP
+
+    def _send():
+        # Per-attempt socket timeout; the breaker skips SMTP entirely while it is down
+        with smtp_class(smtp_host, smtp_port, timeout=SMTP.timeout) as server:
+            if smtp_security == "starttls":
+                server.starttls()
             server.login(smtp_user, smtp_pass)
             server.send_message(msg)
-            return True
+
+    try:
+        SMTP.call(_send)
+        return True
     except Exception as e:
         # We raise the error so 'book_appointment_atomic' knows to ROLLBACK
-        raise RuntimeError(f"SMTP Error: {str(e)}")
\ No newline at end of file
+        raise RuntimeError(f"SMTP Error: {str(e)}")
+
+
+# -------- POOLED SENDING (bulk mail such as reminders) --------
+def _open_smtp_connection() -> smtplib.SMTP:
+    smtp_security = os.getenv("SMTP_SECURITY", "ssl").lower()
+    smtp_class = smtplib.SMTP_SSL if smtp_security == "ssl" else smtplib.SMTP
+    server = smtp_class(os.getenv("SMTP_HOST"), int(os.getenv("SMTP_PORT", "465")), timeout=SMTP.timeout)
+    try:
+        if smtp_security == "starttls":
+            server.starttls()
+        server.login(os.getenv("SMTP_USER"), os.getenv("SMTP_PASS"))
+    except Exception:
+        server.close()
+        raise
+    return server
+
+
+class SMTPPool:
+    """
+    Keeps up to `size` logged-in SMTP connections and reuses them across
+    messages, so a batch pays for one connect + TLS + login per connection
+    instead of per email. A connection that errors is dropped; the retry in
+    SMTP.call then opens a fresh one (which also covers idle disconnects).
+    Safe to share between threads. `dep` is the Dependency the sends go
+    through (SMTP unless the caller keeps its own bulkhead).
+    """
+
+    def __init__(self, size: int = 4, dep: resilience.Dependency = SMTP):
+        self.size = size
+        self.dep = dep
+        self._idle: "queue.LifoQueue[smtplib.SMTP]" = queue.LifoQueue(maxsize=size)
+        self.test_mode = os.getenv("EMAIL_TEST_MODE", "true").lower() == "true"
+
+    def send(self, to_email: str, subject: str, body: str) -> bool:
+        if self.test_mode:
+            logger.info(f"TEST MODE: Email to {to_email} suppressed. Subject: {subject}")
+            return True
+
+        msg = EmailMessage()
+        msg["From"] = f"Smart Clinic <{os.getenv('SMTP_USER')}>"
+        msg["To"] = to_email
+        msg["Subject"] = subject
+        msg.set_content(body)
+
+        def _attempt():
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                server = _open_smtp_connection()
+            try:
+                server.send_message(msg)
+            except Exception:
+                try:
+                    server.close()
+                except Exception:
+                    pass
+                raise
+            try:
+                self._idle.put_nowait(server)
+            except queue.Full:
+                server.quit()
+
+        self.dep.call(_attempt)
+        return True
+
+    def close(self):
+        while True:
+            try:
+                server = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            try:
+                server.quit()
+            except Exception:
+                pass
+
+
+def send_appointment_reminder(pool: SMTPPool, to_email, patient_name, doctor_name, start_at, end_at, lead_text: str) -> bool:
+    date_str = start_at.strftime("%B %d, %Y")
+    time_range = f"{start_at.strftime('%I:%M %p')} - {end_at.strftime('%I:%M %p')}"
+    subject = f"⏰ Reminder: your appointment {lead_text} - Doctor Patient Assistant"
+    body = f"""Hi {patient_name},
+This is a reminder of your appointment with {doctor_name} {lead_text}.
+
+        Details:
+        Date: {date_str}
+        Time: {time_range}
+
+        Please arrive 10 minutes early.
+    """
+    return pool.send(to_email, subject, body)
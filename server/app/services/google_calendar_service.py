@@ -1,16 +1,35 @@
 import os
 import logging
 from datetime import datetime
+from typing import Optional
+import httplib2
+import google_auth_httplib2
 from googleapiclient.discovery import build
 from google.oauth2 import service_account
 from googleapiclient.errors import HttpError
 import json
+from app.services import resilience
 
 logger = logging.getLogger(__name__)
 
+
+def _classify_calendar_error(exc: BaseException) -> str:
+    if isinstance(exc, HttpError):
+        status = exc.resp.status if exc.resp is not None else 0
+        # Throttling and server errors are worth a retry; other 4xx are our request
+        if status == 429 or status >= 500:
+            return resilience.TRANSIENT
+        return resilience.CLIENT_ERROR
+    return resilience.TRANSIENT
+
+
+CALENDAR = resilience.dependency("google_calendar", classify=_classify_calendar_error)
+
 # Config
 SERVICE_ACCOUNT_JSON_STR = os.getenv("GOOGLE_SERVICE_ACCOUNT_FILE")
 CALENDAR_ID = os.getenv("GOOGLE_CALENDAR_ID")
+# Optional override of the Calendar API base URL (e.g. a local stand-in for load tests)
+CALENDAR_API_ENDPOINT = os.getenv("GOOGLE_CALENDAR_API_ENDPOINT")
 SCOPES = ["https://www.googleapis.com/auth/calendar"]
 
 # Global variable to cache the service object
@@ -34,7 +53,10 @@ def get_calendar_service():
             creds = service_account.Credentials.from_service_account_info(
                 service_account_info, scopes=SCOPES
             )
-            _calendar_service = build("calendar", "v3", credentials=creds)
+            client_options = {"api_endpoint": CALENDAR_API_ENDPOINT} if CALENDAR_API_ENDPOINT else None
+            # googleapiclient has no timeout of its own; the socket timeout lives on the Http object
+            authorized_http = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http(timeout=CALENDAR.timeout))
+            _calendar_service = build("calendar", "v3", http=authorized_http, client_options=client_options)
             
         except json.JSONDecodeError as je:
             logger.error(f"Failed to parse Google Service Account JSON: {je}")
@@ -51,10 +73,13 @@ def create_calendar_event(
     start_dt: datetime,
     end_dt: datetime,
     symptoms: str = "No symptoms provided",
+    appointment_id: Optional[str] = None,
 ):
     """
     Creates a Google Calendar event. 
     Expects timezone-aware datetime objects.
+    The event ID is derived from the appointment ID, so a retried insert that
+    the API had already accepted gets a 409 instead of creating a duplicate.
     """
     try:
         service = get_calendar_service()
@@ -80,10 +105,20 @@ def create_calendar_event(
             },
         }
 
-        event = service.events().insert(
-            calendarId=CALENDAR_ID, 
-            body=event_body
-        ).execute()
+        if appointment_id:
+            # Event IDs allow lowercase a-v and digits; a UUID's hex digits qualify
+            event_body["id"] = str(appointment_id).replace("-", "").lower()
+
+        try:
+            event = CALENDAR.call(lambda: service.events().insert(
+                calendarId=CALENDAR_ID,
+                body=event_body
+            ).execute())
+        except HttpError as error:
+            if appointment_id and error.resp is not None and error.resp.status == 409:
+                logger.info(f"Calendar event for appointment {appointment_id} already exists")
+                return None
+            raise
 
         logger.info(f"Calendar event created: {event.get('htmlLink')}")
         return event.get('htmlLink')
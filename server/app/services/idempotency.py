@@ -0,0 +1,132 @@
+import os
+import json
+import hashlib
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import IdempotencyKey
+
+logger = logging.getLogger(__name__)
+
+# -------- CONFIG --------
+# How long a completed result is replayed for duplicates of the same request
+IDEMPOTENCY_TTL_SECONDS = int(os.getenv("IDEMPOTENCY_TTL_SECONDS", str(24 * 3600)))
+# A claim left 'in_progress' longer than this (crashed worker) can be taken over
+IDEMPOTENCY_LOCK_SECONDS = int(os.getenv("IDEMPOTENCY_LOCK_SECONDS", "120"))
+
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+
+
+def derive_key(scope: str, tool_name: str, arguments: Dict[str, Any], fields: Iterable[str]) -> str:
+    """
+    Stable key for one logical request: the conversation (or client-supplied key),
+    the tool and the arguments that identify the request. Other arguments
+    (e.g. reworded symptoms on a repeated call) do not change the key.
+    """
+    identity = {f: str(arguments.get(f, "")).strip() for f in fields}
+    raw = f"{scope}\n{tool_name}\n{json.dumps(identity, sort_keys=True)}"
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+def claim(db: Session, key: str, scope: str) -> Optional[Dict[str, Any]]:
+    """
+    Registers `key` as in progress and returns None when the caller should go ahead.
+    Otherwise returns what a duplicate should answer: the stored result of the
+    completed request, or an in-progress notice while the first call is still running.
+    The claim is committed immediately so concurrent duplicates see it.
+    """
+    now = datetime.now(timezone.utc)
+
+    # 1. Insert the claim, or take over one that expired or was abandoned mid-flight
+    stmt = insert(IdempotencyKey).values(
+        key=key,
+        scope=scope,
+        status=IN_PROGRESS,
+        created_at=now,
+        expires_at=now + timedelta(seconds=IDEMPOTENCY_TTL_SECONDS),
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[IdempotencyKey.key],
+        set_={
+            "status": IN_PROGRESS,
+            "response": None,
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=(
+            (IdempotencyKey.expires_at < now)
+            | (
+                (IdempotencyKey.status == IN_PROGRESS)
+                & (IdempotencyKey.created_at < now - timedelta(seconds=IDEMPOTENCY_LOCK_SECONDS))
+            )
+        ),
+    ).returning(IdempotencyKey.key)
+
+    claimed = db.execute(stmt).first() is not None
+    db.commit()
+    if claimed:
+        return None
+
+    # 2. Duplicate: answer from the existing record
+    row = db.execute(
+        select(IdempotencyKey.status, IdempotencyKey.response).where(IdempotencyKey.key == key)
+    ).first()
+    if row is None:
+        # Purged between the two statements; treat as a fresh request
+        return claim(db, key, scope)
+
+    if row.status == COMPLETED and row.response is not None:
+        logger.info(f"Idempotent replay for {scope}")
+        return {**row.response, "replayed": True}
+
+    return {
+        "status": "in_progress",
+        "message": "This request is already being processed. Please wait a moment before checking again.",
+    }
+
+
+def complete(db: Session, key: str, response: Dict[str, Any]):
+    """
+    Stores the result for `key` in the caller's transaction, so the result
+    is recorded only if the work itself commits.
+    """
+    db.query(IdempotencyKey).filter(IdempotencyKey.key == key).update(
+        {"status": COMPLETED, "response": response},
+        synchronize_session=False,
+    )
+
+
+def release(db: Session, key: str):
+    """Drops a claim whose request did not succeed, so a retry runs it again."""
+    try:
+        db.execute(
+            delete(IdempotencyKey).where(IdempotencyKey.key == key, IdempotencyKey.status == IN_PROGRESS)
+        )
+        db.commit()
+    except Exception as e:
+        db.rollback()
+        logger.warning(f"Could not release idempotency key: {e}")
+
+
+def purge_expired(db: Session, batch_size: int = 5000) -> int:
+    """Deletes expired keys in batches (served by ix_idempotency_keys_expires_at)."""
+    now = datetime.now(timezone.utc)
+    total = 0
+    while True:
+        batch = (
+            select(IdempotencyKey.key)
+            .where(IdempotencyKey.expires_at < now)
+            .limit(batch_size)
+            .scalar_subquery()
+        )
+        deleted = db.execute(delete(IdempotencyKey).where(IdempotencyKey.key.in_(batch))).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
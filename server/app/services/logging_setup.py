@@ -0,0 +1,262 @@
+"""
+Process-wide logging: structured records written by a background thread.
+
+configure_logging() puts a single QueueHandler on the root logger. The caller
+(event loop, threadpool or worker thread) only enqueues; a QueueListener
+thread formats and writes to stderr, so a slow or blocked log sink never
+stalls a request. On the way into the queue each record:
+    1. gets the current request_id and conversation_id (context variables
+       set by RequestContextMiddleware and the agent)
+    2. passes a per-call-site rate limit: at most LOG_RATE_LIMIT records per
+       LOG_RATE_WINDOW_SECONDS from one line of code; the rest are counted and
+       reported on the next record from that line that gets through
+    3. is rendered to its final message, cut to LOG_MAX_MESSAGE_CHARS
+When the queue is full, records are dropped (and counted) instead of waiting.
+
+LOG_FORMAT=json (default) writes one JSON object per line; LOG_FORMAT=text
+keeps the old "LEVEL: message" lines for local development.
+"""
+import os
+import sys
+import copy
+import time
+import uuid
+import queue
+import atexit
+import logging
+import threading
+import contextvars
+from datetime import datetime, timezone
+from logging.handlers import QueueHandler, QueueListener
+from typing import Dict, List, Optional, Tuple
+
+from app.services import serialization
+
+# -------- CONFIG --------
+LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
+# json or text
+LOG_FORMAT = os.getenv("LOG_FORMAT", "json").lower()
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+# Records allowed per call site and window; 0 disables rate limiting
+LOG_RATE_LIMIT = int(os.getenv("LOG_RATE_LIMIT", "20"))
+LOG_RATE_WINDOW_SECONDS = float(os.getenv("LOG_RATE_WINDOW_SECONDS", "10"))
+LOG_MAX_MESSAGE_CHARS = int(os.getenv("LOG_MAX_MESSAGE_CHARS", "2000"))
+
+# One line per request by design; never rate limited
+RATE_LIMIT_EXEMPT = {"uvicorn.access"}
+# Routed through the queue instead of uvicorn's own synchronous handlers
+UVICORN_LOGGERS = ("uvicorn", "uvicorn.error", "uvicorn.access")
+
+REQUEST_ID_HEADER = b"x-request-id"
+MAX_REQUEST_ID_CHARS = 128
+
+request_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("request_id", default=None)
+conversation_id_var: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("conversation_id", default=None)
+
+# LogRecord attributes that are not caller-supplied `extra` fields
+_RECORD_ATTRS = set(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {
+    "message", "asctime", "request_id", "conversation_id", "suppressed",
+}
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the IDs of the request they were logged in."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        record.conversation_id = conversation_id_var.get()
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """Fixed-window limit per call site (file and line), so one noisy loop cannot flood the sink."""
+
+    def __init__(self, limit: int, window_seconds: float):
+        super().__init__()
+        self.limit = limit
+        self.window_seconds = window_seconds
+        # (pathname, lineno) -> [window start, records in window, suppressed in window]
+        self._windows: Dict[Tuple[str, int], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if self.limit <= 0 or record.name in RATE_LIMIT_EXEMPT:
+            return True
+        key = (record.pathname, record.lineno)
+        now = time.monotonic()
+        suppressed = 0
+        with self._lock:
+            window = self._windows.get(key)
+            if window is None or now - window[0] >= self.window_seconds:
+                suppressed = int(window[2]) if window else 0
+                window = self._windows[key] = [now, 0, 0]
+            window[1] += 1
+            if window[1] > self.limit:
+                window[2] += 1
+                return False
+        if suppressed:
+            record.suppressed = suppressed
+        return True
+
+
+class NonBlockingQueueHandler(QueueHandler):
+    """Enqueues fully rendered, size-capped records and drops them when the queue is full."""
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Render here: args and tracebacks may reference objects that change
+        # or die before the listener thread gets to the record
+        message = record.getMessage()
+        if len(message) > LOG_MAX_MESSAGE_CHARS:
+            message = f"{message[:LOG_MAX_MESSAGE_CHARS]}... [{len(message) - LOG_MAX_MESSAGE_CHARS} chars truncated]"
+        record = copy.copy(record)
+        record.message = message
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class JsonFormatter(logging.Formatter):
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": datetime.fromtimestamp(record.created, timezone.utc).isoformat(timespec="milliseconds"),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        for key in ("request_id", "conversation_id", "suppressed"):
+            value = getattr(record, key, None)
+            if value:
+                entry[key] = value
+        for key, value in vars(record).items():
+            if key not in _RECORD_ATTRS and not key.startswith("_"):
+                entry[key] = value
+        if record.exc_text:
+            entry["exc"] = record.exc_text
+        if record.stack_info:
+            entry["stack"] = record.stack_info
+        return serialization.dumps(entry)
+
+
+class TextFormatter(logging.Formatter):
+    def __init__(self):
+        super().__init__("%(levelname)s: %(message)s")
+
+    def format(self, record: logging.LogRecord) -> str:
+        line = super().format(record)
+        if getattr(record, "suppressed", 0):
+            line += f" (+{record.suppressed} similar suppressed)"
+        return line
+
+
+_handler: Optional[NonBlockingQueueHandler] = None
+_listener: Optional[QueueListener] = None
+_configure_lock = threading.Lock()
+
+
+def configure_logging():
+    """Installs the queue pipeline on the root logger; later calls are no-ops."""
+    global _handler, _listener
+    with _configure_lock:
+        if _listener is not None:
+            return
+
+        # 1. Writer side: the only handler that touches the stream
+        stream_handler = logging.StreamHandler(sys.stderr)
+        stream_handler.setFormatter(TextFormatter() if LOG_FORMAT == "text" else JsonFormatter())
+
+        # 2. Caller side: filter, render and enqueue
+        _handler = NonBlockingQueueHandler(queue.Queue(maxsize=LOG_QUEUE_SIZE))
+        _handler.addFilter(ContextFilter())
+        _handler.addFilter(RateLimitFilter(LOG_RATE_LIMIT, LOG_RATE_WINDOW_SECONDS))
+
+        root = logging.getLogger()
+        for existing in list(root.handlers):
+            root.removeHandler(existing)
+        root.addHandler(_handler)
+        root.setLevel(LOG_LEVEL)
+
+        for name in UVICORN_LOGGERS:
+            uvicorn_logger = logging.getLogger(name)
+            uvicorn_logger.handlers.clear()
+            uvicorn_logger.propagate = True
+
+        _listener = QueueListener(_handler.queue, stream_handler)
+        _listener.start()
+        atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """Flushes queued records and stops the writer thread."""
+    global _listener
+    with _configure_lock:
+        if _listener is None:
+            return
+        _listener.stop()
+        _listener = None
+        if _handler is not None and _handler.dropped:
+            sys.stderr.write(f"⚠️ {_handler.dropped} log records dropped (queue full)\n")
+
+
+def dropped_records() -> int:
+    return _handler.dropped if _handler is not None else 0
+
+
+def bind_conversation(conversation_id: Optional[str]):
+    """Tags the rest of the current request's records with its conversation."""
+    if conversation_id:
+        conversation_id_var.set(conversation_id[:MAX_REQUEST_ID_CHARS])
+
+
+def _valid_request_id(value: bytes) -> Optional[str]:
+    try:
+        text = value.decode("ascii")
+    except UnicodeDecodeError:
+        return None
+    if 0 < len(text) <= MAX_REQUEST_ID_CHARS and text.isprintable():
+        return text
+    return None
+
+
+class RequestContextMiddleware:
+    """
+    Pure ASGI middleware: gives every HTTP request an ID (the caller's
+    X-Request-ID when it sent a sane one) for its log records, and echoes it
+    in the response.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        incoming = dict(scope["headers"]).get(REQUEST_ID_HEADER)
+        request_id = (incoming and _valid_request_id(incoming)) or uuid.uuid4().hex
+        token = request_id_var.set(request_id)
+        conversation_token = conversation_id_var.set(None)
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(REQUEST_ID_HEADER, request_id.encode())]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            conversation_id_var.reset(conversation_token)
+            request_id_var.reset(token)
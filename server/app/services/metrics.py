@@ -0,0 +1,93 @@
+"""
+Prometheus metrics shared by the API and the MCP tool server.
+
+Scraped from GET /metrics on either process. Metrics live in the default
+per-process registry; with several uvicorn workers, scrape each worker or run
+one worker per container.
+"""
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# -------- EXTERNAL DEPENDENCIES (app/services/resilience.py) --------
+EXTERNAL_CALLS = Counter(
+    "external_calls_total",
+    "Calls to external integrations by outcome "
+    "(success, failure, client_error, rejected_open, rejected_bulkhead)",
+    ["dependency", "outcome"],
+)
+EXTERNAL_CALL_SECONDS = Histogram(
+    "external_call_seconds",
+    "Wall time of external calls that were attempted, retries included",
+    ["dependency"],
+    buckets=(0.05, 0.1, 0.25, 0.5, 1, 2, 5, 10, 30),
+)
+EXTERNAL_RETRIES = Counter(
+    "external_call_retries_total",
+    "Retries of external calls after a transient failure",
+    ["dependency"],
+)
+CIRCUIT_STATE = Gauge(
+    "circuit_breaker_state",
+    "Circuit breaker state per dependency: 0 closed, 1 half-open, 2 open",
+    ["dependency"],
+)
+CIRCUIT_OPENED = Counter(
+    "circuit_breaker_opened_total",
+    "Times a dependency's breaker tripped open",
+    ["dependency"],
+)
+BULKHEAD_IN_FLIGHT = Gauge(
+    "bulkhead_in_flight",
+    "Calls currently holding one of a dependency's concurrency slots",
+    ["dependency"],
+)
+BULKHEAD_LIMIT = Gauge(
+    "bulkhead_limit",
+    "Concurrency slots per dependency",
+    ["dependency"],
+)
+
+# -------- AGENT (app/services/agent) --------
+AGENT_TURNS = Counter(
+    "agent_turns_total",
+    "Chat turns handled by the agent; retried=true when a failed tool call "
+    "(rejected arguments, error result or exception) sent the model round again",
+    ["retried"],
+)
+TOOL_ARG_REPAIRS = Counter(
+    "agent_tool_arg_repairs_total",
+    "Tool arguments fixed before dispatch, by kind "
+    "(relative_date, date_format, datetime_format, timezone, uuid, type, unknown_param)",
+    ["tool", "kind"],
+)
+TOOL_ARG_REJECTIONS = Counter(
+    "agent_tool_arg_rejections_total",
+    "Tool calls returned to the model without dispatch because their arguments could not be repaired",
+    ["tool"],
+)
+
+AGENT_PREFETCH = Counter(
+    "agent_prefetch_total",
+    "Speculative availability lookups by outcome (started, skipped at the in-flight cap, "
+    "hit, hit_in_flight, failed); started minus hits is work that was not used",
+    ["outcome"],
+)
+
+# -------- BOOKING (app/services/slot_holds.py) --------
+SLOT_HOLDS = Counter(
+    "slot_holds_total",
+    "Slot hold attempts by outcome (held, conflict: slot booked or held by another patient)",
+    ["outcome"],
+)
+
+
+# -------- SEARCH (app/services/similar_cases.py) --------
+SIMILAR_CASE_INDEX_BUILDS = Counter(
+    "similar_case_index_builds_total",
+    "Per-doctor similar-case index builds by reason (cold: first query, stale: past max age, grown: IDF out of date)",
+    ["reason"],
+)
+
+
+def render_latest():
+    """(body, content type) for a /metrics response."""
+    return generate_latest(), CONTENT_TYPE_LATEST
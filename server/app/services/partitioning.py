@@ -0,0 +1,163 @@
+"""
+Monthly range partitions of `appointments` on start_at (see migration 0007).
+
+Partitions cover IST calendar months, so a day/week/month query in IST touches
+one or two partitions. Rows outside every month partition land in
+`appointments_default`; creating a month later moves its rows out of the default.
+
+Maintenance runs from app/jobs/maintain_partitions.py:
+  - ensure_future_partitions: keep APPOINTMENT_PARTITION_MONTHS_AHEAD months ready
+  - archive_partitions_before: detach old months and move them to the archive
+    schema (still queryable as archive.appointments_pYYYY_MM) or drop them
+"""
+import os
+import re
+import logging
+from datetime import date, datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+PARENT_TABLE = "appointments"
+DEFAULT_PARTITION = "appointments_default"
+PARTITION_MONTHS_AHEAD = int(os.getenv("APPOINTMENT_PARTITION_MONTHS_AHEAD", "12"))
+ARCHIVE_SCHEMA = os.getenv("APPOINTMENT_ARCHIVE_SCHEMA", "archive")
+
+_NAME_RE = re.compile(r"^appointments_p(\d{4})_(\d{2})$")
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, n: int) -> date:
+    index = month.year * 12 + (month.month - 1) + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"appointments_p{month:%Y_%m}"
+
+
+def month_bounds(month: date) -> Tuple[datetime, datetime]:
+    lower = datetime(month.year, month.month, 1, tzinfo=IST)
+    nxt = add_months(month, 1)
+    return lower, datetime(nxt.year, nxt.month, 1, tzinfo=IST)
+
+
+def list_partitions(db: Session) -> List[date]:
+    """Months that currently have an attached partition, oldest first."""
+    names = db.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :parent
+    """), {"parent": PARENT_TABLE}).scalars().all()
+
+    months = []
+    for name in names:
+        match = _NAME_RE.match(name)
+        if match:
+            months.append(date(int(match.group(1)), int(match.group(2)), 1))
+    return sorted(months)
+
+
+def create_month_partition(db: Session, month: date) -> bool:
+    """
+    Creates the partition for `month` if missing; returns True when created.
+    Rows already sitting in the default partition for that month are moved
+    into it first, since Postgres refuses to add a partition that would
+    overlap rows in the default.
+    """
+    month = month_start(month)
+    if month in list_partitions(db):
+        return False
+
+    name = partition_name(month)
+    lower, upper = month_bounds(month)
+    bounds = {"lower": lower, "upper": upper}
+
+    stray = db.execute(
+        text(f"SELECT EXISTS (SELECT 1 FROM {DEFAULT_PARTITION} WHERE start_at >= :lower AND start_at < :upper)"),
+        bounds,
+    ).scalar()
+
+    if not stray:
+        db.execute(text(
+            f"CREATE TABLE {name} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+    else:
+        # 1. Build the month as a standalone table and move its rows out of the default
+        db.execute(text(f"CREATE TABLE {name} (LIKE {PARENT_TABLE} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+        moved = db.execute(text(f"""
+            WITH moved AS (
+                DELETE FROM {DEFAULT_PARTITION}
+                WHERE start_at >= :lower AND start_at < :upper
+                RETURNING *
+            )
+            INSERT INTO {name} SELECT * FROM moved
+        """), bounds).rowcount
+        # 2. Attach; the parent's indexes are built on it as part of the attach
+        db.execute(text(
+            f"ALTER TABLE {PARENT_TABLE} ATTACH PARTITION {name} "
+            f"FOR VALUES FROM ('{lower.isoformat()}') TO ('{upper.isoformat()}')"
+        ))
+        logger.info(f"Moved {moved} rows from {DEFAULT_PARTITION} into {name}")
+
+    db.commit()
+    return True
+
+
+def ensure_partitions(db: Session, first_month: date, last_month: date) -> List[str]:
+    """Creates every missing month partition from first_month to last_month inclusive."""
+    created = []
+    month = month_start(first_month)
+    while month <= month_start(last_month):
+        if create_month_partition(db, month):
+            created.append(partition_name(month))
+        month = add_months(month, 1)
+    return created
+
+
+def ensure_future_partitions(db: Session, months_ahead: int = PARTITION_MONTHS_AHEAD, today: Optional[date] = None) -> List[str]:
+    current = month_start(today or datetime.now(IST).date())
+    return ensure_partitions(db, current, add_months(current, months_ahead))
+
+
+def archive_partitions_before(db: Session, before_month: date, drop: bool = False) -> List[str]:
+    """
+    Detaches every month partition older than `before_month`. Detached months
+    move to ARCHIVE_SCHEMA (or are dropped with drop=True). Each detach is a
+    catalog-only change committed on its own, so the lock on the parent is brief.
+    (DETACH ... CONCURRENTLY is not an option: Postgres refuses it while a
+    default partition exists.)
+    """
+    cutoff = month_start(before_month)
+    old = [m for m in list_partitions(db) if m < cutoff]
+    if not old:
+        return []
+
+    if not drop:
+        db.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+        db.commit()
+
+    archived = []
+    for month in old:
+        name = partition_name(month)
+        db.execute(text(f"ALTER TABLE {PARENT_TABLE} DETACH PARTITION {name}"))
+
+        if drop:
+            db.execute(text(f"DROP TABLE {name}"))
+        else:
+            db.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        db.commit()
+        archived.append(name)
+        logger.info(f"{'Dropped' if drop else 'Archived'} partition {name}")
+    return archived
@@ -0,0 +1,217 @@
+"""
+Opt-in sampling profiler for individual chat requests.
+
+A request is profiled when it carries `X-Profile: 1` together with a valid
+`X-Admin-Token`, or when it is picked by PROFILE_SAMPLE_RATE. The request
+runs under pyinstrument (optional dependency: `pip install pyinstrument`)
+and the result is written to PROFILE_DIR as a speedscope file (open it at
+https://www.speedscope.app) or an HTML flame view. The response carries
+`X-Profile-Id` with the file name, also downloadable from /admin/profiles.
+
+The sampled stacks cover the request's own task: tool code, ORM hydration and
+formatting show up as frames; work handed to the threadpool (the Groq
+completion) shows as await time. `span()` and `step()` mark the agent's
+phases (each iteration, the completion, each tool call). In speedscope files
+they form a second "spans" timeline next to the samples.
+
+Only the newest PROFILE_MAX_FILES profiles are kept; older ones are deleted
+after each write.
+
+When the middleware is not installed (nothing configured or pyinstrument
+missing) nothing runs per request; `span()` outside a profiled request is a
+context-variable read.
+"""
+import os
+import json
+import time
+import uuid
+import hmac
+import random
+import logging
+import contextvars
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from app.services.dependencies import ADMIN_API_TOKEN
+
+logger = logging.getLogger(__name__)
+
+try:
+    from pyinstrument import Profiler
+    from pyinstrument.renderers import HTMLRenderer, SpeedscopeRenderer
+    PROFILING_AVAILABLE = True
+except ImportError:
+    PROFILING_AVAILABLE = False
+
+# -------- CONFIG --------
+# Fraction of matching requests profiled without asking (0 = only on request)
+PROFILE_SAMPLE_RATE = float(os.getenv("PROFILE_SAMPLE_RATE", "0"))
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+# speedscope or html
+PROFILE_FORMAT = os.getenv("PROFILE_FORMAT", "speedscope").lower()
+PROFILE_INTERVAL_SECONDS = float(os.getenv("PROFILE_INTERVAL_SECONDS", "0.001"))
+PROFILE_MAX_FILES = int(os.getenv("PROFILE_MAX_FILES", "200"))
+PROFILE_PATH_PREFIXES = tuple(p.strip() for p in os.getenv("PROFILE_PATHS", "/agent/chat").split(",") if p.strip())
+
+PROFILE_HEADER = b"x-profile"
+ADMIN_TOKEN_HEADER = b"x-admin-token"
+
+_NOOP = nullcontext()
+
+
+class _Session:
+    def __init__(self):
+        self.started = time.perf_counter()
+        # (name, start offset, end offset) in seconds
+        self.spans: List[Tuple[str, float, float]] = []
+        # Open step() span: (name, start offset)
+        self.step: Optional[Tuple[str, float]] = None
+
+    def end_step(self):
+        if self.step is not None:
+            name, started = self.step
+            self.spans.append((name, started, time.perf_counter() - self.started))
+            self.step = None
+
+
+_session: contextvars.ContextVar[Optional[_Session]] = contextvars.ContextVar("profile_session", default=None)
+
+
+def span(name: str):
+    """Marks a phase of the current profiled request; a no-op otherwise."""
+    session = _session.get()
+    if session is None:
+        return _NOOP
+    return _recording(session, name)
+
+
+def step(name: Optional[str]):
+    """
+    Ends the current request's open step, if any, and opens one called `name`
+    (None only ends it). For consecutive phases such as loop iterations,
+    without wrapping their code in `span()`.
+    """
+    session = _session.get()
+    if session is None:
+        return
+    session.end_step()
+    if name is not None:
+        session.step = (name, time.perf_counter() - session.started)
+
+
+@contextmanager
+def _recording(session: _Session, name: str):
+    started = time.perf_counter() - session.started
+    try:
+        yield
+    finally:
+        session.spans.append((name, started, time.perf_counter() - session.started))
+
+
+def profiling_configured() -> bool:
+    return PROFILE_SAMPLE_RATE > 0 or bool(ADMIN_API_TOKEN)
+
+
+def _with_spans(speedscope_json: str, spans: List[Tuple[str, float, float]]) -> str:
+    """Adds the spans to a speedscope document as an evented profile."""
+    doc = json.loads(speedscope_json)
+    if not spans:
+        return speedscope_json
+    frames = doc["shared"]["frames"]
+    keyed = []
+    for name, start, end in spans:
+        frames.append({"name": name})
+        index = len(frames) - 1
+        # Speedscope needs strict nesting: at equal times closes come first,
+        # the inner span closes before the outer one and the outer one opens first
+        keyed.append(((start, 1, -end), {"type": "O", "frame": index, "at": start}))
+        keyed.append(((end, 0, -start), {"type": "C", "frame": index, "at": end}))
+    events = [event for _, event in sorted(keyed, key=lambda k: k[0])]
+    doc["profiles"].append({
+        "type": "evented",
+        "name": "spans",
+        "unit": "seconds",
+        "startValue": 0,
+        "endValue": max(end for _, _, end in spans),
+        "events": events,
+    })
+    return json.dumps(doc)
+
+
+def _write(profiler, session: _Session, profile_id: str) -> str:
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    if PROFILE_FORMAT == "html":
+        name, content = f"{profile_id}.html", profiler.output(renderer=HTMLRenderer())
+    else:
+        name = f"{profile_id}.speedscope.json"
+        content = _with_spans(profiler.output(renderer=SpeedscopeRenderer()), session.spans)
+    with open(os.path.join(PROFILE_DIR, name), "w") as f:
+        f.write(content)
+    _prune()
+    return name
+
+
+def _prune():
+    """Deletes all but the newest PROFILE_MAX_FILES profiles."""
+    entries = [e for e in os.scandir(PROFILE_DIR) if e.is_file()]
+    if len(entries) <= PROFILE_MAX_FILES:
+        return
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    for entry in entries[PROFILE_MAX_FILES:]:
+        try:
+            os.remove(entry.path)
+        except FileNotFoundError:
+            # Pruned concurrently by another worker
+            pass
+
+
+class ProfilingMiddleware:
+    """Pure ASGI middleware; requests it does not pick go straight through."""
+
+    def __init__(self, app):
+        self.app = app
+
+    def _wanted(self, scope) -> bool:
+        if not scope["path"].startswith(PROFILE_PATH_PREFIXES):
+            return False
+        headers = dict(scope["headers"])
+        if headers.get(PROFILE_HEADER) in (b"1", b"true"):
+            token = headers.get(ADMIN_TOKEN_HEADER, b"").decode("latin-1")
+            if ADMIN_API_TOKEN and hmac.compare_digest(token, ADMIN_API_TOKEN):
+                return True
+        return PROFILE_SAMPLE_RATE > 0 and random.random() < PROFILE_SAMPLE_RATE
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or not self._wanted(scope):
+            await self.app(scope, receive, send)
+            return
+
+        profile_id = f"{datetime.now():%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        session = _Session()
+        token = _session.set(session)
+        profiler = Profiler(interval=PROFILE_INTERVAL_SECONDS, async_mode="enabled")
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                message["headers"] = list(message.get("headers", [])) + [(b"x-profile-id", profile_id.encode())]
+            await send(message)
+
+        profiler.start()
+        try:
+            with span(f"{scope['method']} {scope['path']}"):
+                try:
+                    await self.app(scope, receive, send_with_id)
+                finally:
+                    # A step left open (e.g. by an exception) ends inside the request span
+                    session.end_step()
+        finally:
+            profiler.stop()
+            _session.reset(token)
+            try:
+                name = await run_in_threadpool(_write, profiler, session, profile_id)
+                logger.info(f"Profile saved: {os.path.join(PROFILE_DIR, name)}")
+            except Exception as e:
+                logger.warning(f"Could not save profile {profile_id}: {e}")
@@ -0,0 +1,261 @@
+"""
+Appointment reminders sent by our own dispatcher (app/jobs/send_reminders.py),
+independent of whether the Google Calendar event was created.
+
+Two reminder kinds, each tracked by its own column on `appointments`:
+    24h: start_at within (now + 1h, now + 24h]  -> reminder_24h_sent_at
+    1h:  start_at within (now, now + 1h]         -> reminder_1h_sent_at
+An appointment booked less than an hour ahead only gets the 1h reminder.
+
+Workers claim due appointments in batches with SELECT ... FOR UPDATE SKIP
+LOCKED: rows locked by one worker are skipped by the others, so any number
+of workers (threads or processes, on any host) share the queue without
+sending twice. A batch is marked sent and committed after delivery; if the
+worker dies mid-batch the locks are released and the rows are picked up again.
+"""
+import os
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, Optional
+
+from slack_sdk import WebClient
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.services import resilience
+from app.services.email_service import SMTP, SMTPPool, send_appointment_reminder
+from app.mcp_server.tools.notify_on_slack import SLACK
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# -------- CONFIG --------
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "100"))
+# email (to the patient) and/or slack (DM to the doctor)
+REMINDER_CHANNELS = [c.strip() for c in os.getenv("REMINDER_CHANNELS", "email,slack").split(",") if c.strip()]
+
+
+@dataclass(frozen=True)
+class ReminderKind:
+    name: str
+    column: str
+    lead: timedelta
+    # Appointments closer than this belong to the next kind
+    until: timedelta
+    lead_text: str
+
+
+KINDS: Dict[str, ReminderKind] = {
+    "24h": ReminderKind("24h", "reminder_24h_sent_at", timedelta(hours=24), timedelta(hours=1), "within the next 24 hours"),
+    "1h": ReminderKind("1h", "reminder_1h_sent_at", timedelta(hours=1), timedelta(0), "in about an hour"),
+}
+
+# Served by the partial ix_appointments_reminder_<kind>_due index; the start_at
+# range also prunes to the one or two monthly partitions involved.
+CLAIM_SQL = """
+    SELECT a.id, a.start_at, a.end_at,
+           p.email AS patient_email, p.full_name AS patient_name,
+           d.email AS doctor_email, d.full_name AS doctor_name
+    FROM appointments a
+    JOIN users p ON p.id = a.patient_id
+    JOIN users d ON d.id = a.doctor_id
+    WHERE a.status = 'booked' AND a.{column} IS NULL
+      AND a.start_at > :lower AND a.start_at <= :upper
+    ORDER BY a.start_at
+    LIMIT :batch_size
+    FOR UPDATE OF a SKIP LOCKED
+"""
+
+MARK_SQL = """
+    UPDATE appointments SET {column} = :sent_at
+    WHERE (id, start_at) IN (SELECT * FROM unnest(CAST(:ids AS uuid[]), CAST(:starts AS timestamptz[])))
+"""
+
+
+@dataclass
+class DispatchStats:
+    claimed: int = 0
+    sent: int = 0
+    failed: int = 0
+    batches: int = 0
+    by_kind: Dict[str, int] = field(default_factory=dict)
+
+    def add(self, other: "DispatchStats"):
+        self.claimed += other.claimed
+        self.sent += other.sent
+        self.failed += other.failed
+        self.batches += other.batches
+        for kind, n in other.by_kind.items():
+            self.by_kind[kind] = self.by_kind.get(kind, 0) + n
+
+
+class SlackReminders:
+    """One shared WebClient plus a cache of doctor email -> Slack user ID."""
+
+    def __init__(self, token: str, dep: resilience.Dependency = SLACK):
+        self.dep = dep
+        self.client = WebClient(
+            token=token,
+            base_url=os.getenv("SLACK_API_URL", WebClient.BASE_URL),
+            timeout=int(dep.timeout),
+        )
+        self._user_ids: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def _user_id(self, email: str) -> str:
+        with self._lock:
+            cached = self._user_ids.get(email)
+        if cached:
+            return cached
+        user_id = self.dep.call(lambda: self.client.users_lookupByEmail(email=email))["user"]["id"]
+        with self._lock:
+            self._user_ids[email] = user_id
+        return user_id
+
+    def send(self, row: Dict[str, Any], kind: ReminderKind):
+        start_ist = row["start_at"].astimezone(IST)
+        channel = self._user_id(row["doctor_email"])
+        self.dep.call(lambda: self.client.chat_postMessage(
+            channel=channel,
+            text=f"⏰ Reminder: {row['patient_name']} at {start_ist.strftime('%I:%M %p')} ({start_ist.strftime('%b %d')}), {kind.lead_text}",
+        ), retries=0)
+
+
+class Channels:
+    """
+    Delivery channels shared by every worker thread of a dispatcher process.
+    Sends go through the dispatcher's own SMTP and Slack dependencies, with a
+    bulkhead of `workers` slots: each worker has at most one send in flight,
+    so none is rejected for a slot taken by a sibling or by booking traffic.
+    """
+
+    def __init__(self, channels: List[str] = REMINDER_CHANNELS, workers: int = 4):
+        self.smtp = resilience.dependency("smtp_reminders", SMTP.classify, max_concurrency=workers)
+        self.slack_dep = resilience.dependency("slack_reminders", SLACK.classify, max_concurrency=workers)
+        self.email = SMTPPool(workers, self.smtp) if "email" in channels else None
+        token = os.getenv("SLACK_BOT_TOKEN")
+        self.slack = SlackReminders(token, self.slack_dep) if "slack" in channels and token else None
+
+    def deliver(self, row: Dict[str, Any], kind: ReminderKind) -> bool:
+        """
+        True when the reminder is done, False to leave it due so a later batch
+        retries it while it is still in its window. Email is the channel of
+        record: once it went out, the doctor's Slack copy is best effort, since
+        retrying the row would email the patient twice.
+        """
+        if self.email:
+            try:
+                send_appointment_reminder(
+                    self.email, row["patient_email"], row["patient_name"], row["doctor_name"],
+                    row["start_at"].astimezone(IST), row["end_at"].astimezone(IST), kind.lead_text,
+                )
+            except Exception as e:
+                return self._settled(self.smtp, e, f"Reminder email for {row['id']}")
+        if self.slack:
+            try:
+                self.slack.send(row, kind)
+            except Exception as e:
+                settled = self._settled(self.slack_dep, e, f"Reminder Slack message for {row['id']}")
+                if not self.email:
+                    return settled
+        return True
+
+    @staticmethod
+    def _settled(dep: resilience.Dependency, exc: Exception, what: str) -> bool:
+        # A rejected recipient (bad address, doctor not on Slack) will not fix itself on retry
+        if not isinstance(exc, resilience.DependencyUnavailableError) and dep.classify(exc) == resilience.CLIENT_ERROR:
+            logger.info(f"{what} skipped: {exc}")
+            return True
+        logger.warning(f"{what} deferred: {exc}")
+        return False
+
+    def close(self):
+        if self.email:
+            self.email.close()
+
+
+def dispatch_batch(db: Session, kind: ReminderKind, channels: Channels, batch_size: int = REMINDER_BATCH_SIZE, now: Optional[datetime] = None) -> DispatchStats:
+    """Claims up to batch_size due reminders of one kind, delivers them and marks the delivered ones."""
+    now = now or datetime.now(timezone.utc)
+    stats = DispatchStats()
+    try:
+        # 1. Claim: row locks held until commit; other workers skip these rows
+        rows = db.execute(
+            text(CLAIM_SQL.format(column=kind.column)),
+            {"lower": now + kind.until, "upper": now + kind.lead, "batch_size": batch_size},
+        ).mappings().all()
+        if not rows:
+            db.rollback()
+            return stats
+        stats.claimed = len(rows)
+        stats.batches = 1
+
+        # 2. Deliver
+        delivered = [r for r in rows if channels.deliver(r, kind)]
+
+        # 3. Mark and release
+        if delivered:
+            db.execute(text(MARK_SQL.format(column=kind.column)), {
+                "sent_at": now,
+                "ids": [str(r["id"]) for r in delivered],
+                "starts": [r["start_at"] for r in delivered],
+            })
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    stats.sent = len(delivered)
+    stats.failed = stats.claimed - stats.sent
+    stats.by_kind[kind.name] = stats.sent
+    return stats
+
+
+def drain(db: Session, channels: Channels, kinds: List[ReminderKind], batch_size: int = REMINDER_BATCH_SIZE) -> DispatchStats:
+    """
+    Dispatches batches until nothing is due. A batch that delivers nothing
+    (e.g. SMTP circuit open) ends the run for that kind instead of spinning.
+    """
+    total = DispatchStats()
+    for kind in kinds:
+        while True:
+            stats = dispatch_batch(db, kind, channels, batch_size)
+            total.add(stats)
+            if stats.claimed < batch_size or stats.sent == 0:
+                break
+    return total
+
+
+def run_workers(session_factory, workers: int, kinds: List[ReminderKind], batch_size: int = REMINDER_BATCH_SIZE, channels: Optional[Channels] = None) -> DispatchStats:
+    """Drains due reminders with `workers` threads, each with its own DB session."""
+    own_channels = channels is None
+    channels = channels or Channels(workers=workers)
+    total = DispatchStats()
+    lock = threading.Lock()
+    errors: List[BaseException] = []
+
+    def _worker():
+        try:
+            with session_factory() as db:
+                stats = drain(db, channels, kinds, batch_size)
+            with lock:
+                total.add(stats)
+        except BaseException as e:
+            logger.error(f"Reminder worker failed: {e}")
+            errors.append(e)
+
+    threads = [threading.Thread(target=_worker, name=f"reminders-{i}") for i in range(workers)]
+    try:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    finally:
+        if own_channels:
+            channels.close()
+    if errors and not total.batches:
+        raise errors[0]
+    return total
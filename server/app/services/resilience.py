@@ -0,0 +1,237 @@
+"""
+Fail-fast wrapper for external integrations (Groq, SMTP, Google Calendar, Slack).
+
+Every call to a dependency goes through its `Dependency`, which applies:
+    1. a circuit breaker: after `failure_threshold` consecutive failures the
+       dependency is skipped for `reset_seconds`, then one trial call decides
+       whether to close it again
+    2. a bulkhead: at most `max_concurrency` calls in flight, so a hung
+       dependency ties up a bounded number of workers (and the DB sessions
+       they hold) while the others keep serving
+    3. retries with full-jitter exponential backoff on transient errors
+The per-attempt timeout is applied by the client library (each integration
+passes `dep.timeout` to it); this module only bounds what happens around it.
+
+Settings per dependency come from the environment, e.g.
+    RESILIENCE_SMTP_TIMEOUT=5  RESILIENCE_SMTP_MAX_CONCURRENCY=4
+    RESILIENCE_SMTP_FAILURE_THRESHOLD=3  RESILIENCE_SMTP_RESET_SECONDS=60
+    RESILIENCE_SMTP_RETRIES=1
+State is exported as Prometheus metrics (app/services/metrics.py).
+"""
+import os
+import time
+import random
+import logging
+import threading
+from typing import Any, Callable, Dict, Optional, TypeVar
+
+from app.services import metrics
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# -------- CONFIG --------
+DEFAULTS: Dict[str, Dict[str, float]] = {
+    "groq": {"timeout": 30, "max_concurrency": 16, "failure_threshold": 5, "reset_seconds": 30, "retries": 2},
+    "smtp": {"timeout": 5, "max_concurrency": 4, "failure_threshold": 3, "reset_seconds": 60, "retries": 1},
+    "google_calendar": {"timeout": 5, "max_concurrency": 4, "failure_threshold": 3, "reset_seconds": 60, "retries": 1},
+    "slack": {"timeout": 5, "max_concurrency": 4, "failure_threshold": 3, "reset_seconds": 60, "retries": 1},
+    # The reminder dispatcher's own copies, so its workers neither starve nor are
+    # starved by booking traffic; max_concurrency is sized to --workers there
+    "smtp_reminders": {"timeout": 5, "max_concurrency": 4, "failure_threshold": 3, "reset_seconds": 60, "retries": 1},
+    "slack_reminders": {"timeout": 5, "max_concurrency": 4, "failure_threshold": 3, "reset_seconds": 60, "retries": 1},
+}
+FALLBACK = {"timeout": 10, "max_concurrency": 8, "failure_threshold": 5, "reset_seconds": 30, "retries": 1}
+
+# How long a call may wait for a bulkhead slot before failing fast
+BULKHEAD_WAIT_SECONDS = float(os.getenv("RESILIENCE_BULKHEAD_WAIT_SECONDS", "0.1"))
+BACKOFF_BASE_SECONDS = float(os.getenv("RESILIENCE_BACKOFF_BASE_SECONDS", "0.2"))
+BACKOFF_MAX_SECONDS = float(os.getenv("RESILIENCE_BACKOFF_MAX_SECONDS", "2"))
+
+# Error classes returned by a dependency's classifier
+TRANSIENT = "transient"        # counts against the breaker and is retried
+FAILURE = "failure"            # counts against the breaker, not retried
+CLIENT_ERROR = "client_error"  # our request was wrong (bad input, auth, not found): neither
+
+CLOSED, HALF_OPEN, OPEN = "closed", "half_open", "open"
+_STATE_VALUE = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class DependencyUnavailableError(RuntimeError):
+    """Raised without calling the dependency, because it is failing or saturated."""
+
+    def __init__(self, dependency: str, reason: str):
+        super().__init__(f"{dependency} is unavailable ({reason})")
+        self.dependency = dependency
+        self.reason = reason
+
+
+class CircuitOpenError(DependencyUnavailableError):
+    def __init__(self, dependency: str):
+        super().__init__(dependency, "circuit open")
+
+
+class BulkheadFullError(DependencyUnavailableError):
+    def __init__(self, dependency: str):
+        super().__init__(dependency, "too many concurrent calls")
+
+
+def _setting(name: str, key: str) -> float:
+    default = DEFAULTS.get(name, FALLBACK)[key]
+    return float(os.getenv(f"RESILIENCE_{name.upper()}_{key.upper()}", str(default)))
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open trial call."""
+
+    def __init__(self, name: str, failure_threshold: int, reset_seconds: float):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = CLOSED
+        self.failures = 0
+        self.opened_at = 0.0
+        self._trial_running = False
+        self._lock = threading.Lock()
+        metrics.CIRCUIT_STATE.labels(name).set(0)
+
+    def _set_state(self, state: str):
+        if state == OPEN and self.state != OPEN:
+            metrics.CIRCUIT_OPENED.labels(self.name).inc()
+            logger.warning(f"Circuit for {self.name} opened after {self.failures} consecutive failures")
+        elif state == CLOSED and self.state != CLOSED:
+            logger.info(f"Circuit for {self.name} closed")
+        self.state = state
+        metrics.CIRCUIT_STATE.labels(self.name).set(_STATE_VALUE[state])
+
+    def allow(self) -> bool:
+        with self._lock:
+            if self.state == CLOSED:
+                return True
+            if self.state == OPEN and time.monotonic() - self.opened_at >= self.reset_seconds:
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self._trial_running = False
+            self._set_state(CLOSED)
+
+    def record_failure(self):
+        with self._lock:
+            self.failures += 1
+            self._trial_running = False
+            if self.state == HALF_OPEN or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+                self._set_state(OPEN)
+
+    def release_trial(self):
+        # The trial call ended with a client error, which says nothing about health
+        with self._lock:
+            self._trial_running = False
+
+
+class Dependency:
+    def __init__(self, name: str, classify: Optional[Callable[[BaseException], str]] = None, max_concurrency: Optional[int] = None):
+        self.name = name
+        self.timeout = _setting(name, "timeout")
+        self.retries = int(_setting(name, "retries"))
+        self.max_concurrency = max_concurrency or int(_setting(name, "max_concurrency"))
+        self.classify = classify or (lambda exc: TRANSIENT)
+        self.breaker = CircuitBreaker(name, int(_setting(name, "failure_threshold")), _setting(name, "reset_seconds"))
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
+        self._in_flight = 0
+        self._count_lock = threading.Lock()
+        metrics.BULKHEAD_LIMIT.labels(name).set(self.max_concurrency)
+        metrics.BULKHEAD_IN_FLIGHT.labels(name).set(0)
+
+    def _track(self, delta: int):
+        with self._count_lock:
+            self._in_flight += delta
+            metrics.BULKHEAD_IN_FLIGHT.labels(self.name).set(self._in_flight)
+
+    def call(self, fn: Callable[[], T], retries: Optional[int] = None) -> T:
+        """
+        Runs fn() under the breaker, bulkhead and retry policy. Raises
+        DependencyUnavailableError without calling fn when the dependency is
+        open or saturated; otherwise fn's own exception after the last attempt.
+        """
+        retries = self.retries if retries is None else retries
+
+        # 1. Breaker
+        if not self.breaker.allow():
+            metrics.EXTERNAL_CALLS.labels(self.name, "rejected_open").inc()
+            raise CircuitOpenError(self.name)
+
+        # 2. Bulkhead
+        if not self._slots.acquire(timeout=BULKHEAD_WAIT_SECONDS):
+            self.breaker.release_trial()
+            metrics.EXTERNAL_CALLS.labels(self.name, "rejected_bulkhead").inc()
+            raise BulkheadFullError(self.name)
+
+        self._track(1)
+        started = time.perf_counter()
+        try:
+            # 3. Attempts with jittered backoff in between
+            attempt = 0
+            while True:
+                try:
+                    result = fn()
+                except Exception as e:
+                    kind = self.classify(e)
+                    if kind == CLIENT_ERROR:
+                        self.breaker.release_trial()
+                        metrics.EXTERNAL_CALLS.labels(self.name, "client_error").inc()
+                        raise
+                    if kind == TRANSIENT and attempt < retries and self.breaker.state == CLOSED:
+                        attempt += 1
+                        metrics.EXTERNAL_RETRIES.labels(self.name).inc()
+                        delay = random.uniform(0, min(BACKOFF_MAX_SECONDS, BACKOFF_BASE_SECONDS * 2 ** attempt))
+                        logger.info(f"{self.name} call failed ({e!r}), retry {attempt}/{retries} in {delay:.2f}s")
+                        time.sleep(delay)
+                        continue
+                    self.breaker.record_failure()
+                    metrics.EXTERNAL_CALLS.labels(self.name, "failure").inc()
+                    raise
+                self.breaker.record_success()
+                metrics.EXTERNAL_CALLS.labels(self.name, "success").inc()
+                return result
+        finally:
+            metrics.EXTERNAL_CALL_SECONDS.labels(self.name).observe(time.perf_counter() - started)
+            self._track(-1)
+            self._slots.release()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "state": self.breaker.state,
+            "consecutive_failures": self.breaker.failures,
+            "in_flight": self._in_flight,
+            "max_concurrency": self.max_concurrency,
+            "timeout_seconds": self.timeout,
+        }
+
+
+_registry: Dict[str, Dependency] = {}
+_registry_lock = threading.Lock()
+
+
+def dependency(name: str, classify: Optional[Callable[[BaseException], str]] = None, max_concurrency: Optional[int] = None) -> Dependency:
+    """
+    Returns the process-wide Dependency for `name`, creating it on first use.
+    `max_concurrency` overrides the configured bulkhead size; a later call
+    asking for a larger bulkhead than the existing one replaces it.
+    """
+    with _registry_lock:
+        existing = _registry.get(name)
+        if existing is None or (max_concurrency and max_concurrency > existing.max_concurrency):
+            _registry[name] = Dependency(name, classify or (existing.classify if existing else None), max_concurrency)
+        return _registry[name]
+
+
+def status() -> Dict[str, Dict[str, Any]]:
+    return {name: dep.status() for name, dep in _registry.items()}
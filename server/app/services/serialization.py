@@ -0,0 +1,102 @@
+"""
+One JSON codec for API responses, tool results and tool arguments.
+
+JSON_BACKEND selects orjson (default), msgspec or stdlib; a backend that is not
+installed falls back to stdlib. All backends produce compact UTF-8 JSON with
+non-ASCII characters left as-is, and encode UUIDs, datetimes and dates as strings.
+"""
+import os
+import json
+import logging
+import uuid
+from datetime import date, datetime
+from decimal import Decimal
+from enum import Enum
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+
+logger = logging.getLogger(__name__)
+
+JSON_BACKEND = os.getenv("JSON_BACKEND", "orjson").lower()
+
+
+def _default(obj: Any) -> Any:
+    # Types the stdlib encoder (and msgspec/orjson, for the rarer ones) cannot handle natively
+    if isinstance(obj, (datetime, date)):
+        return obj.isoformat()
+    if isinstance(obj, (uuid.UUID, Decimal)):
+        return str(obj)
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _stdlib_codec():
+    def dumps_bytes(obj: Any) -> bytes:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default).encode()
+
+    return "stdlib", dumps_bytes, json.loads
+
+
+def _orjson_codec():
+    import orjson
+
+    options = orjson.OPT_NON_STR_KEYS
+
+    def dumps_bytes(obj: Any) -> bytes:
+        return orjson.dumps(obj, default=_default, option=options)
+
+    return "orjson", dumps_bytes, orjson.loads
+
+
+def _msgspec_codec():
+    import msgspec
+
+    encoder = msgspec.json.Encoder(enc_hook=_default)
+    decoder = msgspec.json.Decoder()
+    return "msgspec", encoder.encode, decoder.decode
+
+
+_CODECS = {"orjson": _orjson_codec, "msgspec": _msgspec_codec, "stdlib": _stdlib_codec}
+
+
+def _load_codec(name: str):
+    factory = _CODECS.get(name)
+    if factory is None:
+        logger.warning(f"Unknown JSON_BACKEND '{name}', using stdlib")
+        return _stdlib_codec()
+    try:
+        return factory()
+    except ImportError:
+        logger.warning(f"JSON_BACKEND '{name}' is not installed, using stdlib")
+        return _stdlib_codec()
+
+
+BACKEND, dumps_bytes, _loads = _load_codec(JSON_BACKEND)
+dumps_bytes: Callable[[Any], bytes]
+
+
+def dumps(obj: Any) -> str:
+    """Compact JSON text."""
+    return dumps_bytes(obj).decode()
+
+
+def loads(data: Any) -> Any:
+    """Parses JSON from str or bytes; raises ValueError on invalid input with every backend."""
+    try:
+        return _loads(data)
+    except ValueError:
+        raise
+    except Exception as e:
+        # msgspec.DecodeError is not a ValueError subclass
+        raise ValueError(str(e)) from e
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with the configured backend (the app's default response class)."""
+
+    def render(self, content: Any) -> bytes:
+        return dumps_bytes(content)
@@ -0,0 +1,349 @@
+"""
+Similar-case search over appointment symptoms, local and network-free.
+
+Each doctor's appointments (not cancelled, last SIMILAR_CASES_HISTORY_DAYS)
+are held in memory as a sparse TF-IDF matrix over three kinds of terms:
+    - stemmed words ('coughing' -> cough)
+    - character trigrams of each word, so misspellings and word forms overlap
+    - the canonical symptom tags, so synonyms meet ('throwing up' ~ 'vomiting')
+Rows are L2-normalized and the query is scored by cosine similarity. The
+matrix is stored column-major (CSC): a query reads only the columns of its
+own terms, like an inverted index, which keeps a 100k-row doctor at a few
+milliseconds per query.
+
+An index is built on a doctor's first query and kept for up to
+SIMILAR_CASES_MAX_DOCTORS doctors (least recently used dropped first).
+Concurrent first queries for one doctor wait for a single build; callers run
+search() off the event loop (find_similar_cases uses a worker thread). Each
+index has its own lock, so searches for different doctors do not wait on
+each other.
+Bookings made in this process are added as they commit (book_appointment
+calls add()) and scored from a small pending block until
+SIMILAR_CASES_FOLD_ROWS of them are folded into the matrix. Once the index
+is older than SIMILAR_CASES_MAX_AGE_SECONDS (bookings by other workers,
+cancellations) or has grown by a quarter since its IDF weights were computed,
+a background thread rebuilds it from the database while it keeps serving.
+"""
+import os
+import math
+import time
+import logging
+import threading
+from functools import lru_cache
+from collections import Counter, OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from scipy import sparse
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db.models import Appointment, AppointmentStatus
+from app.services import metrics
+from app.services.symptom_tagger import NOT_PROVIDED_TAG, normalize_symptoms, tokenize
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# -------- CONFIG --------
+SIMILAR_CASES_HISTORY_DAYS = int(os.getenv("SIMILAR_CASES_HISTORY_DAYS", "730"))
+SIMILAR_CASES_MAX_DOCTORS = int(os.getenv("SIMILAR_CASES_MAX_DOCTORS", "50"))
+SIMILAR_CASES_MAX_AGE_SECONDS = int(os.getenv("SIMILAR_CASES_MAX_AGE_SECONDS", "600"))
+SIMILAR_CASES_FOLD_ROWS = int(os.getenv("SIMILAR_CASES_FOLD_ROWS", "256"))
+# Cosine similarity below this is not reported
+SIMILAR_CASES_MIN_SCORE = float(os.getenv("SIMILAR_CASES_MIN_SCORE", "0.1"))
+
+# Term counts of a tag, relative to one word
+TAG_WEIGHT = 2.0
+# A rebuild is due once the index has this many times the rows its IDF saw
+REGROW_FACTOR = 1.25
+
+Row = Tuple[str, datetime, str, Sequence[str]]  # (appointment id, start_at, symptoms, symptom_tags)
+
+
+@lru_cache(maxsize=100_000)
+def _word_terms(word: str) -> Tuple[str, ...]:
+    padded = f"<{word}>"
+    return ("w:" + word,) + tuple("c:" + padded[i:i + 3] for i in range(len(padded) - 2))
+
+
+def terms(symptoms: str, tags: Optional[Sequence[str]] = None) -> Dict[str, float]:
+    """Sublinear term frequencies (1 + log tf) of one symptoms text."""
+    counts: Dict[str, float] = {}
+    for word in tokenize(symptoms or ""):
+        for term in _word_terms(word):
+            counts[term] = counts.get(term, 0) + 1
+    for tag in tags if tags is not None else normalize_symptoms(symptoms):
+        if tag != NOT_PROVIDED_TAG:
+            counts["t:" + tag] = counts.get("t:" + tag, 0) + TAG_WEIGHT
+    return {term: 1.0 + math.log(count) for term, count in counts.items()}
+
+
+def _idf(n_docs: int, df: int) -> float:
+    # Smoothed, never zero, so a term in every row still counts a little
+    return math.log((1 + n_docs) / (1 + df)) + 1.0
+
+
+class DoctorIndex:
+    """TF-IDF rows of one doctor's appointments. Not thread-safe; callers hold self.lock."""
+
+    def __init__(self, rows: Iterable[Row]):
+        self.lock = threading.Lock()
+        self.built_at = time.monotonic()
+        self.rebuilding = False
+        self.vocabulary: Dict[str, int] = {}
+        self.df: Counter = Counter()
+        self.ids: List[str] = []
+        starts, row_texts = [], []
+        # Symptom texts repeat a lot ('fever', 'follow-up visit'): weight each
+        # distinct text once, then pick its row for every appointment
+        text_ids: Dict[str, int] = {}
+        texts: List[Dict[str, float]] = []
+        for appointment_id, start_at, symptoms, tags in rows:
+            text_id = text_ids.get(symptoms)
+            if text_id is None:
+                text_id = text_ids[symptoms] = len(texts)
+                texts.append(terms(symptoms, tags))
+            if not texts[text_id]:
+                continue
+            self.ids.append(str(appointment_id))
+            starts.append(start_at.timestamp())
+            row_texts.append(text_id)
+
+        self.starts = np.asarray(starts, dtype=np.float64)
+        self.n_at_build = len(self.ids)
+        self.idf = np.empty(0, dtype=np.float64)
+        self.matrix = sparse.csc_matrix((0, 0), dtype=np.float64)
+        self.pending: List[Tuple[str, float, Dict[str, float]]] = []
+        self._append_block(texts, np.asarray(row_texts, dtype=np.int64))
+
+    @property
+    def size(self) -> int:
+        return len(self.ids) + len(self.pending)
+
+    def _append_block(self, texts: List[Dict[str, float]], order: np.ndarray, count_df: bool = True):
+        """
+        Appends the rows texts[i] for i in order (self.ids already lists them).
+        Terms new to the vocabulary get a column and an IDF weight; with
+        count_df their document frequencies are counted here too.
+        """
+        if not len(order):
+            return
+        known_terms = len(self.vocabulary)
+        indptr, indices, data = [0], [], []
+        for row in texts:
+            indices.extend(self.vocabulary.setdefault(term, len(self.vocabulary)) for term in row)
+            data.extend(row.values())
+            indptr.append(len(indices))
+        block = sparse.csr_matrix(
+            (np.asarray(data, dtype=np.float64), np.asarray(indices, dtype=np.int32), np.asarray(indptr, dtype=np.int32)),
+            shape=(len(texts), len(self.vocabulary)),
+        )
+
+        # 1. Document frequencies (each text counts once per row using it), IDF of new terms
+        if count_df:
+            rows_per_text = np.bincount(order, minlength=len(texts))
+            nnz_rows = np.repeat(np.arange(len(texts)), np.diff(block.indptr))
+            df = np.bincount(block.indices, weights=rows_per_text[nnz_rows], minlength=len(self.vocabulary))
+            for term, column in self.vocabulary.items():
+                self.df[term] += int(df[column])
+        new_terms = sorted(self.vocabulary.items(), key=lambda item: item[1])[known_terms:]
+        self.idf = np.concatenate([self.idf, [_idf(len(self.ids), self.df[term]) for term, _ in new_terms]])
+
+        # 2. tf * idf, unit rows, one row per appointment
+        block = block.multiply(self.idf[np.newaxis, :]).tocsr()
+        norms = np.sqrt(np.asarray(block.multiply(block).sum(axis=1)).ravel())
+        block = (sparse.diags(1.0 / np.maximum(norms, 1e-12)) @ block)[order]
+
+        self.matrix.resize((self.matrix.shape[0], len(self.vocabulary)))
+        self.matrix = sparse.vstack([self.matrix, block], format="csc")
+
+    def add(self, appointment_id: str, start_at: datetime, symptoms: str, tags: Sequence[str]):
+        row = terms(symptoms, tags)
+        if not row:
+            return
+        self.df.update(row.keys())
+        self.pending.append((str(appointment_id), start_at.timestamp(), row))
+        if len(self.pending) >= SIMILAR_CASES_FOLD_ROWS:
+            self.fold()
+
+    def fold(self):
+        """Moves pending rows into the matrix."""
+        if not self.pending:
+            return
+        pending, self.pending = self.pending, []
+        self.ids.extend(p[0] for p in pending)
+        self.starts = np.concatenate([self.starts, [p[1] for p in pending]])
+        # add() counted their document frequencies already
+        self._append_block([p[2] for p in pending], np.arange(len(pending)), count_df=False)
+
+    def search(
+        self,
+        symptoms: str,
+        top_k: int,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+        exclude_id: Optional[str] = None,
+    ) -> List[Tuple[str, float, float]]:
+        """[(appointment id, start_at timestamp, cosine score)], best first."""
+        query = terms(symptoms)
+        if not query:
+            return []
+
+        # 1. Query vector: tf * idf over the terms this doctor's rows use, unit
+        # length; other terms (typos, words never seen) cannot match and would
+        # only shrink every score
+        n_docs = self.size
+        weights = {term: tf * _idf(n_docs, self.df[term]) for term, tf in query.items() if self.df[term]}
+        if not weights:
+            return []
+        norm = math.sqrt(sum(w * w for w in weights.values()))
+        weights = {term: w / norm for term, w in weights.items()}
+
+        # 2. Matrix rows: read only the query's columns
+        known = [(self.vocabulary[t], w) for t, w in weights.items() if t in self.vocabulary]
+        scores = np.zeros(len(self.ids))
+        if known and len(self.ids):
+            columns = np.fromiter((c for c, _ in known), dtype=np.int32, count=len(known))
+            values = np.fromiter((w for _, w in known), dtype=np.float64, count=len(known))
+            scores = self.matrix[:, columns] @ values
+
+        mask = scores >= SIMILAR_CASES_MIN_SCORE
+        if since is not None:
+            mask &= self.starts >= since.timestamp()
+        if until is not None:
+            mask &= self.starts <= until.timestamp()
+        candidates = np.flatnonzero(mask)
+        if len(candidates) > top_k:
+            best = np.argpartition(-scores[candidates], top_k)[:top_k + 1]
+            candidates = candidates[best]
+        found = [(self.ids[i], self.starts[i], float(scores[i])) for i in candidates]
+
+        # 3. Pending rows (a few hundred at most), weighted like the query
+        for appointment_id, start_ts, row in self.pending:
+            if (since is not None and start_ts < since.timestamp()) or (until is not None and start_ts > until.timestamp()):
+                continue
+            row_weights = {term: tf * _idf(n_docs, self.df[term]) for term, tf in row.items()}
+            row_norm = math.sqrt(sum(w * w for w in row_weights.values()))
+            score = sum(weights[t] * w for t, w in row_weights.items() if t in weights) / row_norm
+            if score >= SIMILAR_CASES_MIN_SCORE:
+                found.append((appointment_id, start_ts, score))
+
+        found = [f for f in found if f[0] != exclude_id]
+        found.sort(key=lambda f: -f[2])
+        return found[:top_k]
+
+
+# -------- PER-DOCTOR INDEXES --------
+_indexes: "OrderedDict[str, DoctorIndex]" = OrderedDict()
+# Guards _indexes and _build_locks only; searches lock their own index
+_lock = threading.Lock()
+# doctor -> lock held while a cold build for them runs
+_build_locks: Dict[str, threading.Lock] = {}
+
+
+def _load_rows(db: Session, doctor_id: str) -> List[Row]:
+    since = datetime.now(IST) - timedelta(days=SIMILAR_CASES_HISTORY_DAYS)
+    return db.execute(
+        select(Appointment.id, Appointment.start_at, Appointment.symptoms, Appointment.symptom_tags).where(
+            Appointment.doctor_id == doctor_id,
+            Appointment.status != AppointmentStatus.cancelled,
+            Appointment.start_at >= since,
+        )
+    ).all()
+
+
+def _build(db: Session, key: str, reason: str) -> DoctorIndex:
+    started = time.perf_counter()
+    index = DoctorIndex(_load_rows(db, key))
+    metrics.SIMILAR_CASE_INDEX_BUILDS.labels(reason).inc()
+    logger.info(f"Built similar-case index for doctor {key}: {index.size} rows, {len(index.vocabulary)} terms "
+                f"in {(time.perf_counter() - started) * 1000:.0f}ms ({reason})")
+    with _lock:
+        _indexes[key] = index
+        _indexes.move_to_end(key)
+        while len(_indexes) > SIMILAR_CASES_MAX_DOCTORS:
+            _indexes.popitem(last=False)
+    return index
+
+
+def _rebuild_in_background(key: str, old: DoctorIndex, reason: str):
+    # Bookings added to the old index while this runs are in the rows it reads,
+    # unless they commit after the read; the next rebuild picks those up
+    from app.db.database import SessionLocal
+
+    try:
+        with SessionLocal() as db:
+            _build(db, key, reason)
+    except Exception as e:
+        logger.warning(f"Similar-case index rebuild failed for doctor {key}: {e}")
+        old.rebuilding = False
+
+
+def _get_index(db: Session, doctor_id: str) -> DoctorIndex:
+    """
+    The doctor's index. The first query builds it in the calling thread (others
+    asking meanwhile wait for that build); an index that is stale or has
+    outgrown its IDF keeps serving while a thread rebuilds it.
+    """
+    key = str(doctor_id).lower()
+    with _lock:
+        index = _indexes.get(key)
+        if index is not None:
+            _indexes.move_to_end(key)
+            if time.monotonic() - index.built_at > SIMILAR_CASES_MAX_AGE_SECONDS:
+                reason = "stale"
+            elif index.size > max(index.n_at_build, SIMILAR_CASES_FOLD_ROWS) * REGROW_FACTOR:
+                reason = "grown"
+            else:
+                reason = None
+            if reason and not index.rebuilding:
+                index.rebuilding = True
+                threading.Thread(target=_rebuild_in_background, args=(key, index, reason), daemon=True).start()
+            return index
+        build_lock = _build_locks.setdefault(key, threading.Lock())
+
+    with build_lock:
+        with _lock:
+            index = _indexes.get(key)
+        if index is not None:
+            # Built by a concurrent first query while this one waited
+            return index
+        try:
+            return _build(db, key, "cold")
+        finally:
+            with _lock:
+                _build_locks.pop(key, None)
+
+
+def search(
+    db: Session,
+    doctor_id: str,
+    symptoms: str,
+    top_k: int,
+    since: Optional[datetime] = None,
+    until: Optional[datetime] = None,
+    exclude_id: Optional[str] = None,
+) -> List[Tuple[str, datetime, float]]:
+    """The doctor's top_k appointments most similar to `symptoms`, as (appointment id, start_at, score)."""
+    index = _get_index(db, doctor_id)
+    with index.lock:
+        found = index.search(symptoms, top_k, since, until, str(exclude_id).lower() if exclude_id else None)
+    return [(appointment_id, datetime.fromtimestamp(ts, IST), score) for appointment_id, ts, score in found]
+
+
+def add(doctor_id: str, appointment_id: str, start_at: datetime, symptoms: str, tags: Sequence[str]):
+    """Adds a committed booking to the doctor's index, if this process has one."""
+    with _lock:
+        index = _indexes.get(str(doctor_id).lower())
+    if index is not None:
+        with index.lock:
+            index.add(appointment_id, start_at, symptoms, tags)
+
+
+def clear():
+    """Drops every doctor's index (benchmarks, between runs against reset data)."""
+    with _lock:
+        _indexes.clear()
@@ -0,0 +1,144 @@
+"""
+Short-lived slot holds between picking a slot and booking it.
+
+Booking takes several LLM turns after the patient picks a slot (the prompt
+asks for symptoms first). A hold reserves the slot for SLOT_HOLD_TTL_SECONDS
+meanwhile: other patients' availability no longer lists it and their booking
+attempts get a conflict, while the holder books it as usual.
+
+    - one active hold per patient: a new hold replaces the patient's previous one
+    - a hold on a slot held by someone else only succeeds once that hold expired
+    - booking releases the patient's holds with that doctor (same transaction)
+Expired holds are ignored by every query, so expiry needs no timer; the
+sweep in app/jobs/purge_slot_holds.py only reclaims the rows.
+
+Each hold also sets a marker for its (doctor, day) in the availability cache
+backend, valid for the hold TTL. Slot lookups for days without a marker skip
+the holds query, so cached availability stays query-free.
+"""
+import os
+import logging
+from datetime import date, datetime, time, timedelta, timezone
+from typing import Optional, Set
+
+from sqlalchemy import delete, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.db.models import SlotHold
+from app.services import availability_cache, metrics
+
+logger = logging.getLogger(__name__)
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# -------- CONFIG --------
+SLOT_HOLD_TTL_SECONDS = int(os.getenv("SLOT_HOLD_TTL_SECONDS", "300"))
+
+# Holds cover one bookable slot
+HOLD_LENGTH = timedelta(hours=1)
+
+
+def hold(db: Session, doctor_id: str, patient_id: str, start_at: datetime, end_at: datetime) -> Optional[datetime]:
+    """
+    Places (or refreshes) the patient's hold on a slot and commits. Returns
+    its expiry, or None when another patient holds the slot.
+    """
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(seconds=SLOT_HOLD_TTL_SECONDS)
+
+    # 1. Drop the patient's other hold, if any (served by ix_slot_holds_patient_id)
+    db.execute(
+        delete(SlotHold).where(
+            SlotHold.patient_id == patient_id,
+            ~((SlotHold.doctor_id == doctor_id) & (SlotHold.start_at == start_at)),
+        )
+    )
+
+    # 2. Insert, or take over a hold that is ours or has expired
+    stmt = insert(SlotHold).values(
+        doctor_id=doctor_id,
+        start_at=start_at,
+        end_at=end_at,
+        patient_id=patient_id,
+        created_at=now,
+        expires_at=expires_at,
+    )
+    stmt = stmt.on_conflict_do_update(
+        index_elements=[SlotHold.doctor_id, SlotHold.start_at],
+        set_={
+            "end_at": stmt.excluded.end_at,
+            "patient_id": stmt.excluded.patient_id,
+            "created_at": stmt.excluded.created_at,
+            "expires_at": stmt.excluded.expires_at,
+        },
+        where=(SlotHold.patient_id == stmt.excluded.patient_id) | (SlotHold.expires_at <= now),
+    ).returning(SlotHold.expires_at)
+
+    held = db.execute(stmt).first() is not None
+    db.commit()
+    if held:
+        availability_cache.mark_held(doctor_id, start_at.astimezone(IST).date(), SLOT_HOLD_TTL_SECONDS)
+    metrics.SLOT_HOLDS.labels("held" if held else "conflict").inc()
+    return expires_at if held else None
+
+
+def held_hours(db: Session, doctor_id: str, day: date, requester_id: Optional[str] = None) -> Set[int]:
+    """IST start hours on `day` held by patients other than requester_id (primary key range scan)."""
+    if not availability_cache.may_have_holds(doctor_id, day):
+        return set()
+    day_start = datetime.combine(day, time.min).replace(tzinfo=IST)
+    query = select(SlotHold.start_at).where(
+        SlotHold.doctor_id == doctor_id,
+        SlotHold.start_at >= day_start,
+        SlotHold.start_at < day_start + timedelta(days=1),
+        SlotHold.expires_at > datetime.now(timezone.utc),
+    )
+    if requester_id:
+        query = query.where(SlotHold.patient_id != requester_id)
+    return {start_at.astimezone(IST).hour for start_at in db.execute(query).scalars()}
+
+
+def held_by_other(db: Session, doctor_id: str, patient_id: str, start_at: datetime, end_at: datetime) -> bool:
+    """True when a live hold of another patient overlaps [start_at, end_at)."""
+    return db.execute(
+        select(SlotHold.start_at).where(
+            SlotHold.doctor_id == doctor_id,
+            SlotHold.start_at < end_at,
+            SlotHold.end_at > start_at,
+            # Implied by end_at > start_at; keeps it a primary key range scan
+            SlotHold.start_at > start_at - HOLD_LENGTH,
+            SlotHold.patient_id != patient_id,
+            SlotHold.expires_at > datetime.now(timezone.utc),
+        ).limit(1)
+    ).first() is not None
+
+
+def release(db: Session, doctor_id: str, patient_id: str):
+    """Drops the patient's holds with this doctor, in the caller's transaction."""
+    db.execute(delete(SlotHold).where(SlotHold.doctor_id == doctor_id, SlotHold.patient_id == patient_id))
+
+
+def purge_expired(db: Session, batch_size: int = 5000) -> int:
+    """Deletes expired holds in batches (served by ix_slot_holds_expires_at)."""
+    now = datetime.now(timezone.utc)
+    total = 0
+    while True:
+        batch = (
+            select(SlotHold.doctor_id, SlotHold.start_at)
+            .where(SlotHold.expires_at <= now)
+            .limit(batch_size)
+            .subquery()
+        )
+        deleted = db.execute(
+            delete(SlotHold).where(
+                SlotHold.doctor_id == batch.c.doctor_id,
+                SlotHold.start_at == batch.c.start_at,
+                # Re-checked: the slot may have been held again since the batch was read
+                SlotHold.expires_at <= now,
+            )
+        ).rowcount
+        db.commit()
+        total += deleted
+        if deleted < batch_size:
+            return total
@@ -0,0 +1,186 @@
+import re
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+# -------- VOCABULARY --------
+# Canonical tag -> phrases that mean it. Order matters: the first tag found in a
+# symptom text is its primary tag (used as the analytics bucket), so more
+# clinically significant tags come first.
+SYMPTOM_SYNONYMS: Dict[str, List[str]] = {
+    "chest_pain": ["chest pain", "chest tightness", "chest discomfort", "angina"],
+    "breathing_difficulty": [
+        "shortness of breath", "short of breath", "breathless", "breathlessness",
+        "difficulty breathing", "trouble breathing", "wheeze", "wheezing", "asthma",
+    ],
+    "fever": ["fever", "feverish", "high temperature", "temperature", "pyrexia", "chills"],
+    "cough": ["cough", "coughing", "dry cough", "wet cough"],
+    "cold": ["cold", "common cold", "runny nose", "blocked nose", "stuffy nose", "sneeze", "sneezing", "congestion", "flu"],
+    "sore_throat": ["sore throat", "throat pain", "throat ache", "scratchy throat", "tonsillitis"],
+    "headache": ["headache", "head ache", "head pain", "migraine"],
+    "abdominal_pain": ["stomach ache", "stomach pain", "stomachache", "abdominal pain", "tummy ache", "belly pain", "cramps"],
+    "nausea": ["nausea", "nauseous", "vomit", "vomiting", "throwing up", "throw up"],
+    "diarrhea": ["diarrhea", "diarrhoea", "loose motion", "loose motions"],
+    "acidity": ["acidity", "heartburn", "acid reflux", "indigestion", "gastritis"],
+    "back_pain": ["back pain", "backache", "back ache", "lower back pain"],
+    "joint_pain": ["joint pain", "knee pain", "arthritis", "shoulder pain", "stiff joints"],
+    "injury": ["injury", "injured", "sprain", "fracture", "wound", "cut", "bruise"],
+    "rash": ["rash", "itch", "itching", "itchy", "hives", "skin irritation", "eczema", "acne"],
+    "allergy": ["allergy", "allergic", "allergies"],
+    "dizziness": ["dizzy", "dizziness", "vertigo", "lightheaded", "light headed", "fainting"],
+    "fatigue": ["fatigue", "tired", "tiredness", "weakness", "exhausted", "lethargy"],
+    "anxiety": ["anxiety", "anxious", "stress", "panic attack", "panic"],
+    "insomnia": ["insomnia", "sleepless", "can't sleep", "cannot sleep", "trouble sleeping"],
+    "blood_pressure": ["blood pressure", "hypertension", "high bp", "low bp"],
+    "diabetes": ["diabetes", "diabetic", "blood sugar", "sugar level"],
+    "follow_up": ["follow up", "follow-up", "followup", "checkup", "check-up", "check up", "routine visit", "review"],
+}
+
+NOT_PROVIDED_TAG = "not_provided"
+OTHER_TAG = "other"
+
+NOT_PROVIDED_TEXTS = {"", "not provided", "no symptoms provided", "none", "n/a", "na", "not specified"}
+
+NEGATION_WORDS = ("no", "not", "without", "denies", "never")
+NEGATION_WINDOW = 2
+# A negation only reaches phrases in its own clause: "no fever, headache" and
+# "no fever but headache" both still have a headache
+CLAUSE_BREAK_WORDS = ("and", "but", "however", "though", "although", "except")
+
+_TOKEN_RE = re.compile(r"[a-z]+(?:'[a-z]+)?")
+_CLAUSE_RE = re.compile(r"[,;:.!?()\n]+")
+
+
+# -------- STEMMING --------
+@lru_cache(maxsize=50_000)
+def stem(word: str) -> str:
+    """
+    Small suffix-stripping stemmer (a reduced Porter step 1 + 5) so that
+    'coughing', 'coughs' and 'coughed' all meet 'cough'. It only has to be
+    consistent, because dictionary phrases go through it too.
+    """
+    if len(word) <= 3:
+        return word
+
+    if word.endswith("sses"):
+        word = word[:-2]
+    elif word.endswith("ies") and len(word) > 4:
+        word = word[:-3] + "y"
+    elif word.endswith(("shes", "ches", "xes")):
+        word = word[:-2]
+    elif word.endswith("ness") and len(word) > 6:
+        word = word[:-4]
+    elif word.endswith("ing") and len(word) > 5:
+        word = _undouble(word[:-3])
+    elif word.endswith("ed") and len(word) > 4:
+        word = _undouble(word[:-2])
+    elif word.endswith("s") and not word.endswith(("ss", "us", "is")):
+        word = word[:-1]
+
+    if word.endswith("y") and len(word) > 3:
+        word = word[:-1] + "i"
+    if word.endswith("e") and len(word) > 4:
+        word = word[:-1]
+    return word
+
+
+def _undouble(word: str) -> str:
+    if len(word) > 2 and word[-1] == word[-2] and word[-1] not in "lsz":
+        return word[:-1]
+    return word
+
+
+# A tag is ignored when a negation appears just before its phrase ("no fever")
+NEGATIONS = {stem(w) for w in NEGATION_WORDS}
+CLAUSE_BREAKS = {stem(w) for w in CLAUSE_BREAK_WORDS}
+
+
+def tokenize(text: str) -> List[str]:
+    return [stem(t) for t in _TOKEN_RE.findall(text.lower().replace("-", " "))]
+
+
+def _is_negated(tokens: List[str], i: int) -> bool:
+    """Whether a negation precedes tokens[i] within the window, in the same clause."""
+    for t in reversed(tokens[max(0, i - NEGATION_WINDOW):i]):
+        if t in CLAUSE_BREAKS:
+            return False
+        if t in NEGATIONS:
+            return True
+    return False
+
+
+@lru_cache(maxsize=1)
+def _phrase_index() -> Dict[str, List[Tuple[Tuple[str, ...], str]]]:
+    """First stemmed token -> [(stemmed phrase, tag)], longest phrases first."""
+    index: Dict[str, List[Tuple[Tuple[str, ...], str]]] = {}
+    for tag, phrases in SYMPTOM_SYNONYMS.items():
+        for phrase in phrases:
+            tokens = tuple(tokenize(phrase))
+            if tokens:
+                index.setdefault(tokens[0], []).append((tokens, tag))
+    for entries in index.values():
+        entries.sort(key=lambda e: -len(e[0]))
+    return index
+
+
+_TAG_ORDER = {tag: i for i, tag in enumerate(SYMPTOM_SYNONYMS)}
+
+
+# -------- PUBLIC API --------
+def normalize_symptoms(symptoms: Optional[str]) -> List[str]:
+    """
+    Maps free-text symptoms to canonical tags, ordered by SYMPTOM_SYNONYMS priority.
+    Always returns at least one tag: 'not_provided' for empty input and
+    'other' when nothing in the vocabulary matched.
+    """
+    text = (symptoms or "").strip().lower()
+    if text in NOT_PROVIDED_TEXTS:
+        return [NOT_PROVIDED_TAG]
+
+    index = _phrase_index()
+    found = set()
+
+    # Phrases and negations never span punctuation
+    for clause in _CLAUSE_RE.split(text):
+        tokens = tokenize(clause)
+        i = 0
+        while i < len(tokens):
+            matched_len = 0
+            for phrase, tag in index.get(tokens[i], ()):
+                if tuple(tokens[i:i + len(phrase)]) == phrase:
+                    if not _is_negated(tokens, i):
+                        found.add(tag)
+                    matched_len = len(phrase)
+                    break
+            i += matched_len or 1
+
+    if not found:
+        return [OTHER_TAG]
+    return sorted(found, key=_TAG_ORDER.__getitem__)
+
+
+def primary_tag(symptoms: Optional[str]) -> str:
+    return normalize_symptoms(symptoms)[0]
+
+
+def tags_for_keyword(keyword: str) -> List[str]:
+    """
+    Resolves a search keyword to the tags it refers to, for indexed lookups:
+    a canonical tag name ('back_pain'), a synonym ('vomiting' -> nausea),
+    or a generic word contained in several tags' phrases ('pain' -> all pain tags).
+    Returns [] when the keyword is outside the vocabulary.
+    """
+    keyword = (keyword or "").strip().lower()
+    if keyword.replace(" ", "_") in SYMPTOM_SYNONYMS:
+        return [keyword.replace(" ", "_")]
+
+    tags = [t for t in normalize_symptoms(keyword) if t not in (OTHER_TAG, NOT_PROVIDED_TAG)]
+    if tags:
+        return tags
+
+    stems = set(tokenize(keyword))
+    if not stems:
+        return []
+    return [
+        tag for tag, phrases in SYMPTOM_SYNONYMS.items()
+        if any(stems <= set(tokenize(p)) for p in phrases)
+    ]
@@ -0,0 +1,291 @@
+"""
+Bulk onboarding of doctors and patients from CSV or NDJSON.
+
+Rows stream through in batches: validated, deduplicated by email, passwords
+hashed in parallel worker processes (bcrypt dominates the cost), then loaded
+with COPY into a temporary staging table and moved into `users` with a single
+INSERT ... ON CONFLICT (email) DO NOTHING per batch.
+
+Expected fields: full_name, email, role ('doctor' or 'patient') and either
+password or password_hash (an existing bcrypt hash, e.g. from another system).
+"""
+import csv
+import io
+import os
+import time
+import uuid
+import logging
+import multiprocessing
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Dict, IO, Iterator, List, Optional, Tuple
+
+from pydantic.networks import validate_email
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from app.db.models import UserRole
+from app.services import serialization
+from app.services.auth_service import hash_password
+
+logger = logging.getLogger(__name__)
+
+# -------- CONFIG --------
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "1000"))
+IMPORT_HASH_WORKERS = int(os.getenv("IMPORT_HASH_WORKERS", str(len(os.sched_getaffinity(0)) if hasattr(os, "sched_getaffinity") else os.cpu_count() or 1)))
+MAX_REPORTED_ERRORS = 50
+
+FORMATS = ("csv", "ndjson")
+
+STAGING_DDL = text("""
+    CREATE TEMP TABLE IF NOT EXISTS users_import_staging (
+        id UUID NOT NULL,
+        email VARCHAR NOT NULL,
+        password_hash VARCHAR NOT NULL,
+        full_name VARCHAR NOT NULL,
+        role userrole NOT NULL
+    ) ON COMMIT DELETE ROWS
+""")
+
+MERGE_SQL = text("""
+    INSERT INTO users (id, email, password_hash, full_name, role)
+    SELECT id, email, password_hash, full_name, role FROM users_import_staging
+    ON CONFLICT (email) DO NOTHING
+""")
+
+
+@dataclass
+class ImportReport:
+    rows: int = 0
+    inserted: int = 0
+    existing: int = 0
+    duplicates_in_file: int = 0
+    invalid: int = 0
+    errors: List[Dict[str, Any]] = field(default_factory=list)
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return round(self.rows / self.seconds, 1) if self.seconds else 0.0
+
+    def add_error(self, line: int, message: str):
+        self.invalid += 1
+        if len(self.errors) < MAX_REPORTED_ERRORS:
+            self.errors.append({"line": line, "error": message})
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "rows": self.rows,
+            "inserted": self.inserted,
+            "existing": self.existing,
+            "duplicates_in_file": self.duplicates_in_file,
+            "invalid": self.invalid,
+            "errors": self.errors,
+            "seconds": round(self.seconds, 3),
+            "rows_per_second": self.rows_per_second,
+        }
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    ctype = (content_type or "").lower()
+    if name.endswith((".ndjson", ".jsonl")) or "ndjson" in ctype or "jsonl" in ctype:
+        return "ndjson"
+    return "csv"
+
+
+def iter_records(stream: IO[str], fmt: str) -> Iterator[Tuple[int, Any]]:
+    """Yields (line number, record) pairs without reading the whole input."""
+    if fmt == "csv":
+        reader = csv.DictReader(stream)
+        for record in reader:
+            yield reader.line_num, record
+    elif fmt == "ndjson":
+        for line_no, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                yield line_no, serialization.loads(line)
+            except ValueError as e:
+                yield line_no, ValueError(f"Invalid JSON: {e}")
+    else:
+        raise ValueError(f"Unsupported format '{fmt}'. Use one of: {', '.join(FORMATS)}")
+
+
+def _clean(record: Any) -> Dict[str, str]:
+    """Validates one input record; raises ValueError with a readable message."""
+    if isinstance(record, Exception):
+        raise record
+    if not isinstance(record, dict):
+        raise ValueError("Record must be an object")
+
+    full_name = str(record.get("full_name") or "").strip()
+    if not full_name:
+        raise ValueError("full_name is required")
+
+    try:
+        # Same normalization as EmailStr on /auth/signup
+        _, email = validate_email(str(record.get("email") or "").strip())
+    except Exception:
+        raise ValueError(f"Invalid email: {record.get('email')!r}")
+
+    try:
+        role = UserRole(str(record.get("role") or "").strip().lower())
+    except ValueError:
+        raise ValueError(f"Invalid role {record.get('role')!r}. Must be one of: {', '.join(r.value for r in UserRole)}")
+
+    password_hash = str(record.get("password_hash") or "").strip()
+    password = str(record.get("password") or "")
+    if password_hash:
+        if not password_hash.startswith(("$2a$", "$2b$", "$2y$")):
+            raise ValueError("password_hash must be a bcrypt hash")
+    elif not password:
+        raise ValueError("password or password_hash is required")
+
+    return {"full_name": full_name, "email": email, "role": role.value, "password": password, "password_hash": password_hash}
+
+
+def _hash_chunk(passwords: List[str]) -> List[str]:
+    # Runs in a worker process
+    return [hash_password(p) for p in passwords]
+
+
+class _Hasher:
+    """Hashes a batch's passwords across worker processes, one chunk per worker."""
+
+    def __init__(self, workers: int):
+        self.workers = max(1, workers)
+        self._pool: Optional[ProcessPoolExecutor] = None
+        if self.workers > 1:
+            # spawn: forking a server process that runs threads is unsafe
+            self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"))
+
+    def submit(self, rows: List[Dict[str, str]]) -> List[Future]:
+        pending = [r["password"] for r in rows if not r["password_hash"]]
+        if not pending:
+            return []
+        if self._pool is None:
+            done: Future = Future()
+            done.set_result(_hash_chunk(pending))
+            return [done]
+        size = -(-len(pending) // self.workers)
+        return [self._pool.submit(_hash_chunk, pending[i:i + size]) for i in range(0, len(pending), size)]
+
+    @staticmethod
+    def apply(rows: List[Dict[str, str]], futures: List[Future]):
+        hashes = iter([h for f in futures for h in f.result()])
+        for r in rows:
+            if not r["password_hash"]:
+                r["password_hash"] = next(hashes)
+            r["password"] = ""
+
+    def close(self):
+        if self._pool:
+            self._pool.shutdown()
+
+
+def _existing_emails(db: Session, emails: List[str]) -> set:
+    if not emails:
+        return set()
+    rows = db.execute(text("SELECT email FROM users WHERE email = ANY(:emails)"), {"emails": emails})
+    return {r[0] for r in rows}
+
+
+def _copy_batch(db: Session, rows: List[Dict[str, str]]) -> int:
+    """COPYs one hashed batch into staging and merges it; returns rows inserted."""
+    buf = io.StringIO()
+    writer = csv.writer(buf)
+    for r in rows:
+        writer.writerow([uuid.uuid4(), r["email"], r["password_hash"], r["full_name"], r["role"]])
+    buf.seek(0)
+
+    db.execute(STAGING_DDL)
+    cursor = db.connection().connection.cursor()
+    try:
+        cursor.copy_expert(
+            "COPY users_import_staging (id, email, password_hash, full_name, role) FROM STDIN WITH (FORMAT csv)",
+            buf,
+        )
+    finally:
+        cursor.close()
+    inserted = db.execute(MERGE_SQL).rowcount
+    db.commit()
+    return inserted
+
+
+def import_users(
+    db: Session,
+    stream: IO[str],
+    fmt: str,
+    batch_size: int = IMPORT_BATCH_SIZE,
+    workers: int = IMPORT_HASH_WORKERS,
+    progress=None,
+) -> ImportReport:
+    """
+    Imports users from a text stream. Emails already registered (or repeated
+    in the file) are skipped, never updated. Each batch commits on its own,
+    so an interrupted import can simply be re-run.
+    """
+    report = ImportReport()
+    started = time.perf_counter()
+    seen: set = set()
+    hasher = _Hasher(workers)
+
+    # Hashing of batch N+1 overlaps with the COPY of batch N
+    in_flight: Optional[Tuple[List[Dict[str, str]], List[Future]]] = None
+
+    def load(batch: List[Dict[str, str]], futures: List[Future]):
+        hasher.apply(batch, futures)
+        inserted = _copy_batch(db, batch)
+        report.inserted += inserted
+        # Lost the ON CONFLICT race to a concurrent signup/import
+        report.existing += len(batch) - inserted
+        if progress:
+            progress(report, time.perf_counter() - started)
+
+    def flush(batch: List[Dict[str, str]]):
+        nonlocal in_flight
+        # 1. Skip emails that are already registered before paying for bcrypt
+        existing = _existing_emails(db, [r["email"] for r in batch])
+        db.commit()
+        report.existing += len(existing)
+        batch = [r for r in batch if r["email"] not in existing]
+        # 2. Start hashing this batch, then load the previous one
+        futures = hasher.submit(batch)
+        if in_flight:
+            load(*in_flight)
+        in_flight = (batch, futures) if batch else None
+
+    try:
+        batch: List[Dict[str, str]] = []
+        for line_no, record in iter_records(stream, fmt):
+            report.rows += 1
+            try:
+                row = _clean(record)
+            except ValueError as e:
+                report.add_error(line_no, str(e))
+                continue
+            if row["email"] in seen:
+                report.duplicates_in_file += 1
+                continue
+            seen.add(row["email"])
+            batch.append(row)
+            if len(batch) >= batch_size:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+        if in_flight:
+            load(*in_flight)
+    except Exception:
+        db.rollback()
+        raise
+    finally:
+        hasher.close()
+        report.seconds = time.perf_counter() - started
+
+    logger.info(
+        f"User import: {report.inserted} inserted, {report.existing} existing, "
+        f"{report.duplicates_in_file} duplicate, {report.invalid} invalid, {report.rows_per_second} rows/s"
+    )
+    return report
@@ -0,0 +1,240 @@
+"""
+Reproducible synthetic clinic data for benchmarks and local development.
+
+Unlike benchmarks/seed.py (uniform data, fresh IDs per run, for load tests),
+everything here derives from one seed: the same seed, scale and anchor date
+give the same users, IDs and appointments. The distributions follow what a
+clinic sees:
+    - doctor popularity is skewed (log-normal); busy doctors fill most slots
+    - Sundays are off, some doctors work Saturdays, doctors take leave days
+    - late-morning and late-afternoon hours fill first, the lunch hour last
+    - a few patients visit often, most rarely (Pareto)
+    - symptom mix is seasonal: fevers and coughs peak in the monsoon and
+      winter, rashes in summer; one visit in ten is a follow-up
+    - past visits are booked, completed or cancelled; future days fill less
+      the further out they are
+
+    DATABASE_URL=postgresql://localhost/assistant_bench python -m benchmarks.datagen --scale medium --reset
+    python -m benchmarks.datagen --doctors 25 --patients 2000 --past-days 180 --seed 7
+
+--reset empties users, appointments and the tables that depend on them first;
+only point it at a scratch database. Run `python -m app.db.migrate upgrade` first.
+"""
+import argparse
+import math
+import random
+import time
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import date, datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, text
+from sqlalchemy.orm import Session
+
+from app.db.models import Appointment, AppointmentStatus, User, UserRole
+from app.services.auth_service import hash_password
+from app.services.symptom_tagger import normalize_symptoms
+from benchmarks.seed import FIRST_NAMES, LAST_NAMES, SeededData, SeededUser
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+# Slot start hours (IST) and how readily each is picked
+HOUR_WEIGHTS = {10: 1.0, 11: 1.3, 12: 1.1, 13: 0.5, 14: 0.9, 15: 1.0, 16: 1.2}
+
+# (weight, months with 2x weight, phrasings)
+SYMPTOM_PROFILES = [
+    (10, {6, 7, 8, 9, 12, 1}, ["high fever and chills", "fever since two days", "feverish with body ache", "high temperature at night"]),
+    (8, {6, 7, 8, 9, 12, 1}, ["persistent cough", "dry cough for a week", "coughing at night", "cough and congestion"]),
+    (7, {11, 12, 1, 2}, ["sore throat and cold", "runny nose and sneezing", "blocked nose", "throat pain while swallowing"]),
+    (6, set(), ["headache since morning", "migraine again", "head pain and nausea"]),
+    (5, {6, 7, 8}, ["stomach ache and nausea", "loose motions since yesterday", "vomiting after dinner", "acidity and heartburn"]),
+    (5, set(), ["lower back pain", "backache after lifting", "knee pain after a fall", "shoulder pain"]),
+    (4, {4, 5}, ["skin rash with itching", "itchy hives on arms", "allergy to dust", "eczema flare up"]),
+    (4, set(), ["feeling dizzy and tired", "fatigue and weakness", "trouble sleeping", "anxiety and stress"]),
+    (3, set(), ["blood pressure check", "blood sugar review", "diabetes medication review"]),
+    (2, set(), ["chest tightness when climbing stairs", "shortness of breath", "wheezing at night"]),
+    (2, set(), ["sprained ankle", "cut on the hand", "bruise after a fall"]),
+    (6, set(), ["follow-up visit", "routine check-up", "review of test results"]),
+    (3, set(), ["not provided"]),
+]
+
+# Share of past appointments per status; future ones are all booked
+PAST_STATUS_WEIGHTS = {AppointmentStatus.booked: 0.62, AppointmentStatus.completed: 0.28, AppointmentStatus.cancelled: 0.10}
+
+
+@dataclass(frozen=True)
+class Scale:
+    doctors: int
+    patients: int
+    past_days: int
+    future_days: int
+    # Mean share of a doctor's slots that are taken on a working day
+    fill: float = 0.5
+
+
+SCALES: Dict[str, Scale] = {
+    "small": Scale(doctors=10, patients=500, past_days=90, future_days=14),
+    "medium": Scale(doctors=50, patients=5000, past_days=365, future_days=30),
+    "large": Scale(doctors=200, patients=50000, past_days=730, future_days=60),
+}
+
+INSERT_BATCH_SIZE = 10000
+
+
+def _uuid(rng: random.Random) -> uuid.UUID:
+    return uuid.UUID(int=rng.getrandbits(128), version=4)
+
+
+def _symptom_weights(month: int) -> List[float]:
+    return [weight * (2 if month in peak else 1) for weight, peak, _ in SYMPTOM_PROFILES]
+
+
+def reset_database(db: Session):
+    """Empties every table holding users or appointments (scratch databases only)."""
+    db.execute(text("TRUNCATE users, appointments, appointment_daily_stats, idempotency_keys, slot_holds CASCADE"))
+    db.commit()
+
+
+def generate(db: Session, scale: Scale, seed: int = 42, anchor: Optional[date] = None) -> SeededData:
+    """
+    Inserts one dataset. `anchor` is "today" for the data (default: today in
+    IST): past appointments end the day before, future ones start on it.
+    """
+    from app.services.partitioning import ensure_partitions
+
+    rng = random.Random(seed)
+    anchor = anchor or datetime.now(IST).date()
+    tag = f"s{seed}"
+    data = SeededData()
+
+    if db.query(User.id).filter(User.email == f"doctor0.{tag}@datagen.local").first():
+        raise SystemExit(f"❌ Seed {seed} is already in this database; pass --reset or another --seed")
+
+    # 1. Partitions for the whole range, so rows do not pile up in the default one (commits)
+    ensure_partitions(db, anchor - timedelta(days=scale.past_days), anchor + timedelta(days=scale.future_days))
+
+    # 2. Users (one bcrypt hash, password 'loadtest')
+    password_hash = hash_password("loadtest")
+    for i in range(scale.doctors):
+        name = f"Dr. {rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i:04d}"
+        data.doctors.append(SeededUser(_uuid(rng), f"doctor{i}.{tag}@datagen.local", name, UserRole.doctor))
+    for i in range(scale.patients):
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {i:05d}"
+        data.patients.append(SeededUser(_uuid(rng), f"patient{i}.{tag}@datagen.local", name, UserRole.patient))
+    users = [
+        {"id": u.id, "email": u.email, "full_name": u.full_name, "role": u.role, "password_hash": password_hash}
+        for u in data.doctors + data.patients
+    ]
+    for i in range(0, len(users), INSERT_BATCH_SIZE):
+        db.execute(insert(User), users[i:i + INSERT_BATCH_SIZE])
+
+    # 3. Per-doctor and per-patient traits
+    popularity = [min(rng.lognormvariate(0, 0.5), 1.8) for _ in data.doctors]
+    works_saturday = [rng.random() < 0.5 for _ in data.doctors]
+    patient_cum_weights, total = [], 0.0
+    for _ in data.patients:
+        total += min(rng.paretovariate(2.0), 20.0)
+        patient_cum_weights.append(total)
+    hours = list(HOUR_WEIGHTS)
+    past_statuses, past_status_weights = list(PAST_STATUS_WEIGHTS), list(PAST_STATUS_WEIGHTS.values())
+    tags_cache: Dict[str, List[str]] = {}
+
+    # 4. Appointments, day by day
+    rows = []
+    inserted = 0
+    for offset in range(-scale.past_days, scale.future_days):
+        day = anchor + timedelta(days=offset)
+        if day.weekday() == 6:
+            continue
+        symptom_weights = _symptom_weights(day.month)
+        # Future days are booked less the further out they are
+        horizon = 1.0 if offset < 0 else math.exp(-offset / 10)
+        for d, doctor in enumerate(data.doctors):
+            if day.weekday() == 5 and not works_saturday[d]:
+                continue
+            if rng.random() < 0.04:  # leave
+                continue
+            fill = min(scale.fill * popularity[d] * horizon * (0.6 if day.weekday() == 5 else 1.0), 0.95)
+            taken = sum(rng.random() < fill for _ in hours)
+            # Weighted sample without replacement
+            picked = sorted(hours, key=lambda h: -rng.random() ** (1 / HOUR_WEIGHTS[h]))[:taken]
+            for hour in picked:
+                start_at = datetime(day.year, day.month, day.day, hour, tzinfo=IST)
+                _, _, phrasings = rng.choices(SYMPTOM_PROFILES, weights=symptom_weights)[0]
+                symptoms = rng.choice(phrasings)
+                if symptoms not in tags_cache:
+                    tags_cache[symptoms] = normalize_symptoms(symptoms)
+                status = rng.choices(past_statuses, weights=past_status_weights)[0] if offset < 0 else AppointmentStatus.booked
+                rows.append({
+                    "id": _uuid(rng),
+                    "doctor_id": doctor.id,
+                    "patient_id": data.patients[rng.choices(range(len(data.patients)), cum_weights=patient_cum_weights)[0]].id,
+                    "start_at": start_at,
+                    "end_at": start_at + timedelta(hours=1),
+                    "status": status,
+                    "symptoms": symptoms,
+                    "symptom_tags": tags_cache[symptoms],
+                })
+            if len(rows) >= INSERT_BATCH_SIZE:
+                db.execute(insert(Appointment), rows)
+                inserted += len(rows)
+                rows = []
+    if rows:
+        db.execute(insert(Appointment), rows)
+        inserted += len(rows)
+    db.commit()
+
+    data.appointments = inserted
+    return data
+
+
+def analyze(engine):
+    """Refreshes planner statistics and the daily rollup after a bulk load."""
+    from app.db.database import SessionLocal
+    from app.services.analytics_service import rebuild_daily_rollup
+
+    with SessionLocal() as db:
+        rebuild_daily_rollup(db)
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text("ANALYZE users, appointments, appointment_daily_stats"))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed reproducible synthetic clinic data.")
+    parser.add_argument("--scale", choices=sorted(SCALES), default="small")
+    parser.add_argument("--doctors", type=int, default=None, help="Override the scale's doctor count")
+    parser.add_argument("--patients", type=int, default=None)
+    parser.add_argument("--past-days", type=int, default=None)
+    parser.add_argument("--future-days", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor-date", default=None, help="YYYY-MM-DD treated as today (default: today, IST)")
+    parser.add_argument("--reset", action="store_true", help="Empty users and appointments first (scratch databases only)")
+    args = parser.parse_args()
+
+    from app.db.database import SessionLocal, engine
+
+    overrides = {k: v for k, v in (
+        ("doctors", args.doctors), ("patients", args.patients),
+        ("past_days", args.past_days), ("future_days", args.future_days),
+    ) if v is not None}
+    scale = Scale(**{**asdict(SCALES[args.scale]), **overrides})
+    anchor = date.fromisoformat(args.anchor_date) if args.anchor_date else None
+
+    with SessionLocal() as db:
+        if args.reset:
+            reset_database(db)
+            print(f"🧹 Emptied users and appointments on {engine.url.render_as_string(hide_password=True)}")
+        started = time.perf_counter()
+        data = generate(db, scale, seed=args.seed, anchor=anchor)
+    analyze(engine)
+    print(
+        f"🌱 Seeded {len(data.doctors)} doctors, {len(data.patients)} patients, "
+        f"{data.appointments} appointments in {time.perf_counter() - started:.1f}s"
+    )
+    print(f"   e.g. doctor {data.doctors[0].id} ({data.doctors[0].email}), patient {data.patients[0].id}; password 'loadtest'")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+"""
+Stand-in for Google OAuth token exchange and the Calendar v3 events.insert call.
+Point the app at it with GOOGLE_CALENDAR_API_ENDPOINT=<base>/calendar/v3/ and a
+service account JSON whose token_uri is <base>/token (see make_service_account_info).
+"""
+import asyncio
+import json
+import uuid
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+
+def make_service_account_info(base_url: str) -> str:
+    """A throwaway service account (fresh RSA key) whose token_uri is this fake."""
+    from cryptography.hazmat.primitives import serialization
+    from cryptography.hazmat.primitives.asymmetric import rsa
+
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    ).decode()
+    return json.dumps({
+        "type": "service_account",
+        "project_id": "loadtest",
+        "private_key_id": uuid.uuid4().hex,
+        "private_key": pem,
+        "client_email": "loadtest@loadtest.iam.gserviceaccount.com",
+        "client_id": "0",
+        "token_uri": f"{base_url}/token",
+    })
+
+
+def create_app(latency_ms: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    app.state.events = 0
+    app.state.event_ids = set()
+
+    @app.post("/token")
+    async def token():
+        return {"access_token": "fake-token", "expires_in": 3600, "token_type": "Bearer"}
+
+    @app.post("/calendar/v3/calendars/{calendar_id}/events")
+    async def insert_event(calendar_id: str, request: Request):
+        body = await request.json()
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        # Like the real API: a client-chosen ID that already exists is a 409
+        event_id = body.get("id") or uuid.uuid4().hex
+        if event_id in app.state.event_ids:
+            return JSONResponse({"error": {"code": 409, "message": "The requested identifier already exists."}}, status_code=409)
+        app.state.event_ids.add(event_id)
+        app.state.events += 1
+        return {"id": event_id, "status": "confirmed", "htmlLink": f"https://calendar.local/event?eid={event_id}"}
+
+    return app
@@ -0,0 +1,176 @@
+"""
+Scripted stand-in for the Groq (OpenAI-compatible) chat completions API.
+
+It replays canned tool-call sequences instead of running a model. The flow is
+chosen from the last user message, which the load generator writes in a tiny
+command language:
+
+    BOOK doctor=<name> date=<YYYY-MM-DD> symptoms=<text>
+    REPORT start=<YYYY-MM-DD> end=<YYYY-MM-DD>
+
+Each step looks at the tool results already in the conversation, so IDs and
+ISO timestamps flow from one tool to the next exactly as with the real model.
+"""
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+
+from fastapi import FastAPI, Request
+
+IDENTITY_RE = re.compile(r"(DOCTOR|PATIENT) IDENTITY: ID=([0-9a-fA-F-]{36})")
+
+
+def _parse_command(text: str) -> Dict[str, str]:
+    verb, _, rest = text.partition(" ")
+    args = dict(re.findall(r"(\w+)=((?:(?!\s\w+=).)*)", rest))
+    args["verb"] = verb.upper()
+    return args
+
+
+def _tool_results(messages: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Tool results after the last user turn, parsed back into dicts."""
+    last_user = max(i for i, m in enumerate(messages) if m.get("role") == "user")
+    results = []
+    for m in messages[last_user + 1:]:
+        if m.get("role") == "tool":
+            try:
+                results.append({"name": m.get("name"), "data": json.loads(m.get("content") or "{}")})
+            except json.JSONDecodeError:
+                results.append({"name": m.get("name"), "data": {"status": "error", "raw": m.get("content")}})
+    return results
+
+
+def _call(tool_name: str, **arguments) -> Dict[str, Any]:
+    return {"tool": tool_name, "arguments": arguments}
+
+
+def _say(text: str) -> Dict[str, Any]:
+    return {"text": text}
+
+
+def _rows(value: Any) -> List[Any]:
+    """Accepts plain row lists and the compact {"cols", "rows"} tables from result_shaping."""
+    if isinstance(value, dict) and "cols" in value:
+        return [dict(zip(value["cols"], row)) for row in value["rows"]]
+    return value or []
+
+
+def _first_doctor_id(data: Dict[str, Any]) -> Optional[str]:
+    doctors = _rows(data.get("doctors"))
+    return doctors[0]["id"] if doctors else None
+
+
+def booking_flow(cmd: Dict[str, str], identity: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    step = len(results)
+    if step == 0:
+        return _call("find_doctor", name=cmd.get("doctor", ""))
+
+    doctor_id = _first_doctor_id(results[0]["data"])
+    if not doctor_id:
+        return _say("I could not find that doctor.")
+    if step == 1:
+        return _call("get_available_slots", doctor_id=doctor_id, date_str=cmd.get("date", ""))
+
+    if step == 2:
+        slots = results[1]["data"].get("slots") or []
+        if not slots:
+            return _say("There are no free slots on that date.")
+        slot = random.choice(slots)
+        return _call(
+            "hold_slot",
+            doctor_id=doctor_id,
+            start_at=slot if isinstance(slot, str) else slot["iso_start"],
+        )
+
+    if step == 3:
+        hold = results[2]["data"]
+        if hold.get("status") != "held":
+            return _say("That slot was just taken.")
+        return _call(
+            "book_new_appointment",
+            doctor_id=doctor_id,
+            patient_id=identity,
+            start_at=hold.get("start_at"),
+            symptoms=cmd.get("symptoms", "not provided"),
+        )
+
+    return _say(f"Booking result: {results[-1]['data'].get('status')}")
+
+
+def report_flow(cmd: Dict[str, str], identity: str, results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    step = len(results)
+    if step == 0:
+        return _call(
+            "get_doctor_appointments_by_date_range",
+            doctor_id=identity,
+            start_date_str=cmd.get("start", ""),
+            end_date_str=cmd.get("end", ""),
+        )
+    if step == 1:
+        data = results[0]["data"]
+        lines = [f"Schedule {data.get('range', '')}", f"Total: {data.get('total_count', 0)}"]
+        schedule = data.get("schedule") or {}
+        if "cols" in schedule:
+            schedule = {day: _rows({"cols": schedule["cols"], "rows": rows}) for day, rows in schedule["days"].items()}
+        for day, items in schedule.items():
+            lines.append(day)
+            lines.extend(f"• {i['time']} {i['patient_name']} ({i['symptoms']})" for i in items)
+        return _call("send_summary_report_to_slack", doctor_id=identity, content="\n".join(lines))
+
+    return _say("Report sent to Slack.")
+
+
+FLOWS = {"BOOK": booking_flow, "REPORT": report_flow}
+
+
+def next_turn(messages: List[Dict[str, Any]]) -> Dict[str, Any]:
+    system = next((m.get("content") or "" for m in messages if m.get("role") == "system"), "")
+    match = IDENTITY_RE.search(system)
+    identity = match.group(2) if match else ""
+
+    user_text = next(m.get("content") or "" for m in reversed(messages) if m.get("role") == "user")
+    cmd = _parse_command(user_text.strip())
+    flow = FLOWS.get(cmd["verb"])
+    if flow is None:
+        return _say("Hello! How can I help you today?")
+    return flow(cmd, identity, _tool_results(messages))
+
+
+def _completion(turn: Dict[str, Any], model: str) -> Dict[str, Any]:
+    message: Dict[str, Any] = {"role": "assistant", "content": turn.get("text")}
+    finish_reason = "stop"
+    if "tool" in turn:
+        finish_reason = "tool_calls"
+        message["tool_calls"] = [{
+            "id": f"call_{uuid.uuid4().hex[:12]}",
+            "type": "function",
+            "function": {"name": turn["tool"], "arguments": json.dumps(turn["arguments"])},
+        }]
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": model,
+        "choices": [{"index": 0, "message": message, "finish_reason": finish_reason, "logprobs": None}],
+        "usage": {"prompt_tokens": 0, "completion_tokens": 0, "total_tokens": 0},
+    }
+
+
+def create_app(latency_ms: float = 0.0) -> FastAPI:
+    """latency_ms simulates model time so queueing behaves like production."""
+    app = FastAPI()
+    app.state.requests = 0
+
+    @app.post("/openai/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        app.state.requests += 1
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+        return _completion(next_turn(body.get("messages", [])), body.get("model", "fake"))
+
+    return app
@@ -0,0 +1,34 @@
+"""
+Stand-in for the two Slack Web API methods notify_on_slack uses.
+Point the app at it with SLACK_API_URL=<base>/api/.
+"""
+import asyncio
+import hashlib
+import time
+
+from fastapi import FastAPI, Request
+
+
+def create_app(latency_ms: float = 0.0) -> FastAPI:
+    app = FastAPI()
+    app.state.messages = 0
+
+    async def _delay():
+        if latency_ms:
+            await asyncio.sleep(latency_ms / 1000)
+
+    # slack_sdk sends users.lookupByEmail as a GET with query params
+    @app.api_route("/api/users.lookupByEmail", methods=["GET", "POST"])
+    async def lookup_by_email(request: Request):
+        email = request.query_params.get("email") or (await request.form()).get("email", "")
+        await _delay()
+        return {"ok": True, "user": {"id": "U" + hashlib.sha1(email.encode()).hexdigest()[:10].upper()}}
+
+    @app.post("/api/chat.postMessage")
+    async def post_message(request: Request):
+        await request.body()
+        app.state.messages += 1
+        await _delay()
+        return {"ok": True, "channel": "D000", "ts": f"{time.time():.6f}"}
+
+    return app
@@ -0,0 +1,77 @@
+"""
+Minimal plaintext SMTP sink. Accepts EHLO, AUTH PLAIN/LOGIN, MAIL, RCPT and DATA,
+counts messages and throws them away. Use with SMTP_SECURITY=none.
+"""
+import asyncio
+import threading
+
+
+class SMTPSink:
+    def __init__(self, host: str = "127.0.0.1", port: int = 0):
+        self.host = host
+        self.port = port
+        self.messages = 0
+        self._loop = None
+        self._server = None
+        self._ready = threading.Event()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        def reply(line: str):
+            writer.write((line + "\r\n").encode())
+
+        reply("220 sink ESMTP ready")
+        await writer.drain()
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                command = raw.decode(errors="replace").strip()
+                verb = command.split(" ", 1)[0].upper()
+
+                if verb == "EHLO":
+                    reply("250-sink")
+                    reply("250-AUTH PLAIN LOGIN")
+                    reply("250 8BITMIME")
+                elif verb == "HELO":
+                    reply("250 sink")
+                elif verb == "AUTH":
+                    parts = command.split()
+                    if len(parts) == 2 and parts[1].upper() == "LOGIN":
+                        for _ in range(2):
+                            reply("334 VXNlcm5hbWU6")
+                            await writer.drain()
+                            await reader.readline()
+                    reply("235 2.7.0 Authentication successful")
+                elif verb == "DATA":
+                    reply("354 End data with <CR><LF>.<CR><LF>")
+                    await writer.drain()
+                    while (await reader.readline()).rstrip(b"\r\n") != b".":
+                        pass
+                    self.messages += 1
+                    reply("250 2.0.0 Queued")
+                elif verb == "QUIT":
+                    reply("221 Bye")
+                    await writer.drain()
+                    break
+                else:  # MAIL, RCPT, RSET, NOOP
+                    reply("250 OK")
+                await writer.drain()
+        finally:
+            writer.close()
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        self._server = self._loop.run_until_complete(asyncio.start_server(self._handle, self.host, self.port))
+        self.port = self._server.sockets[0].getsockname()[1]
+        self._ready.set()
+        self._loop.run_forever()
+
+    def start(self) -> "SMTPSink":
+        threading.Thread(target=self._run, name="smtp-sink", daemon=True).start()
+        self._ready.wait()
+        return self
+
+    def stop(self):
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
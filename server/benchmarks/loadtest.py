@@ -0,0 +1,336 @@
+"""
+End-to-end load test of /agent/chat -> run_agent_chat -> MCP tools -> database,
+with local stand-ins for every external service:
+
+    Groq      benchmarks/fakes/groq_server.py     (scripted tool-call sequences)
+    SMTP      benchmarks/fakes/smtp_sink.py
+    Calendar  benchmarks/fakes/calendar_server.py
+    Slack     benchmarks/fakes/slack_server.py
+
+Run from server/ against a scratch database (it inserts users and appointments):
+
+    DATABASE_URL=postgresql://localhost/assistant_bench \\
+        python -m benchmarks.loadtest --migrate --patient-flows 200 --doctor-flows 50 --concurrency 20
+
+By default the FastAPI app runs in-process (httpx ASGI transport), which also lets
+us count SQLAlchemy pool checkouts. With --target the requests go to a running
+server instead; it must be started with the environment printed by --print-env.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import socket
+import sys
+import threading
+import time
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List, Optional
+
+import uvicorn
+
+from benchmarks.fakes import calendar_server, groq_server, slack_server
+from benchmarks.fakes.smtp_sink import SMTPSink
+
+IST = timezone(timedelta(hours=5, minutes=30))
+HOST = "127.0.0.1"
+
+
+# -------- STAND-INS --------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind((HOST, 0))
+        return s.getsockname()[1]
+
+
+def _serve(asgi_app, port: int) -> uvicorn.Server:
+    server = uvicorn.Server(uvicorn.Config(asgi_app, host=HOST, port=port, log_level="warning", access_log=False))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+@dataclass
+class Fakes:
+    groq: object
+    calendar: object
+    slack: object
+    smtp: SMTPSink
+    env: Dict[str, str] = field(default_factory=dict)
+
+
+def start_fakes(args) -> Fakes:
+    groq_app = groq_server.create_app(args.llm_latency_ms)
+    calendar_app = calendar_server.create_app(args.service_latency_ms)
+    slack_app = slack_server.create_app(args.service_latency_ms)
+
+    groq_port, calendar_port, slack_port = (args.groq_port or _free_port(), args.calendar_port or _free_port(), args.slack_port or _free_port())
+    _serve(groq_app, groq_port)
+    _serve(calendar_app, calendar_port)
+    _serve(slack_app, slack_port)
+    smtp = SMTPSink(HOST, args.smtp_port).start()
+
+    calendar_base = f"http://{HOST}:{calendar_port}"
+    env = {
+        "GROQ_API_KEY": "loadtest",
+        "GROQ_BASE_URL": f"http://{HOST}:{groq_port}",
+        "EMAIL_TEST_MODE": "false",
+        "SMTP_HOST": HOST,
+        "SMTP_PORT": str(smtp.port),
+        "SMTP_SECURITY": "none",
+        "SMTP_USER": "loadtest",
+        "SMTP_PASS": "loadtest",
+        "GOOGLE_SERVICE_ACCOUNT_FILE": calendar_server.make_service_account_info(calendar_base),
+        "GOOGLE_CALENDAR_ID": "loadtest",
+        "GOOGLE_CALENDAR_API_ENDPOINT": f"{calendar_base}/calendar/v3/",
+        "SLACK_BOT_TOKEN": "xoxb-loadtest",
+        "SLACK_API_URL": f"http://{HOST}:{slack_port}/api/",
+    }
+    return Fakes(groq=groq_app, calendar=calendar_app, slack=slack_app, smtp=smtp, env=env)
+
+
+# -------- DATABASE CONNECTION SAMPLING --------
+class ConnectionMonitor:
+    """
+    Tracks connection use two ways: SQLAlchemy pool events (in-process runs only)
+    and pg_stat_activity sampling (sees every backend on the database).
+    """
+
+    def __init__(self, engine, interval: float = 0.2):
+        from sqlalchemy import event
+
+        self.engine = engine
+        self.interval = interval
+        self.checked_out = 0
+        self.peak_checked_out = 0
+        self.opened = 0
+        self.activity_samples: List[int] = []
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+
+        event.listen(engine, "connect", self._on_connect)
+        event.listen(engine, "checkout", self._on_checkout)
+        event.listen(engine, "checkin", self._on_checkin)
+
+    def _on_connect(self, *_):
+        with self._lock:
+            self.opened += 1
+
+    def _on_checkout(self, *_):
+        with self._lock:
+            self.checked_out += 1
+            self.peak_checked_out = max(self.peak_checked_out, self.checked_out)
+
+    def _on_checkin(self, *_):
+        with self._lock:
+            self.checked_out -= 1
+
+    def _sample(self):
+        from sqlalchemy import create_engine, text
+        from sqlalchemy.pool import NullPool
+
+        # A separate engine so sampling does not show up in the pool counters
+        sampler = create_engine(self.engine.url, poolclass=NullPool)
+        query = text("SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()")
+        try:
+            with sampler.connect() as conn:
+                while not self._stop.is_set():
+                    self.activity_samples.append(conn.execute(query).scalar())
+                    self._stop.wait(self.interval)
+        except Exception as e:
+            print(f"⚠️ pg_stat_activity sampling disabled: {e}", file=sys.stderr)
+
+    def start(self):
+        if self.engine.dialect.name == "postgresql":
+            threading.Thread(target=self._sample, daemon=True).start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+    def summary(self) -> dict:
+        samples = self.activity_samples
+        return {
+            "pool_peak_checked_out": self.peak_checked_out,
+            "pool_connections_opened": self.opened,
+            "pg_backends_peak": max(samples) if samples else None,
+            "pg_backends_mean": round(sum(samples) / len(samples), 1) if samples else None,
+        }
+
+
+# -------- FLOWS --------
+def percentile(sorted_values: List[float], pct: float) -> Optional[float]:
+    if not sorted_values:
+        return None
+    rank = max(0, min(len(sorted_values) - 1, int(round(pct / 100 * len(sorted_values))) - 1))
+    return sorted_values[rank]
+
+
+@dataclass
+class FlowResult:
+    kind: str
+    latency: float
+    ok: bool
+    detail: str = ""
+
+
+async def run_flow(client, kind: str, user, message: str) -> FlowResult:
+    from app.services.auth_service import create_access_token
+
+    token = create_access_token({"sub": str(user.id), "role": user.role.value})
+    payload = {
+        "message": message,
+        "messages": [],
+        "user_info": {"user_name": user.full_name, "user_email": user.email, "user_role": user.role.value},
+    }
+    started = time.perf_counter()
+    try:
+        response = await client.post("/agent/chat", json=payload, headers={"Authorization": f"Bearer {token}"})
+        ok = response.status_code == 200
+        detail = response.json().get("answer", "") if ok else f"HTTP {response.status_code}"
+    except Exception as e:
+        ok, detail = False, str(e)
+    return FlowResult(kind, time.perf_counter() - started, ok, detail)
+
+
+def build_flows(args, seeded) -> List[tuple]:
+    from benchmarks.seed import SYMPTOMS
+
+    rng = random.Random(args.seed)
+    today = datetime.now(IST).date()
+    flows = []
+    for _ in range(args.patient_flows):
+        doctor = rng.choice(seeded.doctors)
+        day = today + timedelta(days=rng.randint(1, args.booking_days))
+        message = f"BOOK doctor={doctor.full_name} date={day.isoformat()} symptoms={rng.choice(SYMPTOMS)}"
+        flows.append(("patient_booking", rng.choice(seeded.patients), message))
+    for _ in range(args.doctor_flows):
+        start = today - timedelta(days=rng.randint(0, 14))
+        message = f"REPORT start={start.isoformat()} end={(start + timedelta(days=6)).isoformat()}"
+        flows.append(("doctor_report", rng.choice(seeded.doctors), message))
+    rng.shuffle(flows)
+    return flows
+
+
+async def run_load(args, flows) -> tuple:
+    import httpx
+
+    if args.target:
+        client = httpx.AsyncClient(base_url=args.target, timeout=120)
+    else:
+        from app.main import app
+        client = httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://loadtest", timeout=120)
+
+    semaphore = asyncio.Semaphore(args.concurrency)
+
+    async def bounded(kind, user, message):
+        async with semaphore:
+            return await run_flow(client, kind, user, message)
+
+    async with client:
+        started = time.perf_counter()
+        results = await asyncio.gather(*(bounded(*f) for f in flows))
+        elapsed = time.perf_counter() - started
+    return results, elapsed
+
+
+def summarize(results: List[FlowResult], elapsed: float) -> dict:
+    report = {"total_flows": len(results), "elapsed_s": round(elapsed, 2), "rps": round(len(results) / elapsed, 2) if elapsed else None, "flows": {}}
+    for kind in sorted({r.kind for r in results}):
+        subset = [r for r in results if r.kind == kind]
+        latencies = sorted(r.latency * 1000 for r in subset)
+        report["flows"][kind] = {
+            "count": len(subset),
+            "errors": sum(not r.ok for r in subset),
+            "p50_ms": round(percentile(latencies, 50), 1),
+            "p95_ms": round(percentile(latencies, 95), 1),
+            "p99_ms": round(percentile(latencies, 99), 1),
+            "max_ms": round(latencies[-1], 1),
+        }
+    return report
+
+
+def print_report(report: dict):
+    print("\n📊 Load test results")
+    print(f"   flows: {report['total_flows']}  elapsed: {report['elapsed_s']}s  throughput: {report['rps']} flows/s")
+    for kind, stats in report["flows"].items():
+        print(
+            f"   {kind:<16} n={stats['count']:<5} err={stats['errors']:<4} "
+            f"p50={stats['p50_ms']}ms p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms max={stats['max_ms']}ms"
+        )
+    db = report.get("db", {})
+    print(
+        f"   db: pool peak={db.get('pool_peak_checked_out')} opened={db.get('pool_connections_opened')} "
+        f"pg_backends peak={db.get('pg_backends_peak')} mean={db.get('pg_backends_mean')}"
+    )
+    print(f"   stand-ins: {report.get('stand_ins')}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Concurrent booking/report load test with local service stand-ins.")
+    parser.add_argument("--patient-flows", type=int, default=100)
+    parser.add_argument("--doctor-flows", type=int, default=20)
+    parser.add_argument("--concurrency", type=int, default=10)
+    parser.add_argument("--doctors", type=int, default=10, help="Doctors to seed")
+    parser.add_argument("--patients", type=int, default=200, help="Patients to seed")
+    parser.add_argument("--history-days", type=int, default=30, help="Days of past appointments to seed")
+    parser.add_argument("--booking-days", type=int, default=7, help="Book randomly within the next N days")
+    parser.add_argument("--llm-latency-ms", type=float, default=0, help="Simulated model latency per completion")
+    parser.add_argument("--service-latency-ms", type=float, default=0, help="Simulated Calendar/Slack latency")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--migrate", action="store_true", help="Run migrations before seeding")
+    parser.add_argument("--target", default=None, help="Base URL of a running server (default: in-process app)")
+    parser.add_argument("--print-env", action="store_true", help="Print the stand-in environment for --target servers")
+    parser.add_argument("--json-out", default=None, help="Also write the report as JSON")
+    for name in ("groq", "calendar", "slack", "smtp"):
+        parser.add_argument(f"--{name}-port", type=int, default=0)
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+
+    # Stand-ins first: app modules read their service configuration at import time
+    fakes = start_fakes(args)
+    os.environ.update(fakes.env)
+    if args.print_env:
+        for key, value in fakes.env.items():
+            print(f"export {key}={json.dumps(value)}")
+
+    from app.db.database import SessionLocal, engine
+    from benchmarks.seed import seed_database
+
+    if args.migrate:
+        from app.db.migrate import main as migrate
+        migrate(["upgrade"])
+
+    with SessionLocal() as db:
+        seeded = seed_database(db, args.doctors, args.patients, args.history_days, seed=args.seed)
+    print(f"🌱 Seeded {len(seeded.doctors)} doctors, {len(seeded.patients)} patients, {seeded.appointments} appointments")
+
+    monitor = ConnectionMonitor(engine).start()
+    flows = build_flows(args, seeded)
+    results, elapsed = asyncio.run(run_load(args, flows))
+    monitor.stop()
+
+    report = summarize(results, elapsed)
+    report["db"] = monitor.summary()
+    report["stand_ins"] = {
+        "llm_completions": fakes.groq.state.requests,
+        "emails": fakes.smtp.messages,
+        "calendar_events": fakes.calendar.state.events,
+        "slack_messages": fakes.slack.state.messages,
+    }
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    fakes.smtp.stop()
+
+
+if __name__ == "__main__":
+    main()
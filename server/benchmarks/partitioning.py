@@ -0,0 +1,182 @@
+"""
+Checks that the tool queries keep partition pruning on a multi-year history.
+
+Seeds years of past appointments into a scratch database (creating the
+monthly partitions they need), runs the read tools for one doctor, captures
+every SQL statement they send and reports, per statement, how many
+appointments partitions the plan touches and how long it takes (EXPLAIN ANALYZE).
+
+    DATABASE_URL=postgresql://localhost/assistant_bench python -m benchmarks.partitioning --years 3
+    python -m benchmarks.partitioning --skip-seed --json-out pruning.json   # reuse existing data
+
+Run `python -m app.db.migrate upgrade` on the scratch database first.
+"""
+import argparse
+import json
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from sqlalchemy import event, func, text
+
+from app.db.database import SessionLocal, engine
+from app.db.models import Appointment, User, UserRole
+from app.mcp_server.tools.fetch_available_appointment_slots import compute_free_hours
+from app.mcp_server.tools.get_appointment_stats import get_appointment_statistics
+from app.mcp_server.tools.get_appointments_by_range import get_doctor_appointments_range
+from app.mcp_server.tools.get_appointments_by_symptoms import search_appointments_by_symptoms
+from app.mcp_server.tools.get_appointments_page import get_doctor_appointments_page
+from app.services.partitioning import ensure_partitions, list_partitions
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+
+def seed_history(years: int, doctors: int, patients: int, per_day: int, seed: int) -> int:
+    from benchmarks.seed import seed_database
+
+    today = datetime.now(IST).date()
+    first = today - timedelta(days=years * 365)
+    with SessionLocal() as db:
+        created = ensure_partitions(db, first, today)
+        print(f"➕ Created {len(created)} partitions for the seeded range")
+        started = time.perf_counter()
+        seeded = seed_database(db, doctors, patients, years * 365, appointments_per_doctor_day=per_day, seed=seed)
+        print(f"🌱 Seeded {seeded.appointments} appointments in {time.perf_counter() - started:.1f}s")
+    with engine.connect() as conn:
+        conn = conn.execution_options(isolation_level="AUTOCOMMIT")
+        conn.execute(text("ANALYZE appointments"))
+    return seeded.appointments
+
+
+class StatementCapture:
+    """Collects the SELECTs on appointments issued while active."""
+
+    def __init__(self):
+        self.statements: List[tuple] = []
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, conn, cursor, statement, parameters, context, executemany):
+        if self.active and statement.lstrip().upper().startswith("SELECT") and "appointments" in statement:
+            self.statements.append((statement, parameters))
+
+    def run(self, fn: Callable[[], Any]) -> List[tuple]:
+        self.statements = []
+        self.active = True
+        try:
+            fn()
+        finally:
+            self.active = False
+        return list(self.statements)
+
+
+def _walk(plan: Dict[str, Any], relations: List[str], removed: List[int]):
+    if "Relation Name" in plan:
+        relations.append(plan["Relation Name"])
+    if "Subplans Removed" in plan:
+        removed.append(plan["Subplans Removed"])
+    for child in plan.get("Plans", []):
+        _walk(child, relations, removed)
+
+
+def explain(statement: str, parameters) -> Dict[str, Any]:
+    with engine.connect() as conn:
+        raw = conn.exec_driver_sql(f"EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) {statement}", parameters).scalar()
+    doc = raw[0] if isinstance(raw, list) else json.loads(raw)[0]
+    relations, removed = [], []
+    _walk(doc["Plan"], relations, removed)
+    partitions = sorted({r for r in relations if r.startswith("appointments_")})
+    return {
+        "partitions": partitions,
+        "subplans_removed": sum(removed),
+        "execution_ms": round(doc["Execution Time"], 3),
+        "shared_hit": doc["Plan"].get("Shared Hit Blocks", 0),
+        "shared_read": doc["Plan"].get("Shared Read Blocks", 0),
+    }
+
+
+def _busiest_doctor(db) -> Optional[str]:
+    row = (
+        db.query(Appointment.doctor_id, func.count())
+        .join(User, User.id == Appointment.doctor_id)
+        .filter(User.role == UserRole.doctor)
+        .group_by(Appointment.doctor_id)
+        .order_by(func.count().desc())
+        .first()
+    )
+    return str(row[0]) if row else None
+
+
+def run(reference_days_ago: int) -> Dict[str, Any]:
+    with SessionLocal() as db:
+        doctor_id = _busiest_doctor(db)
+        months = list_partitions(db)
+    if not doctor_id:
+        raise SystemExit("❌ No appointments found; run without --skip-seed first")
+
+    ref = datetime.now(IST).date() - timedelta(days=reference_days_ago)
+    week_start, month_start_day = ref - timedelta(days=6), ref - timedelta(days=29)
+    fmt = lambda d: d.strftime("%Y-%m-%d")
+
+    scenarios = {
+        "range_week": lambda db: get_doctor_appointments_range(db, doctor_id, fmt(week_start), fmt(ref)),
+        "symptoms_month": lambda db: search_appointments_by_symptoms(db, doctor_id, "fever", fmt(month_start_day), fmt(ref)),
+        "page_month": lambda db: get_doctor_appointments_page(db, doctor_id, fmt(month_start_day), fmt(ref), None, 20),
+        "stats_month": lambda db: get_appointment_statistics(db, doctor_id, fmt(month_start_day), fmt(ref), "day", ""),
+        "slots_day": lambda db: compute_free_hours(db, doctor_id, ref),
+    }
+
+    capture = StatementCapture()
+    results = []
+    for name, scenario in scenarios.items():
+        with SessionLocal() as db:
+            statements = capture.run(lambda: scenario(db))
+        for i, (statement, parameters) in enumerate(statements):
+            row = {"scenario": name if len(statements) == 1 else f"{name}#{i + 1}", **explain(statement, parameters)}
+            results.append(row)
+
+    return {"doctor_id": doctor_id, "reference_date": fmt(ref), "total_partitions": len(months) + 1, "queries": results}
+
+
+def print_report(report: Dict[str, Any]):
+    total = report["total_partitions"]
+    print(f"\nDoctor {report['doctor_id']}, window ending {report['reference_date']}, {total} partitions (incl. default)\n")
+    print(f"{'query':<18} {'partitions':>10} {'pruned':>7} {'exec ms':>9} {'buf hit':>8} {'buf read':>9}  scanned")
+    print("-" * 100)
+    for q in report["queries"]:
+        scanned = ", ".join(q["partitions"]) or "-"
+        print(
+            f"{q['scenario']:<18} {len(q['partitions']):>4} / {total:<3} {q['subplans_removed']:>7} "
+            f"{q['execution_ms']:>9.3f} {q['shared_hit']:>8} {q['shared_read']:>9}  {scanned}"
+        )
+    unpruned = [q["scenario"] for q in report["queries"] if len(q["partitions"]) > 3]
+    print("\n✅ Every query is pruned to at most 3 partitions" if not unpruned
+          else f"\n⚠️ Queries scanning more than 3 partitions: {', '.join(unpruned)}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Partition pruning benchmark for the appointment tools.")
+    parser.add_argument("--years", type=int, default=3, help="Years of history to seed")
+    parser.add_argument("--doctors", type=int, default=20)
+    parser.add_argument("--patients", type=int, default=300)
+    parser.add_argument("--per-day", type=int, default=5, help="Appointments per doctor per day")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--skip-seed", action="store_true", help="Use the data already in the database")
+    parser.add_argument("--reference-days-ago", type=int, default=30, help="End of the queried window")
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    if not args.skip_seed:
+        seed_history(args.years, args.doctors, args.patients, args.per_day, args.seed)
+
+    report = run(args.reference_days_ago)
+    print_report(report)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"📝 Results written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
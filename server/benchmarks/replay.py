@@ -0,0 +1,170 @@
+"""
+Replays recorded agent conversations against the real tools and a database,
+with LLM turns served from the recording, and reports tool-layer latency.
+
+Record first (any environment, e.g. a load test or staging):
+
+    AGENT_RECORD_DIR=recordings/ uvicorn app.main:app
+    AGENT_RECORD_DIR=recordings/ python -m benchmarks.loadtest ...
+
+Then replay against the same database (or a restored snapshot of it):
+
+    python -m benchmarks.replay recordings/ --repeat 5 --json-out before.json
+    python -m benchmarks.replay recordings/ --repeat 5 --compare before.json
+    python -m benchmarks.replay recordings/ --profile tools.prof   # cProfile of the tool layer
+
+Each repeat runs in its own outer transaction that is rolled back when it
+ends (unless --keep-changes), and the in-process caches (availability,
+dashboards, similar-case indexes, ID aliases) are emptied before it, so
+repeated runs see the same data and bookings do not turn into conflicts or
+idempotent replays.
+External services should be off or stubbed (EMAIL_TEST_MODE, or the
+stand-ins from benchmarks/loadtest.py).
+"""
+import argparse
+import asyncio
+import cProfile
+import json
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+from app.db.database import SessionLocal, engine
+from app.services import availability_cache, dashboard, similar_cases
+from app.services.agent import recorder, result_shaping
+from app.services.agent.agent import run_agent_chat
+from benchmarks.loadtest import percentile
+
+
+async def replay_once(recordings: List[dict]) -> dict:
+    tool_ms: Dict[str, List[float]] = defaultdict(list)
+    conversation_ms: List[float] = []
+    divergent = 0
+    errors = 0
+
+    for rec in recordings:
+        meta = rec["meta"]
+        session = recorder.ReplaySession(rec)
+        started = time.perf_counter()
+        with recorder.replaying(session):
+            await run_agent_chat(
+                user_message=meta["user_message"],
+                history=meta.get("history") or [],
+                current_user=meta["current_user"],
+                user_info=meta.get("user_info"),
+            )
+        conversation_ms.append((time.perf_counter() - started) * 1000)
+        divergent += session.divergent_results
+        for t in session.tool_timings:
+            tool_ms[t["name"]].append(t["ms"])
+            errors += not t["ok"]
+
+    return {"conversation_ms": conversation_ms, "tool_ms": dict(tool_ms), "divergent": divergent, "errors": errors}
+
+
+def reset_process_caches():
+    """Empties caches that would otherwise carry one run's writes into the next."""
+    availability_cache.clear()
+    dashboard.clear()
+    similar_cases.clear()
+    result_shaping.clear_aliases()
+
+
+def summarize(runs: List[dict]) -> dict:
+    tool_ms: Dict[str, List[float]] = defaultdict(list)
+    conversation_ms: List[float] = []
+    for run in runs:
+        conversation_ms.extend(run["conversation_ms"])
+        for name, values in run["tool_ms"].items():
+            tool_ms[name].extend(values)
+
+    def stats(values: List[float]) -> dict:
+        values = sorted(values)
+        return {
+            "count": len(values),
+            "mean_ms": round(sum(values) / len(values), 3),
+            "p50_ms": round(percentile(values, 50), 3),
+            "p95_ms": round(percentile(values, 95), 3),
+            "total_ms": round(sum(values), 3),
+        }
+
+    return {
+        "conversations": stats(conversation_ms) if conversation_ms else None,
+        "tools": {name: stats(values) for name, values in sorted(tool_ms.items())},
+        "divergent_results": sum(r["divergent"] for r in runs),
+        "tool_errors": sum(r["errors"] for r in runs),
+    }
+
+
+def print_report(report: dict, baseline: dict = None):
+    def delta(section: str, name: str, key: str) -> str:
+        if not baseline:
+            return ""
+        before = (baseline.get(section) or {}).get(name, {}) if section == "tools" else baseline.get(section) or {}
+        if not before or not before.get(key):
+            return "  (new)"
+        now = report[section][name][key] if section == "tools" else report[section][key]
+        return f"  ({(now - before[key]) / before[key] * 100:+.1f}%)"
+
+    print("\n🔁 Replay results (LLM time excluded)")
+    conv = report["conversations"]
+    if conv:
+        print(f"   conversations  n={conv['count']:<5} mean={conv['mean_ms']}ms p95={conv['p95_ms']}ms{delta('conversations', None, 'mean_ms')}")
+    for name, s in report["tools"].items():
+        print(f"   {name:<40} n={s['count']:<5} mean={s['mean_ms']}ms p50={s['p50_ms']}ms p95={s['p95_ms']}ms{delta('tools', name, 'mean_ms')}")
+    print(f"   divergent tool results: {report['divergent_results']}  tool errors: {report['tool_errors']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay recorded agent conversations and time the tool layer.")
+    parser.add_argument("paths", nargs="+", help="Recording files or directories")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json-out", default=None)
+    parser.add_argument("--compare", default=None, help="A previous --json-out report to diff against")
+    parser.add_argument("--profile", default=None, help="Write a cProfile stats file for the replay runs")
+    parser.add_argument("--keep-changes", action="store_true", help="Commit database writes instead of rolling back")
+    args = parser.parse_args()
+
+    recordings = list(recorder.iter_recordings(args.paths))
+    print(f"📼 Loaded {len(recordings)} recorded conversations")
+
+    profiler = cProfile.Profile() if args.profile else None
+    runs = []
+    for _ in range(args.repeat):
+        reset_process_caches()
+        # Every tool session of this run joins one outer transaction; tool
+        # commits become savepoints and the run's writes are rolled back at the end
+        connection = engine.connect()
+        outer = connection.begin()
+        if not args.keep_changes:
+            SessionLocal.configure(bind=connection, join_transaction_mode="create_savepoint")
+        try:
+            if profiler:
+                profiler.enable()
+            runs.append(asyncio.run(replay_once(recordings)))
+        finally:
+            if profiler:
+                profiler.disable()
+            if args.keep_changes:
+                outer.commit()
+            else:
+                outer.rollback()
+            connection.close()
+
+    report = summarize(runs)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2)
+    if profiler:
+        profiler.dump_stats(args.profile)
+        print(f"   profile written to {args.profile} (view with snakeviz or python -m pstats)")
+
+
+if __name__ == "__main__":
+    main()
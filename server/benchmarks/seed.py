@@ -0,0 +1,97 @@
+"""
+Seeds a scratch database with doctors, patients and past appointments for load tests.
+All users share one password ('loadtest') so seeding does a single bcrypt hash.
+"""
+import random
+import uuid
+from dataclasses import dataclass, field
+from datetime import datetime, time, timedelta, timezone
+from typing import List
+
+from sqlalchemy.orm import Session
+
+from app.db.models import Appointment, AppointmentStatus, User, UserRole
+from app.services.auth_service import hash_password
+from app.services.symptom_tagger import normalize_symptoms
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+FIRST_NAMES = ["Asha", "Ravi", "Meera", "Arjun", "Kavya", "Vikram", "Neha", "Rohan", "Priya", "Sanjay", "Anita", "Karan"]
+LAST_NAMES = ["Rao", "Sharma", "Iyer", "Gupta", "Menon", "Reddy", "Nair", "Ahuja", "Verma", "Kapoor", "Das", "Joshi"]
+SYMPTOMS = [
+    "high fever and chills", "persistent cough", "sore throat and cold", "headache since morning",
+    "lower back pain", "stomach ache and nausea", "skin rash with itching", "follow-up visit",
+    "feeling dizzy and tired", "knee pain after a fall", "not provided",
+]
+
+
+@dataclass
+class SeededUser:
+    """Detached copy of a seeded user, safe to use after the session closes."""
+    id: uuid.UUID
+    email: str
+    full_name: str
+    role: UserRole
+
+
+@dataclass
+class SeededData:
+    doctors: List[SeededUser] = field(default_factory=list)
+    patients: List[SeededUser] = field(default_factory=list)
+    appointments: int = 0
+
+
+def _unique_name(rng: random.Random, index: int) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {index:04d}"
+
+
+def seed_database(
+    db: Session,
+    doctors: int = 10,
+    patients: int = 200,
+    past_days: int = 30,
+    appointments_per_doctor_day: int = 3,
+    seed: int = 42,
+) -> SeededData:
+    rng = random.Random(seed)
+    password_hash = hash_password("loadtest")
+    run_tag = uuid.uuid4().hex[:6]
+    data = SeededData()
+
+    for i in range(doctors):
+        data.doctors.append(SeededUser(
+            uuid.uuid4(), f"doctor{i}.{run_tag}@loadtest.local", f"Dr. {_unique_name(rng, i)}", UserRole.doctor
+        ))
+    for i in range(patients):
+        data.patients.append(SeededUser(
+            uuid.uuid4(), f"patient{i}.{run_tag}@loadtest.local", _unique_name(rng, i), UserRole.patient
+        ))
+    db.bulk_insert_mappings(User, [
+        {"id": u.id, "email": u.email, "full_name": u.full_name, "role": u.role, "password_hash": password_hash}
+        for u in data.doctors + data.patients
+    ])
+
+    today = datetime.now(IST).date()
+    rows = []
+    for doctor in data.doctors:
+        for day_offset in range(1, past_days + 1):
+            day = today - timedelta(days=day_offset)
+            for hour in rng.sample(range(10, 17), k=min(appointments_per_doctor_day, 7)):
+                start_at = datetime.combine(day, time(hour)).replace(tzinfo=IST)
+                symptoms = rng.choice(SYMPTOMS)
+                rows.append({
+                    "id": uuid.uuid4(),
+                    "doctor_id": doctor.id,
+                    "patient_id": rng.choice(data.patients).id,
+                    "start_at": start_at,
+                    "end_at": start_at + timedelta(hours=1),
+                    "status": AppointmentStatus.booked,
+                    "symptoms": symptoms,
+                    "symptom_tags": normalize_symptoms(symptoms),
+                })
+    if rows:
+        db.bulk_insert_mappings(Appointment, rows)
+    db.commit()
+
+    data.appointments = len(rows)
+    return data
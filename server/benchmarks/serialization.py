@@ -0,0 +1,200 @@
+"""
+Encode/decode time and bytes on the wire for typical tool and API payloads,
+per JSON backend (app/services/serialization.py) and compression setting.
+
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --iterations 5000 --json-out serialization.json
+
+Payloads mirror the shapes the tools return (slots for one day, a week's and a
+month's schedule, a 100-row appointments page) with realistic names and
+symptoms. No database is needed.
+"""
+import argparse
+import gzip
+import json
+import random
+import time
+import uuid
+from datetime import datetime, timedelta, timezone
+from statistics import median
+from typing import Any, Callable, Dict, List
+
+from app.services.serialization import _CODECS
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+FIRST_NAMES = ["Aarav", "Diya", "Kabir", "Meera", "Rohan", "Saanvi", "Vikram", "Ananya", "Arjun", "Isha"]
+LAST_NAMES = ["Sharma", "Iyer", "Reddy", "Nair", "Gupta", "Mehta", "Kapoor", "Das", "Joshi", "Rao"]
+SYMPTOMS = [
+    "Fever and body ache since two days",
+    "Persistent dry cough, worse at night",
+    "Lower back pain after lifting",
+    "Migraine with nausea",
+    "Follow-up for blood pressure",
+    "Sore throat and mild cold",
+    "Skin rash on forearm",
+    "Not specified",
+]
+
+
+def _name(rng: random.Random) -> str:
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def slots_payload(rng: random.Random) -> Dict[str, Any]:
+    day = datetime(2026, 11, 3, tzinfo=IST)
+    slots = []
+    for hour in range(10, 17):
+        if rng.random() < 0.3:
+            continue
+        start = day.replace(hour=hour)
+        end = start + timedelta(hours=1)
+        slots.append({
+            "iso_start": start.isoformat(),
+            "time": start.strftime("%I:%M %p"),
+            "display": f"{start.strftime('%I:%M %p')} - {end.strftime('%I:%M %p')}",
+        })
+    times_text = ", ".join(s["time"] for s in slots)
+    return {
+        "status": "success",
+        "date": "2026-11-03",
+        "summary": f"On 2026-11-03, the following slots are available: {times_text}.",
+        "available": True,
+        "slots": slots,
+    }
+
+
+def schedule_payload(rng: random.Random, days: int, per_day: int = 7) -> Dict[str, Any]:
+    start = datetime(2026, 11, 1, tzinfo=IST)
+    schedule = {}
+    total = 0
+    for d in range(days):
+        day = start + timedelta(days=d)
+        rows = []
+        for hour in sorted(rng.sample(range(10, 17), per_day)):
+            rows.append({
+                "time": day.replace(hour=hour).strftime("%I:%M %p"),
+                "patient_name": _name(rng),
+                "symptoms": rng.choice(SYMPTOMS),
+            })
+        schedule[day.strftime("%Y-%m-%d (%A)")] = rows
+        total += len(rows)
+    return {
+        "status": "success",
+        "range": f"2026-11-01 to {(start + timedelta(days=days - 1)).date()}",
+        "total_count": total,
+        "summary": f"I found {total} appointments for this period.",
+        "schedule": schedule,
+    }
+
+
+def page_payload(rng: random.Random, rows: int = 100) -> Dict[str, Any]:
+    # Native UUID/datetime values, as API routes hand them to the encoder
+    start = datetime(2026, 11, 1, 10, tzinfo=IST)
+    appointments = []
+    for i in range(rows):
+        at = start + timedelta(hours=i)
+        appointments.append({
+            "id": uuid.UUID(int=rng.getrandbits(128)),
+            "start_at": at,
+            "date": at.strftime("%Y-%m-%d"),
+            "time": at.strftime("%I:%M %p"),
+            "patient_name": _name(rng),
+            "symptoms": rng.choice(SYMPTOMS),
+        })
+    return {"status": "success", "count": rows, "next_cursor": "MjAyNi0xMS0wNVQxMzowMDowMCswNTozMHx4", "appointments": appointments}
+
+
+def build_payloads(seed: int) -> Dict[str, Dict[str, Any]]:
+    rng = random.Random(seed)
+    return {
+        "slots_day": slots_payload(rng),
+        "schedule_week": schedule_payload(rng, 7),
+        "schedule_month": schedule_payload(rng, 30),
+        "appointments_page": page_payload(rng),
+    }
+
+
+def _time_us(fn: Callable[[], Any], iterations: int) -> float:
+    # Median of 5 batches, per call, in microseconds
+    batches = []
+    for _ in range(5):
+        started = time.perf_counter()
+        for _ in range(iterations):
+            fn()
+        batches.append((time.perf_counter() - started) / iterations * 1e6)
+    return median(batches)
+
+
+def _compressors() -> Dict[str, Callable[[bytes], bytes]]:
+    compressors = {"gzip-6": lambda b: gzip.compress(b, compresslevel=6)}
+    try:
+        import brotli
+        compressors["brotli-4"] = lambda b: brotli.compress(b, quality=4)
+    except ImportError:
+        pass
+    return compressors
+
+
+def run(iterations: int, seed: int) -> List[Dict[str, Any]]:
+    payloads = build_payloads(seed)
+    compressors = _compressors()
+    results = []
+
+    for backend_name, factory in _CODECS.items():
+        try:
+            _, dumps_bytes, loads = factory()
+        except ImportError:
+            print(f"   (skipping {backend_name}: not installed)")
+            continue
+
+        for payload_name, payload in payloads.items():
+            body = dumps_bytes(payload)
+            row = {
+                "backend": backend_name,
+                "payload": payload_name,
+                "encode_us": round(_time_us(lambda: dumps_bytes(payload), iterations), 2),
+                "decode_us": round(_time_us(lambda: loads(body), iterations), 2),
+                "bytes": len(body),
+            }
+            for comp_name, compress in compressors.items():
+                row[f"bytes_{comp_name}"] = len(compress(body))
+                row[f"{comp_name}_us"] = round(_time_us(lambda: compress(body), max(1, iterations // 10)), 2)
+            results.append(row)
+    return results
+
+
+def print_report(results: List[Dict[str, Any]]):
+    comp_cols = sorted({k for r in results for k in r if k.startswith("bytes_")})
+    header = f"{'payload':<18} {'backend':<8} {'encode µs':>10} {'decode µs':>10} {'bytes':>8}"
+    for col in comp_cols:
+        name = col[len("bytes_"):]
+        header += f" {name:>10} {name + ' µs':>12}"
+    print(header)
+    print("-" * len(header))
+    for r in sorted(results, key=lambda r: (r["payload"], r["backend"])):
+        line = f"{r['payload']:<18} {r['backend']:<8} {r['encode_us']:>10.2f} {r['decode_us']:>10.2f} {r['bytes']:>8}"
+        for col in comp_cols:
+            name = col[len("bytes_"):]
+            line += f" {r[col]:>10} {r[name + '_us']:>12.2f}"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="JSON backend and compression benchmark.")
+    parser.add_argument("--iterations", type=int, default=2000, help="Calls per timing batch")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--json-out", default=None)
+    args = parser.parse_args()
+
+    results = run(args.iterations, args.seed)
+    print_report(results)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"\n📝 Results written to {args.json_out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Times every tool in app/mcp_server/tools at several data scales.
+
+For each scale the scratch database is emptied and filled by
+benchmarks/datagen.py (fixed seed, so every run sees the same data relative
+to the anchor date). Each tool is then called --iterations times with
+arguments drawn from that data, each call in its own session the way the MCP
+server runs them, and the report lists latency and SQL statements per call.
+Calendar, SMTP and Slack go to the local stand-ins from benchmarks/loadtest.py;
+the availability cache is off unless AVAILABILITY_CACHE_BACKEND is set, so
+slot lookups time the database path.
+
+    DATABASE_URL=postgresql://localhost/assistant_bench python -m benchmarks.tools --reset --json-out tools-before.json
+    python -m benchmarks.tools --reset --scales small,medium,large --compare tools-before.json --max-regression 25
+
+The JSON report is written with sorted keys so two runs diff cleanly; --compare
+prints the change against a previous report and --max-regression makes the
+run exit non-zero when a tool's p50 got slower by more than that percentage.
+--reset is required: it wipes users and appointments, so scratch databases only.
+Run `python -m app.db.migrate upgrade` first.
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Tuple
+
+from benchmarks.loadtest import percentile, start_fakes
+
+IST = timezone(timedelta(hours=5, minutes=30))
+
+SYMPTOM_KEYWORDS = ["fever", "cough", "back pain", "rash", "headache"]
+
+
+class StatementCounter:
+    """Counts the SQL statements sent while active."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+
+        self.count = 0
+        self.active = False
+        event.listen(engine, "before_cursor_execute", self._on_execute)
+
+    def _on_execute(self, *args):
+        if self.active:
+            self.count += 1
+
+
+def _free_slots(db, data, anchor: date, days: int, needed: int, rng: random.Random) -> List[Tuple[str, str]]:
+    """Distinct (doctor_id, start_at) pairs free in the coming days, for the booking tools."""
+    from app.mcp_server.tools.fetch_available_appointment_slots import compute_free_hours
+
+    slots, taken, attempts = [], set(), 0
+    while len(slots) < needed and attempts < needed * 20:
+        attempts += 1
+        doctor = rng.choice(data.doctors)
+        day = anchor + timedelta(days=1 + rng.randrange(days))
+        hours = sorted(h for h in compute_free_hours(db, str(doctor.id), day) if (doctor.id, day, h) not in taken)
+        if not hours:
+            continue
+        hour = rng.choice(hours)
+        taken.add((doctor.id, day, hour))
+        slots.append((str(doctor.id), datetime(day.year, day.month, day.day, hour).isoformat()))
+    db.rollback()
+    return slots
+
+
+def build_cases(data, anchor: date, future_days: int, calls: int, seed: int) -> Dict[str, Callable[[Any, int], dict]]:
+    """One callable per tool scenario, taking (db, call index); arguments vary per call but not per run."""
+    from app.db.database import SessionLocal
+    from app.mcp_server.tools.book_appointment import book_appointment
+    from app.mcp_server.tools.find_similar_appointments import find_similar_appointments
+    from app.mcp_server.tools.fetch_available_appointment_slots import fetch_available_appointment_slots
+    from app.mcp_server.tools.get_appointment_stats import get_appointment_statistics
+    from app.mcp_server.tools.get_appointments_by_range import get_doctor_appointments_range
+    from app.mcp_server.tools.get_appointments_by_symptoms import search_appointments_by_symptoms
+    from app.mcp_server.tools.get_appointments_page import get_doctor_appointments_page
+    from app.mcp_server.tools.hold_appointment_slot import hold_appointment_slot
+    from app.mcp_server.tools.list_available_doctors import list_available_doctors
+    from app.mcp_server.tools.notify_on_slack import notify_on_slack
+    from app.mcp_server.tools.search_doctor_by_name import search_doctor_by_name
+    from app.services import similar_cases
+
+    rng = random.Random(seed)
+    doctors = [str(rng.choice(data.doctors).id) for _ in range(calls)]
+    patients = [str(rng.choice(data.patients).id) for _ in range(calls)]
+    # "Dr. <first> <last> <n>": search by last name, as patients do
+    names = [rng.choice(data.doctors).full_name.split()[2] for _ in range(calls)]
+    window = max(1, min(7, future_days))
+    with SessionLocal() as db:
+        slots = _free_slots(db, data, anchor, window, 2 * calls, rng)
+        # Similar-case queries are timed against built indexes (builds are logged)
+        for doctor_id in set(doctors):
+            similar_cases.search(db, doctor_id, "fever", 1)
+    booking_slots, hold_slots = slots[:calls], slots[calls:]
+
+    fmt = lambda d: d.strftime("%Y-%m-%d")
+    yesterday = anchor - timedelta(days=1)
+    week, month, quarter = fmt(anchor - timedelta(days=7)), fmt(anchor - timedelta(days=30)), fmt(anchor - timedelta(days=90))
+    upcoming = lambda i: fmt(anchor + timedelta(days=1 + i % window))
+
+    return {
+        "list_available_doctors": lambda db, i: list_available_doctors(db),
+        "search_doctor_by_name": lambda db, i: search_doctor_by_name(db, names[i]),
+        "fetch_available_appointment_slots": lambda db, i: fetch_available_appointment_slots(db, doctors[i], upcoming(i), patients[i]),
+        "hold_appointment_slot": lambda db, i: hold_appointment_slot(db, hold_slots[i][0], patients[i], hold_slots[i][1]),
+        "book_appointment": lambda db, i: book_appointment(db, booking_slots[i][0], patients[i], booking_slots[i][1], "fever and cough"),
+        "get_doctor_appointments_range": lambda db, i: get_doctor_appointments_range(db, doctors[i], week, fmt(yesterday)),
+        "get_doctor_appointments_page": lambda db, i: get_doctor_appointments_page(db, doctors[i], month, fmt(yesterday), None, 20),
+        "search_appointments_by_symptoms": lambda db, i: search_appointments_by_symptoms(
+            db, doctors[i], SYMPTOM_KEYWORDS[i % len(SYMPTOM_KEYWORDS)], month, fmt(yesterday)
+        ),
+        "find_similar_appointments": lambda db, i: find_similar_appointments(
+            db, doctors[i], f"{SYMPTOM_KEYWORDS[i % len(SYMPTOM_KEYWORDS)]} since two days, feeling weak", None, 10
+        ),
+        "get_appointment_statistics": lambda db, i: get_appointment_statistics(db, doctors[i], month, fmt(yesterday), "day", ""),
+        "get_appointment_statistics[quarter,keyword]": lambda db, i: get_appointment_statistics(
+            db, doctors[i], quarter, fmt(yesterday), "week", SYMPTOM_KEYWORDS[i % len(SYMPTOM_KEYWORDS)]
+        ),
+        "notify_on_slack": lambda db, i: notify_on_slack(db, doctors[i], f"Daily summary #{i}: 5 appointments, 2 with fever."),
+    }
+
+
+def time_cases(cases: Dict[str, Callable[[Any, int], dict]], counter: StatementCounter, warmup: int, iterations: int) -> Dict[str, dict]:
+    from app.db.database import SessionLocal
+
+    results = {}
+    for name, case in cases.items():
+        durations, statements, statuses = [], [], Counter()
+        for i in range(warmup + iterations):
+            counter.count = 0
+            counter.active = True
+            started = time.perf_counter()
+            with SessionLocal() as db:
+                result = case(db, i)
+            elapsed = (time.perf_counter() - started) * 1000
+            counter.active = False
+            if i < warmup:
+                continue
+            durations.append(elapsed)
+            statements.append(counter.count)
+            statuses[str(result.get("status")) if isinstance(result, dict) else "ok"] += 1
+        durations.sort()
+        results[name] = {
+            "count": len(durations),
+            "mean_ms": round(sum(durations) / len(durations), 3),
+            "p50_ms": round(percentile(durations, 50), 3),
+            "p95_ms": round(percentile(durations, 95), 3),
+            "max_ms": round(durations[-1], 3),
+            "statements": round(sum(statements) / len(statements), 2),
+            "statuses": dict(sorted(statuses.items())),
+        }
+        print(f"   ⏱️ {name:<45} p50={results[name]['p50_ms']}ms")
+    return results
+
+
+def run_scale(name: str, args, counter: StatementCounter, anchor: date) -> dict:
+    from app.db.database import SessionLocal, engine
+    from benchmarks.datagen import SCALES, analyze, generate, reset_database
+
+    scale = SCALES[name]
+    print(f"\n🌱 Scale '{name}': {scale.doctors} doctors, {scale.patients} patients, {scale.past_days} days of history")
+    started = time.perf_counter()
+    with SessionLocal() as db:
+        reset_database(db)
+        data = generate(db, scale, seed=args.seed, anchor=anchor)
+    analyze(engine)
+    seed_seconds = time.perf_counter() - started
+    print(f"   {data.appointments} appointments in {seed_seconds:.1f}s")
+
+    calls = args.warmup + args.iterations
+    cases = build_cases(data, anchor, scale.future_days, calls, args.seed)
+    return {
+        "dataset": {
+            "doctors": scale.doctors,
+            "patients": scale.patients,
+            "appointments": data.appointments,
+            "past_days": scale.past_days,
+            "future_days": scale.future_days,
+        },
+        "tools": time_cases(cases, counter, args.warmup, args.iterations),
+    }
+
+
+def _metadata(args, anchor: date) -> dict:
+    from sqlalchemy import text
+    from app.db.database import engine
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    with engine.connect() as conn:
+        server = conn.execute(text("SHOW server_version")).scalar()
+    return {
+        "commit": commit,
+        "anchor_date": anchor.isoformat(),
+        "seed": args.seed,
+        "warmup": args.warmup,
+        "iterations": args.iterations,
+        "availability_cache": os.environ.get("AVAILABILITY_CACHE_BACKEND"),
+        "postgres": server,
+        "python": platform.python_version(),
+    }
+
+
+def compare(report: dict, baseline: dict, max_regression: float = None) -> List[str]:
+    """Prints per-tool p50 changes against a previous report; returns the regressions over max_regression."""
+    regressions = []
+    print(f"\n📊 Compared with {baseline.get('meta', {}).get('commit') or 'baseline'} (p50, statements per call)")
+    for scale, section in report["scales"].items():
+        before_tools = baseline.get("scales", {}).get(scale, {}).get("tools", {})
+        print(f"\n   {scale}")
+        for name, now in section["tools"].items():
+            before = before_tools.get(name)
+            if not before:
+                print(f"   {name:<45} {now['p50_ms']:>9.3f}ms  (new)")
+                continue
+            change = (now["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0.0
+            statements = "" if now["statements"] == before["statements"] else f"  statements {before['statements']} -> {now['statements']}"
+            flag = ""
+            if max_regression is not None and change > max_regression:
+                flag = "  ⚠️"
+                regressions.append(f"{scale}/{name} {change:+.1f}%")
+            print(f"   {name:<45} {before['p50_ms']:>9.3f}ms -> {now['p50_ms']:>9.3f}ms ({change:+.1f}%){statements}{flag}")
+    return regressions
+
+
+def print_report(report: dict):
+    print(f"\n🧰 Tool latency per call (commit {report['meta']['commit']}, anchor {report['meta']['anchor_date']})")
+    for scale, section in report["scales"].items():
+        d = section["dataset"]
+        print(f"\n   {scale}: {d['doctors']} doctors, {d['patients']} patients, {d['appointments']} appointments")
+        print(f"   {'tool':<45} {'p50 ms':>9} {'p95 ms':>9} {'max ms':>9} {'stmts':>6}  statuses")
+        for name, s in section["tools"].items():
+            statuses = ", ".join(f"{k}={v}" for k, v in s["statuses"].items())
+            print(f"   {name:<45} {s['p50_ms']:>9.3f} {s['p95_ms']:>9.3f} {s['max_ms']:>9.3f} {s['statements']:>6}  {statuses}")
+
+
+def main():
+    from benchmarks.datagen import SCALES
+
+    parser = argparse.ArgumentParser(description="Per-tool latency benchmark at several data scales.")
+    parser.add_argument("--scales", default="small,medium", help=f"Comma-separated, from: {', '.join(SCALES)}")
+    parser.add_argument("--iterations", type=int, default=30)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--anchor-date", default=None, help="YYYY-MM-DD treated as today (default: today, IST); booking needs it not in the past")
+    parser.add_argument("--reset", action="store_true", help="Confirms the database may be wiped for each scale")
+    parser.add_argument("--json-out", default=None)
+    parser.add_argument("--compare", default=None, help="A previous --json-out report to diff against")
+    parser.add_argument("--max-regression", type=float, default=None, help="Exit 1 if a p50 regressed by more than this %%")
+    args = parser.parse_args()
+
+    scales = [s.strip() for s in args.scales.split(",") if s.strip()]
+    unknown = [s for s in scales if s not in SCALES]
+    if unknown:
+        parser.error(f"unknown scale(s): {', '.join(unknown)}")
+    if not args.reset:
+        parser.error("--reset is required: every scale empties users and appointments first (scratch databases only)")
+
+    # Stand-ins first: app modules read their service configuration at import time
+    fakes = start_fakes(argparse.Namespace(
+        llm_latency_ms=0, service_latency_ms=0, groq_port=0, calendar_port=0, slack_port=0, smtp_port=0
+    ))
+    os.environ.update(fakes.env)
+    os.environ.setdefault("AVAILABILITY_CACHE_BACKEND", "none")
+
+    from app.db.database import engine
+
+    anchor = date.fromisoformat(args.anchor_date) if args.anchor_date else datetime.now(IST).date()
+    print(f"🗄️ Benchmarking tools on {engine.url.render_as_string(hide_password=True)}")
+    counter = StatementCounter(engine)
+    report = {"meta": _metadata(args, anchor), "scales": {}}
+    for name in scales:
+        report["scales"][name] = run_scale(name, args, counter, anchor)
+
+    print_report(report)
+    regressions = []
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(report, json.load(f), args.max_regression)
+
+    if args.json_out:
+        with open(args.json_out, "w") as f:
+            json.dump(report, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"📝 Results written to {args.json_out}")
+
+    if regressions:
+        print(f"\n❌ p50 regressed by more than {args.max_regression}%: {', '.join(regressions)}")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
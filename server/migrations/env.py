@@ -0,0 +1,71 @@
+import os
+import re
+from logging.config import fileConfig
+
+from alembic import context
+from sqlalchemy import create_engine
+from sqlalchemy.pool import NullPool
+
+from app.db.database import SQLALCHEMY_DATABASE_URL
+from app.db import models
+
+config = context.config
+
+if config.config_file_name is not None:
+    fileConfig(config.config_file_name)
+
+target_metadata = models.Base.metadata
+
+# Migrations should bypass transaction poolers (Supabase/Neon) because
+# CREATE INDEX CONCURRENTLY cannot run through them, so allow a direct URL.
+MIGRATIONS_DATABASE_URL = os.getenv("MIGRATIONS_DATABASE_URL") or SQLALCHEMY_DATABASE_URL
+
+# Monthly partitions of `appointments` are created by app/jobs/maintain_partitions.py,
+# not by migrations, so autogenerate must not treat them as stray tables.
+PARTITION_TABLE_RE = re.compile(r"^appointments_(p\d{4}_\d{2}|default)$")
+
+
+def include_object(obj, name, type_, reflected, compare_to):
+    table = obj if type_ == "table" else getattr(obj, "table", None)
+    if table is not None and PARTITION_TABLE_RE.match(table.name):
+        return False
+    return True
+
+
+def run_migrations_offline() -> None:
+    """Emit the migration SQL to stdout without connecting (alembic --sql)."""
+    context.configure(
+        url=MIGRATIONS_DATABASE_URL,
+        target_metadata=target_metadata,
+        literal_binds=True,
+        dialect_opts={"paramstyle": "named"},
+        transaction_per_migration=True,
+    )
+
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online() -> None:
+    """Run migrations against the live database, one transaction per revision."""
+    connectable = create_engine(MIGRATIONS_DATABASE_URL, poolclass=NullPool)
+
+    with connectable.connect() as connection:
+        context.configure(
+            connection=connection,
+            target_metadata=target_metadata,
+            # Each revision commits on its own so a revision can step out of
+            # the transaction (autocommit_block) for concurrent index builds.
+            transaction_per_migration=True,
+            compare_type=True,
+            include_object=include_object,
+        )
+
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
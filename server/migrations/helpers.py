@@ -0,0 +1,72 @@
+from typing import List, Optional
+
+from alembic import op
+from sqlalchemy import text
+
+
+def create_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: List[str],
+    unique: bool = False,
+    where: Optional[str] = None,
+    using: Optional[str] = None,
+) -> None:
+    """
+    Builds an index without taking a write lock on the table.
+    CREATE INDEX CONCURRENTLY cannot run inside a transaction, so we step
+    out of the migration transaction for the duration of the build.
+    A failed concurrent build leaves an INVALID index behind, which we drop first.
+    """
+    kwargs = {"postgresql_concurrently": True}
+    if where:
+        kwargs["postgresql_where"] = text(where)
+    if using:
+        kwargs["postgresql_using"] = using
+
+    with op.get_context().autocommit_block():
+        op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {index_name}")
+        op.create_index(index_name, table_name, columns, unique=unique, **kwargs)
+
+
+def drop_index_concurrently(index_name: str, table_name: str) -> None:
+    """Drops an index without blocking reads and writes on the table."""
+    with op.get_context().autocommit_block():
+        op.drop_index(index_name, table_name=table_name, postgresql_concurrently=True, if_exists=True)
+
+
+def create_partitioned_index_concurrently(
+    index_name: str,
+    table_name: str,
+    columns: List[str],
+    where: Optional[str] = None,
+) -> None:
+    """
+    Builds an index on a partitioned table without a write lock on it.
+    Postgres has no CREATE INDEX CONCURRENTLY for a partitioned parent, so the
+    parent gets an invalid index ON ONLY itself, each partition is indexed
+    concurrently and attached, and the parent index turns valid once every
+    partition is attached. Partitions created later inherit it automatically.
+    """
+    cols = ", ".join(columns)
+    predicate = f" WHERE {where}" if where else ""
+    bind = op.get_bind()
+    partitions = bind.execute(text("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        JOIN pg_class p ON p.oid = i.inhparent
+        WHERE p.relname = :parent
+        ORDER BY c.relname
+    """), {"parent": table_name}).scalars().all()
+
+    op.execute(f"CREATE INDEX IF NOT EXISTS {index_name} ON ONLY {table_name} ({cols}){predicate}")
+    with op.get_context().autocommit_block():
+        for partition in partitions:
+            # Named after the parent index (e.g. ix_..._p2026_10), so indexes on
+            # the same columns never collide; Postgres truncates names at 63 bytes
+            suffix = partition[len(table_name) + 1:] if partition.startswith(table_name + "_") else partition
+            child_index = f"{index_name}_{suffix}"[:63]
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {child_index}")
+            op.execute(f"CREATE INDEX CONCURRENTLY {child_index} ON {partition} ({cols}){predicate}")
+            op.execute(f"ALTER INDEX {index_name} ATTACH PARTITION {child_index}")
@@ -0,0 +1,62 @@
+"""initial schema: users and appointments
+
+Matches the tables previously created by Base.metadata.create_all at boot.
+Databases that were bootstrapped that way should be marked as migrated with
+`python -m app.db.migrate stamp 0001` instead of running this revision.
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+user_role = postgresql.ENUM("patient", "doctor", name="userrole", create_type=False)
+appointment_status = postgresql.ENUM("booked", "cancelled", "completed", name="appointmentstatus", create_type=False)
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+    user_role.create(bind, checkfirst=True)
+    appointment_status.create(bind, checkfirst=True)
+
+    op.create_table(
+        "users",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("password_hash", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("role", user_role, nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+
+    op.create_table(
+        "appointments",
+        sa.Column("id", postgresql.UUID(as_uuid=True), primary_key=True),
+        sa.Column("doctor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("patient_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("start_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("end_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("status", appointment_status, nullable=False),
+        sa.Column("symptoms", sa.String(), nullable=True),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.func.now(), nullable=False),
+    )
+    op.create_index("ix_appointments_doctor_id", "appointments", ["doctor_id"])
+    op.create_index("ix_appointments_patient_id", "appointments", ["patient_id"])
+    op.create_index("ix_appointments_start_at", "appointments", ["start_at"])
+
+
+def downgrade() -> None:
+    op.drop_table("appointments")
+    op.drop_table("users")
+
+    bind = op.get_bind()
+    appointment_status.drop(bind, checkfirst=True)
+    user_role.drop(bind, checkfirst=True)
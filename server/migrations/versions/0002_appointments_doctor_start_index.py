@@ -0,0 +1,28 @@
+"""composite (doctor_id, start_at) index for schedule lookups
+
+Every tool filters appointments by doctor and a start_at window, which the
+single-column indexes can only serve with a bitmap AND. Built concurrently
+so it can be applied to a live database.
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+"""
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_concurrently(
+        "ix_appointments_doctor_id_start_at",
+        "appointments",
+        ["doctor_id", "start_at"],
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_appointments_doctor_id_start_at", "appointments")
@@ -0,0 +1,28 @@
+"""keyset index for paginated doctor schedules
+
+Covers `doctor_id = ? AND status = 'booked' ORDER BY start_at, id` so each
+page is a bounded index range scan starting right after the cursor.
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19
+"""
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    create_index_concurrently(
+        "ix_appointments_doctor_booked_keyset",
+        "appointments",
+        ["doctor_id", "start_at", "id"],
+        where="status = 'booked'",
+    )
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_appointments_doctor_booked_keyset", "appointments")
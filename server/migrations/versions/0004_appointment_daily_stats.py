@@ -0,0 +1,32 @@
+"""appointment_daily_stats rollup table
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0004"
+down_revision = "0003"
+branch_labels = None
+depends_on = None
+
+appointment_status = postgresql.ENUM("booked", "cancelled", "completed", name="appointmentstatus", create_type=False)
+
+
+def upgrade() -> None:
+    op.create_table(
+        "appointment_daily_stats",
+        sa.Column("doctor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("day", sa.Date(), nullable=False),
+        sa.Column("status", appointment_status, nullable=False),
+        sa.Column("symptom_bucket", sa.String(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("doctor_id", "day", "status", "symptom_bucket"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_table("appointment_daily_stats")
@@ -0,0 +1,33 @@
+"""symptom_tags array column with a GIN index
+
+Adding a column with a constant default is metadata-only on PostgreSQL 11+,
+and the GIN index is built concurrently, so this is safe on a live table.
+Existing rows start untagged ('{}'); run `python -m app.jobs.backfill_symptom_tags`.
+
+Revision ID: 0005
+Revises: 0004
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+from migrations.helpers import create_index_concurrently, drop_index_concurrently
+
+revision = "0005"
+down_revision = "0004"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "appointments",
+        sa.Column("symptom_tags", postgresql.ARRAY(sa.String()), nullable=False, server_default="{}"),
+    )
+    create_index_concurrently("ix_appointments_symptom_tags", "appointments", ["symptom_tags"], using="gin")
+
+
+def downgrade() -> None:
+    drop_index_concurrently("ix_appointments_symptom_tags", "appointments")
+    op.drop_column("appointments", "symptom_tags")
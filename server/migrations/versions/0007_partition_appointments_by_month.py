@@ -0,0 +1,114 @@
+"""range-partition appointments by month on start_at
+
+Rebuilds `appointments` as a table partitioned by RANGE (start_at) with one
+partition per IST calendar month and a default partition for anything outside
+them. Partitions are created from the oldest existing month through 12 months
+ahead; later months are added by `python -m app.jobs.maintain_partitions`.
+
+The primary key becomes (id, start_at), since a partitioned table's unique
+constraints must include the partition key. The rows are copied into the new
+table and the indexes rebuilt, so run this in a maintenance window on large
+tables (bookings are blocked while it runs).
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19
+"""
+from datetime import date, datetime, timedelta, timezone
+
+from alembic import op
+from sqlalchemy import text
+
+revision = "0007"
+down_revision = "0006"
+branch_labels = None
+depends_on = None
+
+IST = timezone(timedelta(hours=5, minutes=30))
+MONTHS_AHEAD = 12
+
+COLUMNS = "id, doctor_id, patient_id, start_at, end_at, status, symptoms, symptom_tags, created_at"
+
+COLUMN_DDL = """
+    id UUID NOT NULL,
+    doctor_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    patient_id UUID NOT NULL REFERENCES users(id) ON DELETE CASCADE,
+    start_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    end_at TIMESTAMP WITH TIME ZONE NOT NULL,
+    status appointmentstatus NOT NULL,
+    symptoms VARCHAR,
+    symptom_tags VARCHAR[] DEFAULT '{}' NOT NULL,
+    created_at TIMESTAMP WITH TIME ZONE DEFAULT now() NOT NULL
+"""
+
+INDEXES = [
+    "CREATE INDEX ix_appointments_doctor_id ON appointments (doctor_id)",
+    "CREATE INDEX ix_appointments_patient_id ON appointments (patient_id)",
+    "CREATE INDEX ix_appointments_start_at ON appointments (start_at)",
+    "CREATE INDEX ix_appointments_doctor_id_start_at ON appointments (doctor_id, start_at)",
+    "CREATE INDEX ix_appointments_doctor_booked_keyset ON appointments (doctor_id, start_at, id) WHERE status = 'booked'",
+    "CREATE INDEX ix_appointments_symptom_tags ON appointments USING gin (symptom_tags)",
+]
+
+
+def _add_months(month: date, n: int) -> date:
+    index = month.year * 12 + (month.month - 1) + n
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def _bound(month: date) -> str:
+    return datetime(month.year, month.month, 1, tzinfo=IST).isoformat()
+
+
+def upgrade() -> None:
+    bind = op.get_bind()
+
+    # 1. Move the plain table aside (its pkey index name would clash with the new one)
+    op.execute("ALTER TABLE appointments RENAME TO appointments_unpartitioned")
+    op.execute("ALTER TABLE appointments_unpartitioned RENAME CONSTRAINT appointments_pkey TO appointments_unpartitioned_pkey")
+
+    # 2. Partitioned parent
+    op.execute(f"""
+        CREATE TABLE appointments (
+            {COLUMN_DDL},
+            CONSTRAINT appointments_pkey PRIMARY KEY (id, start_at)
+        ) PARTITION BY RANGE (start_at)
+    """)
+
+    # 3. One partition per month from the oldest row through MONTHS_AHEAD, plus the default
+    oldest = bind.execute(text("SELECT min(start_at) FROM appointments_unpartitioned")).scalar()
+    current = datetime.now(IST).date().replace(day=1)
+    month = oldest.astimezone(IST).date().replace(day=1) if oldest else current
+    month = min(month, current)
+    last = _add_months(current, MONTHS_AHEAD)
+    while month <= last:
+        nxt = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE appointments_p{month:%Y_%m} PARTITION OF appointments "
+            f"FOR VALUES FROM ('{_bound(month)}') TO ('{_bound(nxt)}')"
+        )
+        month = nxt
+    op.execute("CREATE TABLE appointments_default PARTITION OF appointments DEFAULT")
+
+    # 4. Copy rows, then build indexes once over the loaded partitions
+    op.execute(f"INSERT INTO appointments ({COLUMNS}) SELECT {COLUMNS} FROM appointments_unpartitioned")
+    op.execute("DROP TABLE appointments_unpartitioned")
+    for ddl in INDEXES:
+        op.execute(ddl)
+    op.execute("ANALYZE appointments")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE appointments RENAME TO appointments_partitioned")
+    op.execute("ALTER TABLE appointments_partitioned RENAME CONSTRAINT appointments_pkey TO appointments_partitioned_pkey")
+    op.execute(f"""
+        CREATE TABLE appointments (
+            {COLUMN_DDL},
+            CONSTRAINT appointments_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute(f"INSERT INTO appointments ({COLUMNS}) SELECT {COLUMNS} FROM appointments_partitioned")
+    # Drops the attached partitions; archived (detached) months are left alone
+    op.execute("DROP TABLE appointments_partitioned")
+    for ddl in INDEXES:
+        op.execute(ddl)
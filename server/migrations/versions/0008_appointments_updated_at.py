@@ -0,0 +1,36 @@
+"""appointments.updated_at for calendar feed ETags
+
+Adds `updated_at` (set on insert and on every ORM update) and an index on
+(doctor_id, updated_at), so the latest change to a doctor's appointments, which
+the ICS feed uses as its ETag, is one index probe per partition.
+
+Adding the column with a now() default is a catalog-only change (existing rows
+read the migration time); the index is built concurrently partition by partition.
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_partitioned_index_concurrently
+
+revision = "0008"
+down_revision = "0007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        "appointments",
+        sa.Column("updated_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+    )
+    create_partitioned_index_concurrently("ix_appointments_doctor_id_updated_at", "appointments", ["doctor_id", "updated_at"])
+
+
+def downgrade() -> None:
+    # Dropping the parent index drops the attached partition indexes with it
+    op.execute("DROP INDEX IF EXISTS ix_appointments_doctor_id_updated_at")
+    op.drop_column("appointments", "updated_at")
@@ -0,0 +1,42 @@
+"""appointment reminder tracking columns and due-reminder indexes
+
+Adds reminder_24h_sent_at / reminder_1h_sent_at and one partial index per
+reminder kind over booked appointments that still need it, so the dispatcher
+(app/services/reminders.py) finds due reminders with a start_at range scan.
+
+Both columns are nullable without a default, so adding them is catalog-only;
+the indexes are built concurrently partition by partition.
+
+Revision ID: 0009
+Revises: 0008
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+from migrations.helpers import create_partitioned_index_concurrently
+
+revision = "0009"
+down_revision = "0008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("appointments", sa.Column("reminder_24h_sent_at", sa.DateTime(timezone=True), nullable=True))
+    op.add_column("appointments", sa.Column("reminder_1h_sent_at", sa.DateTime(timezone=True), nullable=True))
+    create_partitioned_index_concurrently(
+        "ix_appointments_reminder_24h_due", "appointments", ["start_at"],
+        where="status = 'booked' AND reminder_24h_sent_at IS NULL",
+    )
+    create_partitioned_index_concurrently(
+        "ix_appointments_reminder_1h_due", "appointments", ["start_at"],
+        where="status = 'booked' AND reminder_1h_sent_at IS NULL",
+    )
+
+
+def downgrade() -> None:
+    op.execute("DROP INDEX IF EXISTS ix_appointments_reminder_1h_due")
+    op.execute("DROP INDEX IF EXISTS ix_appointments_reminder_24h_due")
+    op.drop_column("appointments", "reminder_1h_sent_at")
+    op.drop_column("appointments", "reminder_24h_sent_at")
@@ -0,0 +1,37 @@
+"""slot_holds table for short-lived slot reservations during booking
+
+One row per held (doctor, slot start). Not partitioned: rows live for minutes
+and are swept by app/jobs/purge_slot_holds.py through ix_slot_holds_expires_at.
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "0010"
+down_revision = "0009"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "slot_holds",
+        sa.Column("doctor_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), primary_key=True),
+        sa.Column("start_at", sa.DateTime(timezone=True), primary_key=True),
+        sa.Column("end_at", sa.DateTime(timezone=True), nullable=False),
+        sa.Column("patient_id", postgresql.UUID(as_uuid=True), sa.ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
+        sa.Column("created_at", sa.DateTime(timezone=True), server_default=sa.text("now()"), nullable=False),
+        sa.Column("expires_at", sa.DateTime(timezone=True), nullable=False),
+    )
+    op.create_index("ix_slot_holds_patient_id", "slot_holds", ["patient_id"])
+    op.create_index("ix_slot_holds_expires_at", "slot_holds", ["expires_at"])
+
+
+def downgrade() -> None:
+    op.drop_index("ix_slot_holds_expires_at", table_name="slot_holds")
+    op.drop_index("ix_slot_holds_patient_id", table_name="slot_holds")
+    op.drop_table("slot_holds")
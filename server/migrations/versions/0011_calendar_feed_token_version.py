@@ -0,0 +1,28 @@
+"""users.calendar_feed_version for revocable calendar feed URLs
+
+Feed tokens carry the doctor's version and the feed rejects tokens whose
+version is not the current one, so rotating the feed URL revokes the old one.
+
+A constant non-null default is stored in the catalog (PostgreSQL 11+), so
+adding the column does not rewrite `users`. Existing tokens carry no version
+and count as version 0 until the doctor first rotates.
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19
+"""
+from alembic import op
+import sqlalchemy as sa
+
+revision = "0011"
+down_revision = "0010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("users", sa.Column("calendar_feed_version", sa.Integer(), server_default=sa.text("0"), nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column("users", "calendar_feed_version")
@@ -0,0 +1,33 @@
+from app.services.symptom_tagger import normalize_symptoms, tags_for_keyword
+
+
+def test_negation_drops_the_negated_symptom():
+    assert normalize_symptoms("no fever") == ["other"]
+    assert normalize_symptoms("patient denies chest pain, has a cough") == ["cough"]
+
+
+def test_negation_stops_at_comma():
+    assert normalize_symptoms("no fever, headache") == ["headache"]
+    assert normalize_symptoms("no cough, fever since 2 days") == ["fever"]
+    assert normalize_symptoms("fever; no cough") == ["fever"]
+
+
+def test_negation_stops_at_conjunction():
+    assert normalize_symptoms("no fever but headache") == ["headache"]
+    assert normalize_symptoms("no cough and fever since morning") == ["fever"]
+
+
+def test_phrases_do_not_span_punctuation():
+    assert normalize_symptoms("chest, pain in back") == ["other"]
+
+
+def test_empty_and_unknown_text():
+    assert normalize_symptoms("") == ["not_provided"]
+    assert normalize_symptoms("Not provided") == ["not_provided"]
+    assert normalize_symptoms("severe pain") == ["other"]
+
+
+def test_tags_for_keyword():
+    assert tags_for_keyword("vomiting") == ["nausea"]
+    assert "back_pain" in tags_for_keyword("pain")
+    assert tags_for_keyword("zzz") == []
@@ -0,0 +1,151 @@
+from datetime import datetime
+
+from app.services.agent.tool_args import IST, check_tool_args
+
+# A Wednesday
+NOW = datetime(2026, 1, 21, 9, 0, tzinfo=IST)
+DOCTOR_ID = "3eb13b90-4668-4257-bdd6-40fb06671ad1"
+
+SCHEMA = {
+    "properties": {
+        "doctor_id": {"type": "string"},
+        "date_str": {"type": "string"},
+        "start_at": {"type": "string"},
+        "limit": {"type": "integer"},
+        "symptoms": {"anyOf": [{"type": "string"}, {"type": "null"}]},
+    },
+    "required": ["doctor_id"],
+}
+
+
+def check(now=NOW, **arguments):
+    return check_tool_args("some_tool", {"doctor_id": DOCTOR_ID, **arguments}, SCHEMA, now)
+
+
+def test_valid_arguments_pass_unchanged():
+    checked = check(date_str="2026-01-25", start_at="2026-01-25T14:00:00+05:30", limit=5, symptoms="cough")
+    assert checked.ok
+    assert checked.repairs == []
+    assert checked.arguments == {
+        "doctor_id": DOCTOR_ID, "date_str": "2026-01-25",
+        "start_at": "2026-01-25T14:00:00+05:30", "limit": 5, "symptoms": "cough",
+    }
+
+
+def test_relative_dates_resolve_against_ist_today():
+    expected = {
+        "today": "2026-01-21",
+        "Tomorrow": "2026-01-22",
+        "day after tomorrow": "2026-01-23",
+        "in 3 days": "2026-01-24",
+        "friday": "2026-01-23",
+        "this monday": "2026-01-26",
+        "wednesday": "2026-01-21",
+        "next wednesday": "2026-01-28",
+    }
+    for value, day in expected.items():
+        checked = check(date_str=value)
+        assert checked.arguments["date_str"] == day, value
+        assert checked.repairs == [("date_str", "relative_date")]
+
+
+def test_free_form_dates_become_iso():
+    for value in ("25/01/2026", "25-01-2026", "2026/01/25", "25 January 2026", "Jan 25", "25th Jan", "January 25, 2026"):
+        checked = check(date_str=value)
+        assert checked.arguments["date_str"] == "2026-01-25", value
+        assert checked.repairs == [("date_str", "date_format")]
+
+
+def test_month_and_day_well_in_the_past_means_next_year():
+    december = datetime(2026, 12, 20, 9, 0, tzinfo=IST)
+    assert check(now=december, date_str="Jan 5").arguments["date_str"] == "2027-01-05"
+    assert check(now=december, date_str="Dec 1").arguments["date_str"] == "2026-12-01"
+
+
+def test_datetimes_get_ist():
+    checked = check(start_at="2026-01-25T14:00:00")
+    assert checked.arguments["start_at"] == "2026-01-25T14:00:00+05:30"
+    assert checked.repairs == [("start_at", "timezone")]
+
+    checked = check(start_at="2026-01-25T08:30:00Z")
+    assert checked.arguments["start_at"] == "2026-01-25T14:00:00+05:30"
+    assert checked.repairs == [("start_at", "timezone")]
+
+
+def test_free_form_datetimes_become_iso():
+    expected = {
+        "tomorrow 11am": "2026-01-22T11:00:00+05:30",
+        "25/01/2026 at 2:30 pm": "2026-01-25T14:30:00+05:30",
+        "next monday at 10:00": "2026-01-26T10:00:00+05:30",
+    }
+    for value, iso in expected.items():
+        checked = check(start_at=value)
+        assert checked.arguments["start_at"] == iso, value
+        assert checked.repairs == [("start_at", "datetime_format")]
+
+
+def test_uuids_are_normalized():
+    for value in (DOCTOR_ID.upper(), "{" + DOCTOR_ID + "}", DOCTOR_ID.replace("-", "")):
+        checked = check_tool_args("some_tool", {"doctor_id": value}, SCHEMA, NOW)
+        assert checked.arguments["doctor_id"] == DOCTOR_ID, value
+        assert checked.repairs == [("doctor_id", "uuid")]
+
+
+def test_scalars_are_coerced_to_the_schema_type():
+    checked = check(limit="20")
+    assert checked.arguments["limit"] == 20
+    assert checked.repairs == [("limit", "type")]
+
+    assert check(limit=20.0).arguments["limit"] == 20
+    assert check(symptoms=42).arguments["symptoms"] == "42"
+
+
+def test_unknown_parameters_are_dropped():
+    checked = check(patient_name="Asha")
+    assert checked.ok
+    assert "patient_name" not in checked.arguments
+    assert checked.repairs == [("patient_name", "unknown_param")]
+
+
+def test_empty_optional_parameters_are_omitted():
+    checked = check(date_str="", symptoms=None)
+    assert checked.ok
+    assert checked.arguments == {"doctor_id": DOCTOR_ID}
+
+
+def test_missing_or_empty_required_parameter_is_rejected():
+    checked = check_tool_args("some_tool", {"date_str": "2026-01-25"}, SCHEMA, NOW)
+    assert not checked.ok
+    assert checked.errors == ["doctor_id: is required"]
+
+    checked = check_tool_args("some_tool", {"doctor_id": ""}, SCHEMA, NOW)
+    assert checked.errors == ["doctor_id: is required"]
+
+
+def test_name_where_a_uuid_belongs_is_rejected():
+    checked = check_tool_args("some_tool", {"doctor_id": "Dr. Sharma"}, SCHEMA, NOW)
+    assert not checked.ok
+    assert checked.errors[0].startswith("doctor_id: 'Dr. Sharma' is not a UUID")
+
+
+def test_unreadable_dates_are_rejected():
+    checked = check(date_str="sometime soon", start_at="whenever works")
+    assert not checked.ok
+    assert checked.errors[0].startswith("date_str: could not read 'sometime soon' as a date")
+    assert checked.errors[1].startswith("start_at: could not read 'whenever works' as a date and time")
+
+
+def test_wrong_type_that_cannot_be_coerced_is_rejected():
+    checked = check(limit="twenty")
+    assert checked.errors == ["limit: expected integer, got 'twenty'"]
+
+    checked = check(limit=True)
+    assert checked.errors == ["limit: expected integer, got True"]
+
+
+def test_error_message_lists_every_error():
+    checked = check_tool_args("get_available_slots", {"date_str": "soon"}, SCHEMA, NOW)
+    message = checked.error_message("get_available_slots")
+    assert message.startswith("Error: invalid arguments for get_available_slots: ")
+    assert "date_str: could not read 'soon'" in message
+    assert message.endswith("doctor_id: is required")